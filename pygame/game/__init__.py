@@ -1,4 +1,3 @@
-from .game_state import GameState
 from .game_logic import GameLogic
 
-__all__ = ['GameState', 'GameLogic']
\ No newline at end of file
+__all__ = ['GameLogic']
@@ -1,5 +1,29 @@
-class GameLogic:
-    def __init__(self, game_state, ui):
-        self.state = game_state
-        self.ui = ui
-        self.text_content = ""
+import pygame
+
+from quantum_type.core.engine import GameEngine
+
+# pygame 按鍵對應到 Tk 的 keysym 名稱，引擎以 keysym 判斷換行與修飾鍵
+KEYSYMS = {
+    pygame.K_RETURN: "Return",
+    pygame.K_KP_ENTER: "KP_Enter",
+    pygame.K_LSHIFT: "Shift_L",
+    pygame.K_RSHIFT: "Shift_R",
+    pygame.K_LCTRL: "Control_L",
+    pygame.K_RCTRL: "Control_R",
+    pygame.K_LALT: "Alt_L",
+    pygame.K_RALT: "Alt_R",
+    pygame.K_LMETA: "Meta_L",
+    pygame.K_RMETA: "Meta_R",
+    pygame.K_LSUPER: "Super_L",
+    pygame.K_RSUPER: "Super_R",
+    pygame.K_CAPSLOCK: "Caps_Lock",
+    pygame.K_MODE: "ISO_Level3_Shift",
+}
+
+
+class GameLogic(GameEngine):
+    """與 Tk 版共用的遊戲引擎，只多了 pygame 按鍵事件的轉換"""
+
+    def on_key_press(self, event):
+        keysym = KEYSYMS.get(event.key, event.unicode)
+        self.on_key(event.unicode, keysym)
@@ -1,14 +1,45 @@
-from game.game_state import GameState
+import argparse
+
+from quantum_type.logs import DEFAULT_RATE_LIMIT, setup_logging
+from quantum_type.core import GameState, MatchHistory, Replayer
+from quantum_type.core.corpus import CORPUS_DIR, open_corpus
 from game.game_logic import GameLogic
 from ui.game_ui import GameUI
 
 
 def main():
-    game_state = GameState()
-    game_ui = GameUI()
-    game_logic = GameLogic(game_state, game_ui)
+    parser = argparse.ArgumentParser(description="英文打字遊戲")
+    # 可以在命令列指定要練習的文字檔
+    parser.add_argument("text_file", nargs="?", help="練習用的文字檔")
+    parser.add_argument("--replay", metavar="RECORDING", help="重播錄下的比賽")
+    parser.add_argument("--speed", type=float, default=1.0, help="重播速度 (倍)")
+    parser.add_argument(
+        "--corpus", metavar="DIR", help=f"隨機文章的文章庫目錄 (預設 {CORPUS_DIR})"
+    )
+    args = parser.parse_args()
 
-    game_ui.run()
+    setup_logging(rate_limit=DEFAULT_RATE_LIMIT)
+    game_ui = GameUI(text_file=args.text_file)
+    history = corpus = None
+    if args.replay:
+        replayer = Replayer(args.replay, game_ui, speed=args.speed)
+        game_ui.setup_ui()
+        replayer.play()
+    else:
+        history = MatchHistory.open()
+        corpus = open_corpus(args.corpus)
+        game_state = GameState()
+        game_logic = GameLogic(game_state, game_ui, history=history, corpus=corpus)
+        game_ui.set_game_logic(game_logic)
+        game_ui.setup_ui()
+    try:
+        game_ui.run()
+    finally:
+        # 寫入執行緒是 daemon，不關閉的話佇列中的比賽會遺失
+        if history is not None:
+            history.close()
+        if corpus is not None:
+            corpus.close()
 
 
 if __name__ == "__main__":
@@ -1,11 +1,40 @@
+import heapq
+import itertools
 import pygame
-import sys
 import os
 from pygame import font
 
-class GameUI:
-    def __init__(self):
+from quantum_type.abstract_ui import AbstractUI
+from ui.renderer import (
+    Button,
+    InputBox,
+    Label,
+    ProgressBar,
+    Renderer,
+    TextBlock,
+)
+from ui.surface_cache import SurfaceCache
+
+FPS = 60
+IDLE_WAKE_MS = 500  # 閒置時最久多久醒來一次，讓其他執行緒改的狀態能顯示出來
+ERROR_FLASH_MS = 500  # 打錯的字元標紅多久
+TEXT_MARGIN = 50  # 練習文字區塊左右與上方的留白
+MESSAGE_MS = 3000  # 提示訊息顯示多久
+STATS_TEXT = "速度: {:.0f} WPM  準確率: {:.0f}%"
+
+# 沒有指定文字檔時使用的練習文字
+DEFAULT_TEXT = (
+    "Practice makes perfect. Type each character exactly as it appears, "
+    "including spaces and punctuation. Speed comes with accuracy, so keep "
+    "your eyes on the text and your fingers on the home row."
+)
+
+class GameUI(AbstractUI):
+    def __init__(self, dirty_rects=True, text_file=None):
         self.game_logic = None
+        self.text_file = text_file
+        # False 時每幀整個重畫（舊的做法），方便比較與除錯
+        self.dirty_rects = dirty_rects
         self.screen_width = 800
         self.screen_height = 600
         self.is_fullscreen = False
@@ -45,25 +74,49 @@ class GameUI:
                 self.countdown_font = pygame.font.Font(None, 48)
 
         # UI 狀態
-        self.current_screen = "main_menu"  # main_menu, client_ip, host, game
+        self.current_screen = "main_menu"  # main_menu, client_ip, host, game, result
         self.ip_input = ""
         self.ip_input_active = False
-        self.host_ip = ""
+        self.host_info = ""  # 等待畫面的標題：房間 IP、已連線或單人模式
         self.host_status = "等待客戶端連接..."
+        self.host_status_color = self.text_color
+        self.multiplayer = False
+        self.start_enabled = False
+        self.back_enabled = False
+        self.key_callback = None
+        self.message = None  # (文字, 顏色, 結束時間 ms)
+        self.result_lines = []
+        self.players = {}
         self.my_score = 0
         self.opponent_score = 0
         self.timer = 60
+        self.stats = None  # LiveStats.snapshot() 的結果
         self.countdown = None
         self.my_text_content = ""
         self.opponent_text_content = ""
         self.my_progress = 0
         self.opponent_progress = 0
-        self.error_highlights = []
+        self.my_cursor = 0  # 目前要打的字元位置
+        self.opponent_cursor = None
+        self.error_highlights = {}  # 打錯的字元位置 -> 標示結束的時間 (ms)
+
+        # after() 排程的回呼：(到期時間 ms, 編號, 回呼)
+        self._timers = []
+        self._cancelled = set()
+        self._jobs = itertools.count()
+
+        # 文字表面快取：同樣的文字只渲染一次
+        self.text_cache = SurfaceCache()
 
         # 按鈕設置
         self.buttons = []
         self.setup_buttons()
 
+        # 保留模式渲染：每個畫面是一組元件，只重畫變動的部分
+        self.renderer = Renderer(self.screen, self.bg_color)
+        self.build_screens()
+        self.shown_screen = None
+
     def setup_buttons(self):
         """初始化主選單按鈕"""
         button_width = 200
@@ -89,130 +142,414 @@ class GameUI:
             },
         ]
 
+    def render_text(self, text, color=None, text_font=None):
+        """以快取渲染文字，預設使用一般字體與文字顏色"""
+        return self.text_cache.render(
+            text_font or self.font, text, color or self.text_color
+        )
+
     def show_client_ip_entry(self):
         """顯示客戶端IP輸入界面"""
         self.current_screen = "client_ip"
         self.ip_input_active = True
         self.ip_input = ""
 
+    def set_game_logic(self, game_logic):
+        self.game_logic = game_logic
+
+    def setup_ui(self):
+        # 開始定時處理網路訊息
+        self.game_logic.process_queue()
+
     def display_host_info(self, host_ip):
         """顯示主機信息"""
         self.current_screen = "host"
-        self.host_ip = host_ip
-        self.host_status = "等待客戶端連接..."
+        self.host_info = f"房間IP地址: {host_ip}"
+        self.set_status("等待客戶端連接...")
 
-    def render_main_menu(self):
-        """渲染主選單"""
-        # 渲染標題
-        title = self.title_font.render("英文打字遊戲", True, self.text_color)
-        title_rect = title.get_rect(center=(self.screen_width // 2, 100))
-        self.screen.blit(title, title_rect)
+    def connect_to_host(self):
+        """連上主機之後，在等待畫面等主機開始"""
+        self.current_screen = "host"
+        self.host_info = "已連接到主機"
+        self.set_status("等待主機開始遊戲...", "green")
+        self.show_multiplayer_elements()
 
-        # 渲染按鈕
-        mouse_pos = pygame.mouse.get_pos()
-        for button in self.buttons:
-            color = self.button_hover_color if button["rect"].collidepoint(mouse_pos) else self.button_color
-            pygame.draw.rect(self.screen, color, button["rect"], border_radius=10)
-            text = self.font.render(button["text"], True, self.text_color)
-            text_rect = text.get_rect(center=button["rect"].center)
-            self.screen.blit(text, text_rect)
-
-    def render_client_ip_screen(self):
-        """渲染客戶端IP輸入界面"""
-        # 渲染標題
-        title = self.font.render("輸入主機IP:", True, self.text_color)
-        title_rect = title.get_rect(center=(self.screen_width // 2, 200))
-        self.screen.blit(title, title_rect)
-
-        # 渲染IP輸入框
-        input_rect = pygame.Rect((self.screen_width - 300) // 2, 250, 300, 40)
-        pygame.draw.rect(self.screen, self.text_color, input_rect, 2)
-        ip_surface = self.font.render(self.ip_input, True, self.text_color)
-        self.screen.blit(ip_surface, (input_rect.x + 5, input_rect.y + 5))
-
-    def render_host_screen(self):
-        """渲染主機等待界面"""
-        # 渲染IP信息
-        ip_text = self.font.render(f"房間IP地址: {self.host_ip}", True, self.text_color)
-        ip_rect = ip_text.get_rect(center=(self.screen_width // 2, 200))
-        self.screen.blit(ip_text, ip_rect)
-
-        # 渲染狀態信息
-        status_text = self.font.render(self.host_status, True, self.text_color)
-        status_rect = status_text.get_rect(center=(self.screen_width // 2, 250))
-        self.screen.blit(status_text, status_rect)
-
-    def render_game_screen(self):
-        """渲染遊戲界面"""
-        # 渲染計時器
-        timer_text = self.font.render(f"剩餘時間: {int(self.timer)}", True, self.text_color)
-        self.screen.blit(timer_text, (20, 20))
-
-        # 渲染分數
-        score_text = self.font.render(f"我的分數: {self.my_score}", True, self.text_color)
-        self.screen.blit(score_text, (20, 60))
-
-        if not self.game_logic.game_state.is_single_player:
-            opponent_score = self.font.render(f"對手分數: {self.opponent_score}", True, self.text_color)
-            self.screen.blit(opponent_score, (20, 100))
-
-        # 渲染文本區域
-        text_y = self.screen_height // 2 - 100
-        if self.my_text_content:
-            text_surface = self.font.render(self.my_text_content, True, self.text_color)
-            text_rect = text_surface.get_rect(center=(self.screen_width // 2, text_y))
-            self.screen.blit(text_surface, text_rect)
-
-            # 渲染當前字符高亮
-            x = text_rect.x
-            for i, char in enumerate(self.my_text_content):
-                char_surface = self.font.render(char, True, 
-                                              self.highlight_color if i == len(self.my_text_content) - 1 
-                                              else self.text_color)
-                self.screen.blit(char_surface, (x, text_rect.y))
-                x += char_surface.get_width()
-
-        # 渲染進度條
+    def show_multiplayer_elements(self):
+        self.multiplayer = True
+
+    def hide_multiplayer_elements(self):
+        """單人模式：等待畫面不顯示 IP，遊戲畫面沒有對手"""
+        self.multiplayer = False
+        self.current_screen = "host"
+        self.host_info = "單人模式"
+        self.set_status("按「加載文本」載入練習文字")
+
+    def show_main_menu(self):
+        self.current_screen = "main_menu"
+        self.ip_input = ""
+        self.ip_input_active = False
+        self.clear_text_content()
+        self.my_score = 0
+        self.opponent_score = 0
+        self.timer = 60
+        self.stats = None
+        self.countdown = None
+        self.players = {}
+        self.result_lines = []
+        self.set_start_enabled(False)
+        self.set_back_enabled(False)
+
+    def get_host_address(self):
+        return self.ip_input
+
+    def set_status(self, text, color=None):
+        self.host_status = text
+        self.host_status_color = pygame.Color(color) if color else self.text_color
+
+    def show_info(self, title, message):
+        self.show_message(f"{title}: {message}", self.text_color)
+
+    def show_error(self, title, message):
+        self.show_message(f"{title}: {message}", self.error_color)
+
+    def show_message(self, text, color):
+        """在畫面下方短暫顯示一行提示"""
+        self.message = (text, color, pygame.time.get_ticks() + MESSAGE_MS)
+
+    def set_start_enabled(self, enabled):
+        self.start_enabled = enabled
+
+    def set_back_enabled(self, enabled):
+        self.back_enabled = enabled
+
+    def choose_text_file(self):
+        """命令列指定的文字檔"""
+        return self.text_file
+
+    def load_text(self):
+        """在背景讀取命令列指定的文字檔，沒有的話使用內建的練習文字"""
+        if self.text_file is None:
+            self.game_logic.use_text(DEFAULT_TEXT)
+        else:
+            self.game_logic.load_text()
+
+    def bind_key_press(self, callback):
+        """遊戲開始：切換到遊戲畫面並把按鍵交給遊戲邏輯"""
+        self.key_callback = callback
+        self.current_screen = "game"
+
+    def unbind_key_press(self):
+        self.key_callback = None
+
+    # 排程：與 Tk 的 after/after_cancel 相同，由主迴圈執行
+
+    def after(self, delay, callback):
+        job = next(self._jobs)
+        heapq.heappush(self._timers, (pygame.time.get_ticks() + delay, job, callback))
+        return job
+
+    def after_cancel(self, job):
+        self._cancelled.add(job)
+
+    def next_timer(self):
+        """下一個回呼的到期時間 (ms)，沒有就回傳 None"""
+        while self._timers and self._timers[0][1] in self._cancelled:
+            _, job, _ = heapq.heappop(self._timers)
+            self._cancelled.discard(job)
+        return self._timers[0][0] if self._timers else None
+
+    def run_timers(self):
+        now = pygame.time.get_ticks()
+        while True:
+            due = self.next_timer()
+            if due is None or due > now:
+                return
+            _, _, callback = heapq.heappop(self._timers)
+            callback()
+
+    def build_screens(self):
+        """建立每個畫面的元件"""
+        cache = self.text_cache
+        center_x = self.screen_width // 2
+        self.countdown_label = Label(
+            cache, self.countdown_font, (center_x, self.screen_height // 2),
+            color=self.text_color, anchor="center", visible=False,
+        )
+        self.message_label = Label(
+            cache, self.font, (center_x, self.screen_height - 30),
+            anchor="center", visible=False,
+        )
+        self.button_widgets = [
+            Button(cache, self.font, button["rect"], button["text"],
+                   self.button_color, self.button_hover_color, self.text_color,
+                   action=button["action"])
+            for button in self.buttons
+        ]
+        # 等待畫面的按鈕：加載文本與開始遊戲
+        button_width = 200
+        button_x = (self.screen_width - 2 * button_width - 20) // 2
+        self.load_button = Button(
+            cache, self.font, (button_x, 330, button_width, 50), "加載文本",
+            self.button_color, self.button_hover_color, self.text_color,
+            action=self.load_text,
+        )
+        self.start_button = Button(
+            cache, self.font, (button_x + button_width + 20, 330, button_width, 50),
+            "開始遊戲", self.button_color, self.button_hover_color, self.text_color,
+            action=lambda: self.game_logic.start_game(),
+        )
+        # 有文章庫時才顯示：隨機抽一段文章來練習
+        self.passage_button = Button(
+            cache, self.font, (center_x - button_width // 2, 400, button_width, 50),
+            "隨機文章", self.button_color, self.button_hover_color, self.text_color,
+            action=lambda: self.game_logic.load_passage(),
+        )
+        self.ip_box = InputBox(
+            cache, self.font, ((self.screen_width - 300) // 2, 250, 300, 40),
+            color=self.text_color,
+        )
+        self.host_ip_label = Label(cache, self.font, (center_x, 200), anchor="center")
+        self.host_status_label = Label(cache, self.font, (center_x, 250), anchor="center")
+        self.timer_label = Label(cache, self.font, (20, 20))
+        self.score_label = Label(cache, self.font, (20, 60))
+        self.opponent_score_label = Label(cache, self.font, (20, 100))
+        self.stats_label = Label(
+            cache, self.font, (self.screen_width - 20, 20), anchor="topright"
+        )
+        self.text_block = TextBlock(
+            cache, self.font, self.text_area(), self.text_color, self.bg_color,
+            self.highlight_color, (200, 100, 100), self.error_color,
+        )
+        # 進度條
         progress_width = 600
         progress_height = 20
         progress_x = (self.screen_width - progress_width) // 2
         progress_y = self.screen_height - 100
+        self.progress_bar = ProgressBar(
+            (progress_x, progress_y, progress_width, progress_height),
+            self.progress_color,
+        )
+        # 對手進度條（多人模式）
+        self.opponent_progress_bar = ProgressBar(
+            (progress_x, progress_y - 30, progress_width, progress_height),
+            (200, 100, 100),
+        )
 
-        # 背景進度條
-        pygame.draw.rect(self.screen, (100, 100, 100),
-                        (progress_x, progress_y, progress_width, progress_height))
-        # 當前進度
-        progress_fill = int(progress_width * (self.my_progress / 100))
-        if progress_fill > 0:
-            pygame.draw.rect(self.screen, self.progress_color,
-                           (progress_x, progress_y, progress_fill, progress_height))
+        self.screens = {
+            "main_menu": [
+                Label(cache, self.title_font, (center_x, 100), "英文打字遊戲",
+                      anchor="center"),
+                *self.button_widgets,
+            ],
+            "client_ip": [
+                Label(cache, self.font, (center_x, 200), "輸入主機IP:", anchor="center"),
+                self.ip_box,
+            ],
+            "host": [
+                self.host_ip_label,
+                self.host_status_label,
+                self.load_button,
+                self.start_button,
+                self.passage_button,
+            ],
+            "result": [],
+            "game": [
+                self.timer_label,
+                self.score_label,
+                self.opponent_score_label,
+                self.stats_label,
+                self.text_block,
+                self.progress_bar,
+                self.opponent_progress_bar,
+            ],
+        }
 
-        # 對手進度條（多人模式）
-        if not self.game_logic.game_state.is_single_player:
-            opponent_progress_y = progress_y - 30
-            pygame.draw.rect(self.screen, (100, 100, 100),
-                            (progress_x, opponent_progress_y, progress_width, progress_height))
-            opponent_progress_fill = int(progress_width * (self.opponent_progress / 100))
-            if opponent_progress_fill > 0:
-                pygame.draw.rect(self.screen, (200, 100, 100),
-                               (progress_x, opponent_progress_y, opponent_progress_fill, progress_height))
+    def sync_widgets(self):
+        """把目前的狀態交給元件；只有真的變動的元件會被標記重畫"""
+        if self.shown_screen != self.current_screen:
+            self.shown_screen = self.current_screen
+            # 倒數計時與提示訊息疊在所有畫面之上
+            self.renderer.set_widgets(
+                self.screens.get(self.current_screen, [])
+                + [self.countdown_label, self.message_label]
+            )
+
+        mouse_pos = pygame.mouse.get_pos()
+        for widget in self.screens.get(self.current_screen, []):
+            if isinstance(widget, Button):
+                widget.update(hover=widget.rect.collidepoint(mouse_pos))
+
+        if self.current_screen == "client_ip":
+            self.ip_box.update(text=self.ip_input)
+        elif self.current_screen == "host":
+            self.host_ip_label.update(text=self.host_info)
+            self.host_status_label.update(
+                text=self.host_status, color=self.host_status_color
+            )
+            # 客戶端不能自己開始或加載文本，等主機
+            host_controls = not self.multiplayer or self.game_logic.state.is_host
+            self.load_button.update(visible=host_controls)
+            self.start_button.update(visible=host_controls, enabled=self.start_enabled)
+            self.passage_button.update(
+                visible=host_controls and self.game_logic.corpus is not None
+            )
+        elif self.current_screen == "game":
+            multiplayer = self.multiplayer
+            self.timer_label.update(text=f"剩餘時間: {int(self.timer)}")
+            self.score_label.update(text=f"我的分數: {self.my_score}")
+            stats = self.stats or {"net_wpm": 0, "accuracy": 1.0}
+            self.stats_label.update(
+                text=STATS_TEXT.format(stats["net_wpm"], stats["accuracy"] * 100)
+            )
+            self.opponent_score_label.update(
+                text=f"對手分數: {self.opponent_score}", visible=multiplayer
+            )
+            self.text_block.update(
+                text=self.my_text_content,
+                cursor=self.my_cursor,
+                opponent=self.opponent_cursor if multiplayer else None,
+            )
+            self.sync_error_highlights()
+            self.progress_bar.update(fraction=self.my_progress / 100)
+            self.opponent_progress_bar.update(
+                fraction=self.opponent_progress / 100, visible=multiplayer
+            )
+
+        if self.countdown is not None:
+            self.countdown_label.update(text=str(self.countdown), visible=True)
+        else:
+            self.countdown_label.update(visible=False)
+
+        if self.message is not None and self.message[2] > pygame.time.get_ticks():
+            text, color, _ = self.message
+            self.message_label.update(text=text, color=color, visible=True)
+        else:
+            self.message = None
+            self.message_label.update(visible=False)
+
+    def sync_error_highlights(self):
+        now = pygame.time.get_ticks()
+        for index, until in list(self.error_highlights.items()):
+            if until <= now:
+                del self.error_highlights[index]
+        for index in self.text_block.errors - self.error_highlights.keys():
+            self.text_block.remove_error(index)
+        for index in self.error_highlights.keys() - self.text_block.errors:
+            self.text_block.add_error(index)
+
+    def text_area(self):
+        """練習文字區塊的範圍，寬度隨視窗調整，高度留給下方的進度條"""
+        width = self.screen.get_width()
+        return pygame.Rect(TEXT_MARGIN, 140, width - 2 * TEXT_MARGIN, self.screen_height - 300)
+
+    def set_text_content(self, target, opponent=True):
+        """設定練習文字 (TypingTarget)，游標回到開頭"""
+        self.my_text_content = target.text
+        self.my_progress = self.opponent_progress = 0
+        self.my_cursor = 0
+        self.opponent_cursor = 0 if opponent else None
+        self.error_highlights.clear()
+
+    def clear_text_content(self):
+        self.my_text_content = ""
+        self.my_progress = self.opponent_progress = 0
+        self.my_cursor = 0
+        self.opponent_cursor = None
+        self.error_highlights.clear()
+
+    def _percent(self, index):
+        return min(100, index * 100 / max(1, len(self.my_text_content)))
+
+    def update_my_progress(self, progress):
+        """progress 是目前要打的字元位置"""
+        self.my_cursor = progress
+        self.my_progress = self._percent(progress)
+
+    def update_opponent_progress(self, progress):
+        self.opponent_cursor = progress
+        self.opponent_progress = self._percent(progress)
+
+    def update_players(self, players):
+        # 畫面只顯示領先的對手；完整名單保留給結算畫面
+        self.players = players
+
+    def update_score_display(self, my_score, opponent_score=None):
+        self.my_score = my_score
+        if opponent_score is not None:
+            self.opponent_score = opponent_score
+
+    def update_timer_display(self, remaining):
+        self.timer = remaining
+
+    def update_stats(self, stats):
+        self.stats = stats
+
+    def show_result(self, winner, my_score=None, opponent_score=None, ranking=None):
+        """遊戲結束：切換到結算畫面，按 Esc 回主選單"""
+        lines = [f"勝者: {winner}"] if winner else []
+        for entry in ranking or []:
+            lines.append(f"第{entry['rank']}名 {entry['name']}: {entry['score']}")
+        if my_score is not None:
+            lines.append(f"我的分數: {my_score}")
+        if opponent_score is not None:
+            lines.append(f"對手分數: {opponent_score}")
+        lines.append("按 Esc 回主選單")
+        self.unbind_key_press()
+        self.error_highlights.clear()
+        center_x = self.screen_width // 2
+        self.screens["result"] = [
+            Label(self.text_cache, self.title_font, (center_x, 100), "遊戲結束",
+                  anchor="center"),
+        ] + [
+            Label(self.text_cache, self.font, (center_x, 180 + 40 * row), line,
+                  anchor="center")
+            for row, line in enumerate(lines)
+        ]
+        self.current_screen = "result"
+        self.shown_screen = None
+
+    def show_error_highlight(self, index):
+        """把打錯的字元標紅一下"""
+        self.error_highlights[index] = pygame.time.get_ticks() + ERROR_FLASH_MS
 
     def show_countdown(self, count):
         """顯示倒計時"""
-        countdown_text = self.countdown_font.render(str(count), True, self.text_color)
-        countdown_rect = countdown_text.get_rect(center=(self.screen_width // 2, self.screen_height // 2))
-        self.screen.blit(countdown_text, countdown_rect)
+        self.countdown = count
+
+    def hide_countdown(self):
+        self.countdown = None
+
+    def is_idle(self):
+        """沒有待重畫的元件時，主迴圈可以阻塞等待事件，比賽中也一樣"""
+        return not self.renderer.dirty
+
+    def next_deadline(self):
+        """畫面下一次會自己改變的時間 (ms)：排程、訊息消失或錯誤閃爍結束"""
+        deadlines = [self.next_timer()]
+        if self.message is not None:
+            deadlines.append(self.message[2])
+        deadlines.extend(self.error_highlights.values())
+        deadlines = [due for due in deadlines if due is not None]
+        return min(deadlines) if deadlines else None
 
     def run(self):
         """主遊戲循環"""
         while True:
-            self.screen.fill(self.bg_color)
-            events = pygame.event.get()
+            if self.is_idle():
+                # 閒置模式：阻塞到有事件或下一個排程為止，不再每秒重畫 60 次
+                timeout = IDLE_WAKE_MS
+                due = self.next_deadline()
+                if due is not None:
+                    timeout = max(1, min(timeout, due - pygame.time.get_ticks()))
+                events = [pygame.event.wait(timeout)] + pygame.event.get()
+            else:
+                events = pygame.event.get()
 
             for event in events:
                 if event.type == pygame.QUIT:
+                    # 交回 main.py 收尾：紀錄與文章庫還要關閉
                     pygame.quit()
-                    sys.exit()
+                    return
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_F11:
                         self.toggle_fullscreen()
@@ -220,40 +557,32 @@ class GameUI:
                         if self.is_fullscreen:
                             self.exit_fullscreen()
                         elif self.current_screen != "main_menu":
-                            self.current_screen = "main_menu"
+                            self.game_logic.back_to_home()
                     elif self.current_screen == "client_ip" and self.ip_input_active:
                         if event.key == pygame.K_RETURN:
                             if self.game_logic:
-                                self.game_logic.ip_input = self.ip_input
                                 self.game_logic.connect_to_host()
                         elif event.key == pygame.K_BACKSPACE:
                             self.ip_input = self.ip_input[:-1]
                         else:
                             self.ip_input += event.unicode
-                    elif self.current_screen == "game":
-                        self.game_logic.on_key_press(event)
+                    elif self.current_screen == "game" and self.key_callback:
+                        self.key_callback(event)
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     mouse_pos = pygame.mouse.get_pos()
-                    if self.current_screen == "main_menu":
-                        for button in self.buttons:
-                            if button["rect"].collidepoint(mouse_pos):
-                                button["action"]()
-
-            # 根據當前界面渲染不同內容
-            if self.current_screen == "main_menu":
-                self.render_main_menu()
-            elif self.current_screen == "client_ip":
-                self.render_client_ip_screen()
-            elif self.current_screen == "host":
-                self.render_host_screen()
-            elif self.current_screen == "game":
-                self.render_game_screen()
-
-            if self.countdown is not None:
-                self.show_countdown(self.countdown)
-
-            pygame.display.flip()
-            self.clock.tick(60)
+                    for widget in self.screens.get(self.current_screen, []):
+                        if isinstance(widget, Button) and widget.click(mouse_pos):
+                            break
+
+            # 到期的 after() 回呼：倒數、計時與網路訊息
+            self.run_timers()
+
+            # 根據當前界面更新元件，只重畫並推送變動的矩形
+            self.sync_widgets()
+            if not self.dirty_rects:
+                self.renderer.invalidate()
+            self.renderer.render()
+            self.clock.tick(FPS)
 
     def toggle_fullscreen(self):
         """切換全螢幕"""
@@ -262,9 +591,13 @@ class GameUI:
             self.screen = pygame.display.set_mode((self.screen_width, self.screen_height), pygame.FULLSCREEN)
         else:
             self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
+        self.renderer.invalidate(self.screen)
+        self.text_block.update(rect=self.text_area())
 
     def exit_fullscreen(self):
         """退出全螢幕"""
         if self.is_fullscreen:
             self.is_fullscreen = False
-            self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
\ No newline at end of file
+            self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
+            self.renderer.invalidate(self.screen)
+            self.text_block.update(rect=self.text_area())
\ No newline at end of file
@@ -0,0 +1,375 @@
+import pygame
+
+from ui.text_layout import TextLayout
+
+DISABLED_COLOR = (90, 90, 90)  # 停用按鈕的顏色
+
+
+class Widget:
+    """保留模式的畫面元件
+
+    元件記住自己的狀態與上次畫在螢幕上的範圍；只有 update() 真的改變了
+    狀態時才標記為需要重畫。
+    """
+
+    def __init__(self, visible=True):
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.visible = visible
+        self.dirty = True
+        self.drawn_rect = None  # 上次畫在螢幕上的範圍
+        self.damage = []  # 元件沒有整個變動時，只需重畫的螢幕範圍
+
+    def update(self, **state):
+        """設定狀態，有變動時標記為髒"""
+        for name, value in state.items():
+            if getattr(self, name) != value:
+                setattr(self, name, value)
+                self.dirty = True
+
+    def damage_area(self, rect):
+        """只標記元件的一部分需要重畫"""
+        if self.visible and not self.dirty:
+            self.damage.append(pygame.Rect(rect))
+
+    def refresh(self):
+        self.layout()
+        self.dirty = False
+        self.damage = []
+
+    def layout(self):
+        """依目前狀態重新計算 self.rect"""
+        pass
+
+    def draw(self, surface):
+        pass
+
+
+class Label(Widget):
+    """以快取渲染的單行文字"""
+
+    def __init__(self, cache, font, pos, text="", color=(255, 255, 255),
+                 anchor="topleft", visible=True):
+        super().__init__(visible)
+        self.cache = cache
+        self.font = font
+        self.pos = pos
+        self.text = text
+        self.color = color
+        self.anchor = anchor
+        self._surface = None
+
+    def layout(self):
+        self._surface = self.cache.render(self.font, self.text, self.color)
+        self.rect = self._surface.get_rect(**{self.anchor: self.pos})
+
+    def draw(self, surface):
+        surface.blit(self._surface, self.rect)
+
+
+class Button(Widget):
+    """圓角按鈕，滑鼠懸停時變色"""
+
+    def __init__(self, cache, font, rect, text, color, hover_color,
+                 text_color=(255, 255, 255), action=None, visible=True):
+        super().__init__(visible)
+        self.cache = cache
+        self.font = font
+        self.rect = pygame.Rect(rect)
+        self.text = text
+        self.color = color
+        self.hover_color = hover_color
+        self.text_color = text_color
+        self.action = action
+        self.hover = False
+        self.enabled = True
+
+    def click(self, pos):
+        """在按鈕上點擊時執行動作，回傳是否點到"""
+        if self.visible and self.enabled and self.rect.collidepoint(pos):
+            if self.action is not None:
+                self.action()
+            return True
+        return False
+
+    def draw(self, surface):
+        if not self.enabled:
+            color = DISABLED_COLOR
+        else:
+            color = self.hover_color if self.hover else self.color
+        pygame.draw.rect(surface, color, self.rect, border_radius=10)
+        text = self.cache.render(self.font, self.text, self.text_color)
+        surface.blit(text, text.get_rect(center=self.rect.center))
+
+
+class InputBox(Widget):
+    """有外框的文字輸入欄"""
+
+    def __init__(self, cache, font, rect, text="", color=(255, 255, 255), visible=True):
+        super().__init__(visible)
+        self.cache = cache
+        self.font = font
+        self.rect = pygame.Rect(rect)
+        self.text = text
+        self.color = color
+
+    def draw(self, surface):
+        pygame.draw.rect(surface, self.color, self.rect, 2)
+        if self.text:
+            text = self.cache.render(self.font, self.text, self.color)
+            surface.blit(text, (self.rect.x + 5, self.rect.y + 5))
+
+
+class ProgressBar(Widget):
+    """進度條，fraction 介於 0 與 1 之間"""
+
+    def __init__(self, rect, color, background=(100, 100, 100), fraction=0.0,
+                 visible=True):
+        super().__init__(visible)
+        self.rect = pygame.Rect(rect)
+        self.color = color
+        self.background = background
+        self.fraction = fraction
+
+    def update(self, fraction=None, **state):
+        if fraction is not None:
+            # 以像素為單位比較，寬度沒變就不必重畫
+            fraction = min(max(fraction, 0.0), 1.0)
+            if int(self.rect.width * fraction) != int(self.rect.width * self.fraction):
+                self.fraction = fraction
+                self.dirty = True
+        super().update(**state)
+
+    def draw(self, surface):
+        pygame.draw.rect(surface, self.background, self.rect)
+        fill = int(self.rect.width * self.fraction)
+        if fill > 0:
+            pygame.draw.rect(
+                surface, self.color, (self.rect.x, self.rect.y, fill, self.rect.height)
+            )
+
+
+class TextBlock(Widget):
+    """自動換行的練習文字，附帶游標、對手游標與錯誤標示
+
+    排版由 TextLayout 快取；每行文字從字形圖集畫成一張表面後也會快取。
+    游標或錯誤標示移動時只把相關字元的格子標記為需要重畫，不必重畫
+    整段文字。文字超過區塊高度時，會隨游標捲動。
+    """
+
+    def __init__(self, cache, font, rect, color, background, cursor_color,
+                 opponent_color, error_color, text="", visible=True):
+        super().__init__(visible)
+        self.cache = cache
+        self.font = font
+        self.rect = pygame.Rect(rect)
+        self.color = color
+        self.background = background
+        self.cursor_color = cursor_color
+        self.opponent_color = opponent_color
+        self.error_color = error_color
+        self.text = text
+        self.cursor = 0
+        self.opponent = None
+        self.errors = set()
+        self.first_line = 0
+        self.text_layout = TextLayout(cache, font, self.rect.width)
+        self._lines = {}  # 行號 -> 該行的表面
+
+    def update(self, **state):
+        # 游標移動不會讓整個元件變髒，只重畫前後兩個字元的格子
+        cursors = {name: state.pop(name) for name in ("cursor", "opponent") if name in state}
+        super().update(**state)
+        for name, index in cursors.items():
+            if index != getattr(self, name):
+                self._move(name, index)
+
+    def _move(self, name, index):
+        old = getattr(self, name)
+        setattr(self, name, index)
+        if self.dirty:
+            return
+        if name == "cursor" and self._scroll():
+            self.dirty = True
+            return
+        for index in (old, index):
+            self.damage_char(index)
+
+    def add_error(self, index):
+        if index not in self.errors:
+            self.errors.add(index)
+            self.damage_char(index)
+
+    def remove_error(self, index):
+        if index in self.errors:
+            self.errors.discard(index)
+            self.damage_char(index)
+
+    def damage_char(self, index):
+        if index is not None and not self.dirty:
+            rect = self.char_rect(index)
+            if rect is not None:
+                self.damage_area(rect)
+
+    def char_rect(self, index):
+        """第 index 個字元在螢幕上的範圍，不在可見的行內就回傳 None"""
+        line = self.text_layout.line_of(index)
+        if not self.first_line <= line < self.first_line + self.visible_lines:
+            return None
+        rect = self.text_layout.char_rect(index)
+        return rect.move(self.rect.x, self.rect.y - self.first_line * self.text_layout.line_height)
+
+    @property
+    def visible_lines(self):
+        return max(1, self.rect.height // self.text_layout.line_height)
+
+    def _scroll(self):
+        """游標離開可見範圍時捲動，讓游標停在大約三分之一高的位置"""
+        line = self.text_layout.line_of(self.cursor)
+        visible = self.visible_lines
+        if self.first_line <= line < self.first_line + visible - 1 or visible < 3:
+            return False
+        first_line = max(0, line - visible // 3)
+        if first_line == self.first_line:
+            return False
+        self.first_line = first_line
+        return True
+
+    def layout(self):
+        if self.text_layout.set(self.text, self.font, self.rect.width):
+            self._lines = {}
+            self.first_line = 0
+            self.errors = {index for index in self.errors if index < len(self.text)}
+        self._scroll()
+
+    def _line_surface(self, line):
+        surface = self._lines.get(line)
+        if surface is None:
+            text_layout = self.text_layout
+            start, end = text_layout.line_span(line)
+            width = max(1, text_layout.xs[end - 1] + text_layout.advances[end - 1]) if end > start else 1
+            surface = pygame.Surface((width, self.font.get_linesize()), pygame.SRCALPHA)
+            surface.fill((0, 0, 0, 0))
+            atlas = self.cache.glyphs(self.font, self.color)
+            blits = []
+            for index in range(start, end):
+                page, area, _ = atlas.glyph(self.text[index])
+                blits.append((page, (text_layout.xs[index], 0), area, pygame.BLEND_RGBA_MAX))
+            surface.blits(blits, doreturn=False)
+            self._lines[line] = surface
+        return surface
+
+    def draw(self, surface):
+        clip = surface.get_clip().clip(self.rect)
+        if not clip:
+            return
+        text_layout = self.text_layout
+        line_height = text_layout.line_height
+        top = self.rect.y - self.first_line * line_height
+        # 只畫與重畫範圍重疊的行
+        first = self.first_line + (clip.top - self.rect.y) // line_height
+        last = min(
+            text_layout.line_count,
+            self.first_line + self.visible_lines,
+            self.first_line + (clip.bottom - 1 - self.rect.y) // line_height + 1,
+        )
+        for line in range(first, last):
+            surface.blit(self._line_surface(line), (self.rect.x, top + line * line_height))
+
+        for index in self.errors:
+            self._mark(surface, clip, index, self.error_color, fill=True)
+        if self.opponent is not None:
+            self._mark(surface, clip, self.opponent, self.opponent_color)
+        self._mark(surface, clip, self.cursor, self.cursor_color, glyph=True)
+
+    def _mark(self, surface, clip, index, color, fill=False, glyph=False):
+        rect = self.char_rect(index)
+        if rect is None or not rect.colliderect(clip):
+            return
+        if fill or glyph:
+            pygame.draw.rect(surface, color if fill else self.background, rect)
+        char = self.text[index] if index < len(self.text) else "\n"
+        if char != "\n" and (fill or glyph):
+            atlas = self.cache.glyphs(self.font, color if glyph else self.color)
+            atlas.draw(surface, char, rect.topleft)
+        # 底線，讓空白與換行上的游標也看得到
+        pygame.draw.rect(surface, color, (rect.x, rect.bottom - 2, rect.width, 2))
+
+
+class Renderer:
+    """只重畫變動區域的渲染器
+
+    每幀只處理髒元件：清除它們舊的與新的範圍、重畫與這些範圍重疊的
+    元件，並以 pygame.display.update(rects) 只推送這些矩形。
+    """
+
+    def __init__(self, screen, background):
+        self.screen = screen
+        self.background = background
+        self.widgets = []
+        self._full = True
+        self.frames = 0
+        self.pixels_pushed = 0
+
+    def set_widgets(self, widgets):
+        """切換畫面時換上一組新的元件，並整個重畫"""
+        self.widgets = list(widgets)
+        self.invalidate()
+
+    def invalidate(self, screen=None):
+        """下一幀整個重畫，例如切換全螢幕之後"""
+        if screen is not None:
+            self.screen = screen
+        self._full = True
+
+    @property
+    def dirty(self):
+        """是否有東西要重畫：整個變動的元件，或還沒重畫的局部範圍"""
+        return self._full or any(widget.dirty or widget.damage for widget in self.widgets)
+
+    def render(self):
+        """重畫變動的區域並推送到顯示器，回傳更新的矩形"""
+        if self._full:
+            return self._render_all()
+
+        regions = []
+        for widget in self.widgets:
+            if not widget.dirty:
+                regions.extend(widget.damage)
+                widget.damage = []
+                continue
+            old = widget.drawn_rect
+            widget.refresh()
+            new = widget.rect.copy() if widget.visible else None
+            widget.drawn_rect = new
+            if old:
+                regions.append(old)
+            if new and new != old:
+                regions.append(new)
+        if not regions:
+            return []
+
+        for region in regions:
+            self.screen.set_clip(region)
+            self.screen.fill(self.background, region)
+            for widget in self.widgets:
+                if widget.drawn_rect and widget.drawn_rect.colliderect(region):
+                    widget.draw(self.screen)
+        self.screen.set_clip(None)
+        pygame.display.update(regions)
+        self.frames += 1
+        self.pixels_pushed += sum(rect.width * rect.height for rect in regions)
+        return regions
+
+    def _render_all(self):
+        self.screen.fill(self.background)
+        for widget in self.widgets:
+            widget.refresh()
+            widget.drawn_rect = widget.rect.copy() if widget.visible else None
+            if widget.visible:
+                widget.draw(self.screen)
+        self._full = False
+        pygame.display.flip()
+        screen_rect = self.screen.get_rect()
+        self.frames += 1
+        self.pixels_pushed += screen_rect.width * screen_rect.height
+        return [screen_rect]
@@ -0,0 +1,175 @@
+import pygame
+from collections import OrderedDict
+
+MAX_ENTRIES = 512  # 最多快取的文字表面數量
+MAX_BYTES = 32 * 1024 * 1024  # 快取表面佔用的像素記憶體上限
+ATLAS_PAGE_SIZE = (1024, 256)  # 字形圖集每頁大小
+MAX_ATLAS_PAGES = 8  # 圖集頁數上限，超過就整個重建
+
+
+class SurfaceCache:
+    """已渲染文字表面的 LRU 快取
+
+    以 (字體, 文字, 顏色, 反鋸齒, 背景色) 為鍵，同時限制項目數與像素記憶體。
+    逐字繪製則使用 glyphs() 取得的字形圖集。
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._surfaces = OrderedDict()
+        self._sizes = OrderedDict()  # (字體, 文字) -> font.size() 結果
+        self._atlases = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, font, text, color, antialias=True, background=None):
+        """與 font.render 相同，但重複的文字只渲染一次"""
+        key = (font, text, tuple(color), antialias,
+               tuple(background) if background is not None else None)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        if background is None:
+            surface = font.render(text, antialias, color)
+        else:
+            surface = font.render(text, antialias, color, background)
+        self._surfaces[key] = surface
+        self.bytes += _surface_bytes(surface)
+        self._evict()
+        return surface
+
+    def text_size(self, font, text):
+        """font.size 的快取版本，用於量測前綴寬度等"""
+        key = (font, text)
+        size = self._sizes.get(key)
+        if size is None:
+            size = self._sizes[key] = font.size(text)
+            if len(self._sizes) > self.max_entries:
+                self._sizes.popitem(last=False)
+        else:
+            self._sizes.move_to_end(key)
+        return size
+
+    def glyphs(self, font, color, antialias=True):
+        """取得 (字體, 顏色) 的字形圖集，供逐字繪製使用"""
+        key = (font, tuple(color), antialias)
+        atlas = self._atlases.get(key)
+        if atlas is None:
+            atlas = self._atlases[key] = GlyphAtlas(font, color, antialias)
+        return atlas
+
+    def _evict(self):
+        # 最久未使用的先移除，直到項目數與記憶體都在上限內
+        while self._surfaces and (
+            len(self._surfaces) > self.max_entries or self.bytes > self.max_bytes
+        ):
+            _, surface = self._surfaces.popitem(last=False)
+            self.bytes -= _surface_bytes(surface)
+            self.evictions += 1
+
+    def clear(self):
+        self._surfaces.clear()
+        self._sizes.clear()
+        self._atlases.clear()
+        self.bytes = 0
+
+    def stats(self):
+        """命中率等統計，供除錯與效能量測"""
+        lookups = self.hits + self.misses
+        glyph_hits = sum(atlas.hits for atlas in self._atlases.values())
+        glyph_misses = sum(atlas.misses for atlas in self._atlases.values())
+        return {
+            "entries": len(self._surfaces),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "glyph_hits": glyph_hits,
+            "glyph_misses": glyph_misses,
+            "atlas_pages": sum(len(atlas.pages) for atlas in self._atlases.values()),
+        }
+
+
+class GlyphAtlas:
+    """單一字體與顏色的字形圖集
+
+    每個字元只渲染一次，並排進幾張大的透明頁面中；繪製時從頁面上
+    以區域 blit，逐字繪製不必每幀重新呼叫 font.render。
+    """
+
+    def __init__(self, font, color, antialias=True, page_size=ATLAS_PAGE_SIZE,
+                 max_pages=MAX_ATLAS_PAGES):
+        self.font = font
+        self.color = tuple(color)
+        self.antialias = antialias
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.row_height = font.get_height()
+        self.pages = []
+        self._glyphs = {}  # 字元 -> (頁面, 區域, 寬度)
+        self._x = self._y = 0
+        self.hits = 0
+        self.misses = 0
+
+    def glyph(self, char):
+        """回傳 (頁面, 區域, 前進寬度)"""
+        entry = self._glyphs.get(char)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        entry = self._glyphs[char] = self._add(char)
+        return entry
+
+    def advance(self, char):
+        return self.glyph(char)[2]
+
+    def _add(self, char):
+        surface = self.font.render(char, self.antialias, self.color)
+        if not surface.get_flags() & pygame.SRCALPHA:
+            # 非反鋸齒的表面使用色鍵，先轉成逐像素透明
+            surface = surface.convert_alpha()
+        width, height = surface.get_size()
+        page_width, page_height = self.page_size
+        if not self.pages or self._x + width > page_width:
+            self._x = 0
+            self._y += self.row_height
+        if not self.pages or self._y + height > page_height:
+            if len(self.pages) >= self.max_pages:
+                # 圖集滿了（例如大量中文字），整個重建
+                self.pages = []
+                self._glyphs.clear()
+            page = pygame.Surface(self.page_size, pygame.SRCALPHA)
+            page.fill((0, 0, 0, 0))
+            self.pages.append(page)
+            self._x = self._y = 0
+        page = self.pages[-1]
+        # MAX 混合在全透明的頁面上等於直接複製像素與透明度
+        page.blit(surface, (self._x, self._y), special_flags=pygame.BLEND_RGBA_MAX)
+        area = pygame.Rect(self._x, self._y, width, height)
+        self._x += width + 1
+        return page, area, width
+
+    def draw(self, target, text, pos):
+        """從 pos 開始逐字繪製 text，回傳結束時的 x 座標"""
+        x, y = pos
+        blits = []
+        for char in text:
+            page, area, advance = self.glyph(char)
+            blits.append((page, (x, y), area))
+            x += advance
+        target.blits(blits, doreturn=False)
+        return x
+
+
+def _surface_bytes(surface):
+    width, height = surface.get_size()
+    return width * height * surface.get_bytesize()
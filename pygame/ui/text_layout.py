@@ -0,0 +1,140 @@
+import re
+from array import array
+
+import pygame
+
+LINE_SPACING = 4  # 行與行之間多留的像素
+
+# CJK 標點、假名、漢字與全形字每個字都可以斷行
+_CJK = "\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef"
+# 斷行的單位：換行、一串空白、單一 CJK 字、或一個英文單字
+_TOKEN = re.compile(f"\n| +|[{_CJK}]|[^\n {_CJK}]+")
+
+
+class TextLayout:
+    """自動換行的文字排版
+
+    每個字元的前進寬度只用 font.size 量一次，然後依寬度換行，算出每個
+    字元所在的行與 x 座標。結果會一直快取，只有文字、字體或寬度改變時
+    才重新排版，所以查詢某個字元的位置是 O(1)。
+    """
+
+    def __init__(self, cache, font, width, line_spacing=LINE_SPACING):
+        self.cache = cache
+        self.font = font
+        self.width = width
+        self.line_spacing = line_spacing
+        self.text = ""
+        self._advances = {}  # 字元 -> 前進寬度，換字體時清掉
+        self._reset()
+
+    def _reset(self):
+        self.xs = array("i")  # 每個字元在行內的 x 座標
+        self.advances = array("i")  # 每個字元的寬度
+        self.char_lines = array("I")  # 每個字元所在的行
+        self.line_starts = array("I", [0])
+        self.line_ends = array("I", [0])  # 不含換行字元
+
+    def __len__(self):
+        return len(self.text)
+
+    @property
+    def line_height(self):
+        return self.font.get_linesize() + self.line_spacing
+
+    @property
+    def line_count(self):
+        return len(self.line_starts)
+
+    def set(self, text=None, font=None, width=None):
+        """更新排版的輸入，有變動才重新排版；回傳是否重排"""
+        text = self.text if text is None else text
+        font = self.font if font is None else font
+        width = self.width if width is None else width
+        if text == self.text and font is self.font and width == self.width and self.xs:
+            return False
+        if font is not self.font:
+            self._advances = {}
+        self.text, self.font, self.width = text, font, width
+        self._layout()
+        return True
+
+    def advance(self, char):
+        width = self._advances.get(char)
+        if width is None:
+            width = self._advances[char] = self.cache.text_size(self.font, char)[0]
+        return width
+
+    def _layout(self):
+        self._reset()
+        text = self.text
+        max_width = self.width
+        advance = self.advance
+        xs, advances, char_lines = self.xs, self.advances, self.char_lines
+        line_starts, line_ends = self.line_starts, self.line_ends
+        space = advance(" ")
+        line = 0
+        x = 0
+
+        def new_line(end, start):
+            nonlocal line, x
+            line_ends[line] = end
+            line_starts.append(start)
+            line_ends.append(start)
+            line += 1
+            x = 0
+
+        for match in _TOKEN.finditer(text):
+            token = match.group()
+            start = match.start()
+            if token == "\n":
+                # 換行字元畫成一個空白寬的格子，游標停在這裡時看得到
+                xs.append(x)
+                advances.append(space)
+                char_lines.append(line)
+                new_line(start, start + 1)
+                continue
+
+            widths = [advance(char) for char in token]
+            if token[0] != " " and x > 0 and x + sum(widths) > max_width:
+                # 單字放不下就整個移到下一行；行尾的空白則允許超出
+                new_line(start, start)
+            for offset, width in enumerate(widths):
+                if token[0] != " " and x > 0 and x + width > max_width:
+                    # 比整行還長的單字只好逐字斷開
+                    new_line(start + offset, start + offset)
+                xs.append(x)
+                advances.append(width)
+                char_lines.append(line)
+                x += width
+            line_ends[line] = match.end()
+
+    def line_span(self, line):
+        """第 line 行的 [start, end)，不含換行字元"""
+        return self.line_starts[line], self.line_ends[line]
+
+    def line_text(self, line):
+        start, end = self.line_span(line)
+        return self.text[start:end]
+
+    def line_of(self, index):
+        if index >= len(self.text):
+            return self.line_count - 1
+        return self.char_lines[index]
+
+    def position(self, index):
+        """第 index 個字元左上角相對於排版區塊的 (x, y)；文字結尾接在最後一個字後面"""
+        if index < len(self.text):
+            return self.xs[index], self.char_lines[index] * self.line_height
+        if not self.text:
+            return 0, 0
+        last = len(self.text) - 1
+        if self.text[last] == "\n":
+            return 0, (self.line_count - 1) * self.line_height
+        return self.xs[last] + self.advances[last], self.char_lines[last] * self.line_height
+
+    def char_rect(self, index):
+        """第 index 個字元佔的範圍，相對於排版區塊"""
+        x, y = self.position(index)
+        width = self.advances[index] if index < len(self.text) else self.advance(" ")
+        return pygame.Rect(x, y, width, self.font.get_linesize())
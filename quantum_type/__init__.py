@@ -0,0 +1,10 @@
+"""Toolkit-independent parts of the typing game.
+
+``core`` holds the engine and everything a match produces, ``network`` the
+transports and wire protocol, ``server`` the headless multi-room server
+and ``logs`` the logging setup. The Tk and pygame frontends only add a UI
+on top (see ``abstract_ui``).
+
+Install it with ``pip install -e .`` from the repository root; the
+frontends are then started from their own directories as before.
+"""
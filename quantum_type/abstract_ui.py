@@ -0,0 +1,162 @@
+from abc import ABC, abstractmethod
+
+
+class AbstractUI(ABC):
+    """Everything ``core.GameEngine`` needs from a frontend.
+
+    Progress values are character offsets into the practice text. All
+    methods are called on the UI thread; network messages reach the
+    engine through its queue, which it polls with ``after``.
+    """
+
+    @abstractmethod
+    def setup_ui(self):
+        """Initialize and display the UI."""
+        pass
+
+    @abstractmethod
+    def set_game_logic(self, game_logic):
+        """Set the game logic instance for callbacks."""
+        pass
+
+    @abstractmethod
+    def after(self, delay, callback):
+        """Call callback after delay milliseconds; returns a job for after_cancel"""
+        pass
+
+    @abstractmethod
+    def after_cancel(self, job):
+        """Cancel a callback scheduled with after"""
+        pass
+
+    @abstractmethod
+    def update_my_progress(self, progress):
+        """Update the player's text progress"""
+        pass
+
+    @abstractmethod
+    def update_opponent_progress(self, progress):
+        """Update the opponent's text progress"""
+        pass
+
+    @abstractmethod
+    def update_players(self, players):
+        """Update the per-opponent panes from {player_id: {name, progress, score}}"""
+        pass
+
+    @abstractmethod
+    def update_score_display(self, my_score, opponent_score=None):
+        """Update the score display; the opponent's only if given"""
+        pass
+
+    @abstractmethod
+    def update_timer_display(self, remaining):
+        """Update the timer display"""
+        pass
+
+    @abstractmethod
+    def update_stats(self, stats):
+        """Show speed and accuracy from ``LiveStats.snapshot()``"""
+        pass
+
+    @abstractmethod
+    def show_countdown(self, count):
+        """Show a countdown number."""
+        pass
+
+    @abstractmethod
+    def hide_countdown(self):
+        """Hide the countdown display"""
+        pass
+
+    @abstractmethod
+    def show_result(self, winner, my_score=None, opponent_score=None, ranking=None):
+        """Display the game result, with the full ranking when there is one"""
+        pass
+
+    @abstractmethod
+    def choose_text_file(self):
+        """Prompt the user for a text file and return its path, or None.
+        The engine reads it on a worker thread and reports progress with
+        ``set_status``."""
+        pass
+
+    @abstractmethod
+    def set_text_content(self, target, opponent=True):
+        """Show a TypingTarget for the player, and for the opponent if asked"""
+        pass
+
+    @abstractmethod
+    def clear_text_content(self):
+        """Remove the practice text from every display"""
+        pass
+
+    @abstractmethod
+    def show_error_highlight(self, index):
+        """Briefly mark a mistyped character of the player's text"""
+        pass
+
+    @abstractmethod
+    def bind_key_press(self, callback):
+        """Send key presses to callback (and take the keyboard focus)"""
+        pass
+
+    @abstractmethod
+    def unbind_key_press(self):
+        """Stop sending key presses to the game"""
+        pass
+
+    @abstractmethod
+    def set_start_enabled(self, enabled):
+        """Enable or disable starting a match"""
+        pass
+
+    @abstractmethod
+    def set_back_enabled(self, enabled):
+        """Enable or disable going back to the main menu"""
+        pass
+
+    @abstractmethod
+    def set_status(self, text, color=None):
+        """Show a connection or lobby status line"""
+        pass
+
+    @abstractmethod
+    def show_info(self, title, message):
+        """Tell the user something"""
+        pass
+
+    @abstractmethod
+    def show_error(self, title, message):
+        """Tell the user something went wrong"""
+        pass
+
+    @abstractmethod
+    def get_host_address(self):
+        """The address the user entered: IP, IP:port or IP/room"""
+        pass
+
+    @abstractmethod
+    def display_host_info(self, host_ip):
+        """Show the room address while the host waits for players"""
+        pass
+
+    @abstractmethod
+    def connect_to_host(self):
+        """Called after successful connection to host"""
+        pass
+
+    @abstractmethod
+    def show_multiplayer_elements(self):
+        """Show the opponent's text and score"""
+        pass
+
+    @abstractmethod
+    def hide_multiplayer_elements(self):
+        """Hide everything that only matters with opponents"""
+        pass
+
+    @abstractmethod
+    def show_main_menu(self):
+        """Go back to the mode selection with every display reset"""
+        pass
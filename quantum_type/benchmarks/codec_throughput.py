@@ -0,0 +1,52 @@
+"""Encode/decode throughput and wire size of the JSON and binary codecs.
+
+Run from the repository root (or with the package installed):
+
+    python -m quantum_type.benchmarks.codec_throughput [--iterations 100000]
+"""
+import argparse
+import time
+
+from quantum_type.network.codec import BINARY_CODEC, JSON_CODEC, decode_payload, encode_payload
+from quantum_type.network.framing import HEADER_SIZE
+
+SAMPLES = {
+    "PROGRESS": {"type": "PROGRESS", "player": 3, "index": 1834, "score": 1834},
+    "SCOREBOARD x8": {
+        "type": "SCOREBOARD",
+        "players": [[pid, 900 + pid * 37, 880 + pid * 35] for pid in range(8)],
+    },
+}
+
+
+def measure(msg, codec, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        payload = encode_payload(msg, codec)
+    encode_rate = iterations / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        decode_payload(payload)
+    decode_rate = iterations / (time.perf_counter() - start)
+
+    assert decode_payload(payload) == msg
+    return encode_rate, decode_rate, len(payload) + HEADER_SIZE
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"{'message':<14} {'codec':<5} {'encode/s':>10} {'decode/s':>10} {'bytes':>6}")
+    for name, msg in SAMPLES.items():
+        for codec in (JSON_CODEC, BINARY_CODEC):
+            encode_rate, decode_rate, size = measure(msg, codec, args.iterations)
+            print(
+                f"{name:<14} {codec:<5} {encode_rate:>10,.0f} {decode_rate:>10,.0f} {size:>6}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Index build time and passage selection speed of a text corpus.
+
+Run from the repository root (or with the package installed):
+
+    python -m quantum_type.benchmarks.corpus_throughput [--size-mb 100] [--files 8]
+                                           [--passages 2000] [--directory DIR]
+
+Without ``--directory`` a corpus of ``--size-mb`` megabytes is generated in
+a temporary directory: hard-wrapped paragraphs of sentences, some with
+capitals, digits and symbols so difficulty varies. The index is built from
+scratch, then loaded again as at the next start, and ``--passages`` random
+passages are drawn with and without a target difficulty.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from quantum_type.core.corpus import INDEX_NAME, Corpus
+
+WORDS = "the quick brown fox jumps over lazy dog while typing races are won".split()
+EXTRA = ["Alice", "Bob", "1984", "42", "(see above)", "e-mail", "50%", "#3", "x+y=z"]
+
+
+def make_corpus(directory, size, files, seed=0):
+    rng = random.Random(seed)
+    per_file = size // files
+    for number in range(files):
+        with open(os.path.join(directory, f"text{number:03d}.txt"), "w") as out:
+            written = 0
+            while written < per_file:
+                mix = rng.random() * 0.5  # How much of the paragraph is tricky
+                sentences = []
+                for _ in range(rng.randint(2, 8)):
+                    words = [
+                        rng.choice(EXTRA) if rng.random() < mix else rng.choice(WORDS)
+                        for _ in range(rng.randint(5, 20))
+                    ]
+                    sentences.append(" ".join(words).capitalize() + rng.choice(".!?"))
+                paragraph = " ".join(sentences)
+                # Hard-wrap at about 72 columns, like most plain-text books
+                lines = []
+                while len(paragraph) > 72:
+                    cut = paragraph.rfind(" ", 0, 72)
+                    cut = cut if cut > 0 else 72
+                    lines.append(paragraph[:cut])
+                    paragraph = paragraph[cut:].lstrip()
+                lines.append(paragraph)
+                block = "\n".join(lines) + "\n\n"
+                out.write(block)
+                written += len(block)
+
+
+def run(directory, passages, length=400):
+    index = os.path.join(directory, INDEX_NAME)
+    if os.path.exists(index):
+        os.remove(index)
+    start = time.perf_counter()
+    corpus = Corpus.open(directory, seed=1)
+    build = time.perf_counter() - start
+    corpus.close()
+    start = time.perf_counter()
+    corpus = Corpus.open(directory, seed=1)
+    load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    chars = sum(len(corpus.passage(length)) for _ in range(passages))
+    any_level = time.perf_counter() - start
+    low, high = corpus._difficulties[0], corpus._difficulties[-1]
+    targets = [random.Random(i).uniform(low, high) for i in range(passages)]
+    start = time.perf_counter()
+    for target in targets:
+        corpus.passage(length, difficulty=target)
+    by_level = time.perf_counter() - start
+    corpus.close()
+    return {
+        "bytes": sum(f["size"] for f in corpus.files),
+        "paragraphs": len(corpus),
+        "sentences": len(corpus.sentences["start"]),
+        "build_seconds": build,
+        "load_seconds": load,
+        "index_bytes": os.path.getsize(index),
+        "us_per_passage": any_level / passages * 1e6,
+        "us_per_passage_by_difficulty": by_level / passages * 1e6,
+        "mean_passage_chars": chars / passages,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=100.0)
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--passages", type=int, default=2000)
+    parser.add_argument("--directory", help="index this corpus instead of a generated one")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp:
+        directory = args.directory or temp
+        if not args.directory:
+            make_corpus(directory, int(args.size_mb * 1e6), args.files)
+        result = run(directory, args.passages)
+    print(
+        f"{result['bytes'] / 1e6:,.1f} MB: {result['paragraphs']:,} paragraphs, "
+        f"{result['sentences']:,} sentences; index built in {result['build_seconds']:.2f} s "
+        f"({result['bytes'] / 1e6 / result['build_seconds']:.0f} MB/s), loaded in "
+        f"{result['load_seconds'] * 1000:.0f} ms, {result['index_bytes']:,} bytes"
+    )
+    print(
+        f"passages of ~{result['mean_passage_chars']:.0f} chars: "
+        f"{result['us_per_passage']:.1f} us each, "
+        f"{result['us_per_passage_by_difficulty']:.1f} us by difficulty"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Keystroke throughput of the game engine, driven by a headless bot.
+
+Run from the repository root (or with the package installed):
+
+    python -m quantum_type.benchmarks.engine_throughput [--keystrokes 200000] [--error-rate 0.05]
+                                           [--text-size 100000]
+
+A single-player match is played on ``core.GameEngine`` with ``HeadlessUI``,
+the same engine the Tk and pygame frontends use. The bot presses keys
+through the UI's key callback as fast as it can, mistyping with
+probability ``--error-rate``, so the numbers are the cost of the shared
+hot path itself: matching, scoring and the progress and error callbacks.
+"""
+import argparse
+import random
+import time
+
+from quantum_type.core import GameEngine, GameState, HeadlessUI
+
+WORDS = "the quick brown fox jumps over lazy dog while typing races are won".split()
+
+
+def make_text(size, seed=0):
+    rng = random.Random(seed)
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    # A line break every dozen words, so Return is exercised too
+    return "".join(
+        word + ("\n" if i % 12 == 11 else " ") for i, word in enumerate(words)
+    )[:size]
+
+
+def run(keystrokes, error_rate, text_size, seed=0):
+    ui = HeadlessUI()
+    engine = GameEngine(GameState(), ui, recording_dir=None)
+    ui.set_game_logic(engine)
+    engine.set_single_player_mode()
+    engine.use_text(make_text(text_size, seed))
+    engine.start_game()
+
+    rng = random.Random(seed)
+    text = engine.text_content
+    pressed = 0
+    start = time.perf_counter()
+    while pressed < keystrokes and ui.progress < len(text):
+        if rng.random() < error_rate:
+            ui.press("#")
+        else:
+            ui.press(text[ui.progress])
+        pressed += 1
+    elapsed = time.perf_counter() - start
+    return {
+        "keystrokes": pressed,
+        "seconds": elapsed,
+        "per_second": pressed / elapsed if elapsed else 0.0,
+        "us_per_key": elapsed / pressed * 1e6 if pressed else 0.0,
+        "progress": ui.progress,
+        "errors": ui.errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keystrokes", type=int, default=200000)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--text-size", type=int, default=100000)
+    args = parser.parse_args()
+
+    result = run(args.keystrokes, args.error_rate, args.text_size)
+    print(
+        f"{result['keystrokes']:,} keystrokes in {result['seconds']:.3f} s: "
+        f"{result['per_second']:,.0f}/s ({result['us_per_key']:.2f} us each), "
+        f"{result['errors']:,} mistakes, progress {result['progress']:,}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Write and query throughput of the SQLite match history.
+
+Run from the repository root (or with the package installed):
+
+    python -m quantum_type.benchmarks.history_throughput [--matches 50000] [--players 40]
+                                            [--texts 200] [--path history.db]
+
+Simulated matches (between one and four players each) are handed to
+``MatchHistory.record_match`` as fast as possible. The time that takes is
+what the end of a game costs the UI thread; the background writer's
+throughput is measured until ``flush`` returns. Then leaderboard and
+player history queries are timed on the full database, first uncached and
+then from the cache. Without ``--path`` a temporary database is used.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from quantum_type.core.history import MatchHistory, match_record
+
+
+def make_matches(count, players, texts, seed=0):
+    rng = random.Random(seed)
+    names = [f"player{i}" for i in range(players)]
+    digests = [f"{i:064x}" for i in range(texts)]
+    start = time.time() - count * 300
+    for i in range(count):
+        seated = rng.sample(names, rng.randint(1, min(4, players)))
+        scores = sorted((rng.randint(50, 450) for _ in seated), reverse=True)
+        results = [
+            {
+                "player": name,
+                "score": score,
+                "rank": rank,
+                "me": rank == 1,
+                "net_wpm": score / 5,
+                "accuracy": rng.uniform(0.85, 1.0),
+            }
+            for rank, (name, score) in enumerate(zip(seated, scores), 1)
+        ]
+        yield match_record(
+            rng.choice(digests), "single" if len(seated) == 1 else "host", 60,
+            results, seated[0], played_at=start + i * 300,
+        )
+
+
+def _time(call, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        call()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run(path, matches, players, texts, queries=200):
+    history = MatchHistory(path)
+    records = list(make_matches(matches, players, texts))
+    start = time.perf_counter()
+    for match in records:
+        history.record_match(match)
+    queued = time.perf_counter() - start
+    history.flush()
+    written = time.perf_counter() - start
+
+    rng = random.Random(1)
+    digests = [rng.choice(records)["digest"] for _ in range(queries)]
+    names = [f"player{rng.randrange(players)}" for _ in range(queries)]
+
+    def uncached(query, args):
+        def call():
+            history.invalidate()
+            query(*args)
+        return call
+
+    result = {
+        "matches": matches,
+        "us_per_record_call": queued / matches * 1e6,
+        "matches_per_second": matches / written,
+        "leaderboard_ms": _time(uncached(history.leaderboard, (digests[0],)), queries),
+        "leaderboard_cached_ms": _time(lambda: history.leaderboard(digests[0]), queries),
+        "history_ms": _time(uncached(history.player_history, (names[0],)), queries),
+        "history_cached_ms": _time(lambda: history.player_history(names[0]), queries),
+        "stats_ms": _time(uncached(history.player_stats, (names[0],)), queries),
+        "database_bytes": os.path.getsize(path),
+    }
+    history.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--matches", type=int, default=50000)
+    parser.add_argument("--players", type=int, default=40)
+    parser.add_argument("--texts", type=int, default=200)
+    parser.add_argument("--path", help="database file (default: a temporary one)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.path or os.path.join(directory, "history.db")
+        result = run(path, args.matches, args.players, args.texts)
+    print(
+        f"{result['matches']:,} matches: record_match {result['us_per_record_call']:.2f} us "
+        f"each, written at {result['matches_per_second']:,.0f}/s, "
+        f"{result['database_bytes']:,} bytes"
+    )
+    print(
+        f"leaderboard {result['leaderboard_ms']:.3f} ms "
+        f"({result['leaderboard_cached_ms'] * 1000:.1f} us cached), "
+        f"player history {result['history_ms']:.3f} ms "
+        f"({result['history_cached_ms'] * 1000:.1f} us cached), "
+        f"player stats {result['stats_ms']:.3f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Loading a large text file while the UI thread keeps running.
+
+Run from the repository root (or with the package installed):
+
+    python -m quantum_type.benchmarks.ingest_throughput [--size-mb 50] [--encoding utf-8]
+                                           [--path big.txt]
+
+Without ``--path`` a text of ``--size-mb`` megabytes (in ``--encoding``,
+with CRLF line endings and typographic quotes to normalise) is written to
+a temporary file. ``GameEngine.load_file`` then reads it on its worker
+thread while this thread plays the UI: it runs the pending ``after``
+callbacks every few milliseconds and records the longest gap between two
+turns, which is how long a real window would have been frozen.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from quantum_type.benchmarks.engine_throughput import make_text
+from quantum_type.core import GameEngine, GameState, HeadlessUI
+
+FRAME_SECONDS = 0.005  # How often the simulated UI loop wakes up
+
+
+def write_text(path, size, encoding):
+    text = make_text(size).replace("\n", "\r\n").replace(" the ", " “the” ")
+    with open(path, "w", encoding=encoding, newline="") as file:
+        file.write(text)
+
+
+def run(path):
+    ui = HeadlessUI(text_path=path)
+    engine = GameEngine(GameState(), ui, recording_dir=None)
+    ui.set_game_logic(engine)
+    engine.set_single_player_mode()
+    start = last = time.perf_counter()
+    engine.load_text()
+    frames = 0
+    longest = 0.0
+    updates = set()
+    while engine._loader is not None:
+        ui.run_pending()
+        updates.add(ui.status)
+        time.sleep(FRAME_SECONDS)
+        now = time.perf_counter()
+        longest = max(longest, now - last - FRAME_SECONDS)
+        last = now
+        frames += 1
+    seconds = time.perf_counter() - start
+    return {
+        "bytes": os.path.getsize(path),
+        "chars": len(engine.text_content),
+        "seconds": seconds,
+        "frames": frames,
+        "longest_stall_ms": longest * 1000,
+        "progress_updates": len(updates),
+        "status": ui.status,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=50.0)
+    parser.add_argument("--encoding", default="utf-8")
+    parser.add_argument("--path", help="load this file instead of a generated one")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.path
+        if path is None:
+            path = os.path.join(directory, "text.txt")
+            write_text(path, int(args.size_mb * 1e6), args.encoding)
+        result = run(path)
+    print(
+        f"{result['bytes'] / 1e6:,.1f} MB -> {result['chars']:,} chars in "
+        f"{result['seconds']:.2f} s ({result['bytes'] / 1e6 / result['seconds']:.1f} MB/s), "
+        f"{result['progress_updates']} progress updates"
+    )
+    print(
+        f"UI loop: {result['frames']:,} turns, longest stall "
+        f"{result['longest_stall_ms']:.1f} ms; {result['status']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
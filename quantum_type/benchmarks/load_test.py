@@ -0,0 +1,371 @@
+"""Load test: N simulated typists against a host NetworkHandler or the server.
+
+Run from the repository root (or with the package installed):
+
+    python -m quantum_type.benchmarks.load_test [--typists 32] [--duration 20] [--server]
+                                   [--output results.json]
+
+The host (or ``server.GameServer`` with ``--server``) runs in a child
+process so its CPU time and memory are measured on their own. Every typist
+is a real client handler on its own thread: it sends CLIENT_CONNECTED (and
+JOIN for the server), receives the text and START, then types with
+exponentially distributed gaps around ``--cpm`` and mistypes with
+probability ``--error-rate``, each mistake costing a correction pause.
+
+Relay latency is measured from a typist handing PROGRESS to its handler
+until another typist sees that index in a SCOREBOARD, so it includes the
+coalescing ticks on both ends. Results are printed (and optionally written)
+as JSON so runs can be compared between releases.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+from quantum_type.logs import setup_logging
+from quantum_type.network import TRANSPORTS, create_network_handler
+
+ROOM = "LOAD"
+WORDS = "the quick brown fox jumps over lazy dog while typing races are won".split()
+
+
+def _percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _rss_kib():
+    """Current resident set size from /proc, or None where there is no /proc"""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _process_stats():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return {
+        "cpu_user_s": usage.ru_utime,
+        "cpu_system_s": usage.ru_stime,
+        "max_rss_kib": usage.ru_maxrss,
+        "rss_kib": _rss_kib(),
+    }
+
+
+def make_text(chars, rng):
+    words = []
+    length = 0
+    while length < chars:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:chars]
+
+
+def serve(args):
+    """Child process: run the host until stdin closes, then report its usage"""
+    out = sys.stdout
+    # Logs go to stderr, stdout is the reply channel
+    setup_logging("DEBUG" if args.verbose else "ERROR")
+    if args.server:
+        import asyncio
+
+        from quantum_type.server import GameServer
+        from quantum_type.server.game_server import TextLibrary
+
+        # The room starts by itself once every typist has joined
+        server = GameServer(
+            "127.0.0.1", 0, TextLibrary([args.text_file]),
+            players_per_room=args.typists,
+        )
+        loop = asyncio.new_event_loop()
+        threading.Thread(target=loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+        port, host = server.port, None
+    else:
+        host = create_network_handler(True, "127.0.0.1", 0, args.transport)
+        host.set_game(SimpleNamespace(state=SimpleNamespace(queue=_Discard())))
+        host.start()
+        port = host.port
+    start = _process_stats()
+    out.write(json.dumps({"port": port}) + "\n")
+    out.flush()
+
+    for line in sys.stdin:
+        if host is not None:
+            # LOAD_TEXT and START, sent the way GameLogic sends them
+            host.send_message(json.loads(line))
+
+    stats = _process_stats()
+    for key in ("cpu_user_s", "cpu_system_s"):
+        stats[key] -= start[key]
+    if host is not None:
+        stats["frames"] = host.frame_stats()
+        stats["send_queues"] = host.queue_stats()
+        stats["clients_at_end"] = len(host.clients)
+    out.write(json.dumps(stats) + "\n")
+    out.flush()
+
+
+class _Discard:
+    """A game queue nobody reads"""
+
+    def put(self, msg):
+        pass
+
+
+class Probe:
+    """Stands in for GameLogic's queue and timestamps what a typist receives"""
+
+    def __init__(self, typist, results):
+        self.typist = typist
+        self.results = results
+
+    def put(self, msg):
+        now = time.perf_counter()
+        results = self.results
+        msg_type = msg["type"]
+        with results.lock:
+            results.messages_received += 1
+            if msg_type == "SCOREBOARD":
+                for player_id, index, _ in msg["players"]:
+                    sent_at = results.sent.get((player_id, index))
+                    if sent_at is not None and player_id != self.typist.player_id:
+                        results.latencies.append(now - sent_at)
+            elif msg_type == "LOAD_TEXT":
+                self.typist.text = msg["text"]
+                results.text_delivery.append(now - results.text_sent_at)
+            elif msg_type == "START":
+                self.typist.playing = True
+            elif msg_type == "CONNECTION":
+                if msg["state"] == "reconnecting" and msg.get("attempt") == 1:
+                    results.dropped += 1
+                elif msg["state"] == "lost":
+                    results.lost += 1
+
+
+class Results:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sent = {}  # (player_id, index) -> perf_counter when typed
+        self.latencies = []
+        self.text_delivery = []
+        self.text_sent_at = 0.0
+        self.keystrokes = 0
+        self.errors = 0
+        self.messages_received = 0
+        self.dropped = 0
+        self.lost = 0
+
+
+class Typist:
+    """One simulated player: a client handler plus a keystroke model"""
+
+    def __init__(self, number, port, args, results):
+        self.number = number
+        self.args = args
+        self.results = results
+        self.rng = random.Random(args.seed + number)
+        self.text = None
+        self.playing = False
+        self.index = 0
+        self.handler = create_network_handler(False, "127.0.0.1", port, args.transport)
+        probe = Probe(self, results)
+        self.handler.set_game(SimpleNamespace(state=SimpleNamespace(queue=probe)))
+
+    @property
+    def player_id(self):
+        return self.handler.player_id
+
+    def connect(self):
+        self.handler.connect("127.0.0.1")
+        self.handler.start()
+        self.handler.send_message({"type": "CLIENT_CONNECTED"})
+        if self.args.server:
+            self.handler.send_message(
+                {"type": "JOIN", "room": ROOM, "name": f"bot{self.number}"}
+            )
+
+    def run(self, deadline):
+        mean_gap = 60.0 / self.args.cpm
+        while time.perf_counter() < deadline:
+            time.sleep(self.rng.expovariate(1.0 / mean_gap))
+            if not self.playing or self.text is None:
+                continue
+            with self.results.lock:
+                self.results.keystrokes += 1
+            if self.rng.random() < self.args.error_rate:
+                # A wrong key: no progress, and a moment to notice it
+                with self.results.lock:
+                    self.results.errors += 1
+                time.sleep(mean_gap * 2)
+                continue
+            self.index = min(self.index + 1, len(self.text))
+            with self.results.lock:
+                self.results.sent[(self.player_id, self.index)] = time.perf_counter()
+            self.handler.send_message(
+                {"type": "PROGRESS", "player": self.player_id, "index": self.index,
+                 "score": self.index}
+            )
+
+
+def _wait(condition, timeout):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline and not condition():
+        time.sleep(0.01)
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    text = make_text(args.text_size, rng)
+    child_args = [sys.executable, "-m", "quantum_type.benchmarks.load_test", "--serve",
+                  "--typists", str(args.typists), "--transport", args.transport]
+    if args.server:
+        text_file = tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False)
+        with text_file:
+            text_file.write(text)
+        child_args += ["--server", "--text-file", text_file.name]
+    if args.verbose:
+        child_args.append("--verbose")
+    child = subprocess.Popen(
+        child_args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        # The repository root, where quantum_type is importable
+        cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    )
+    port = json.loads(child.stdout.readline())["port"]
+
+    def send_to_host(msg):
+        child.stdin.write(json.dumps(msg) + "\n")
+        child.stdin.flush()
+
+    results = Results()
+    setup_logging("INFO" if args.verbose else "ERROR")
+    typists = [Typist(n, port, args, results) for n in range(args.typists)]
+    for typist in typists[:-1]:
+        typist.connect()
+    _wait(lambda: all(t.player_id is not None for t in typists[:-1]), 10)
+    # On the server the last join starts the match and sends the text
+    results.text_sent_at = time.perf_counter()
+    typists[-1].connect()
+    _wait(lambda: typists[-1].player_id is not None, 10)
+
+    if not args.server:
+        results.text_sent_at = time.perf_counter()
+        send_to_host({"type": "LOAD_TEXT", "text": text})
+        _wait(lambda: all(t.text is not None for t in typists), 10)
+        send_to_host({"type": "START", "start_time": time.time(), "text": text})
+    # The server counts down before START
+    _wait(lambda: all(t.playing for t in typists), 10)
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+    threads = [threading.Thread(target=t.run, args=(deadline,)) for t in typists]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    time.sleep(0.3)  # Let the last scoreboard ticks arrive
+
+    # The host going away at the end is not a dropped connection
+    for typist in typists:
+        typist.handler.auto_reconnect = False
+    dropped, lost = results.dropped, results.lost
+    child.stdin.close()
+    host_stats = json.loads(child.stdout.readline())
+    child.wait(timeout=10)
+    for typist in typists:
+        typist.handler.stop()
+    if args.server:
+        os.unlink(text_file.name)
+
+    ms = [latency * 1000 for latency in results.latencies]
+    text_ms = [latency * 1000 for latency in results.text_delivery]
+    return {
+        "config": {
+            "typists": args.typists,
+            "duration_s": args.duration,
+            "cpm": args.cpm,
+            "error_rate": args.error_rate,
+            "text_size": args.text_size,
+            "transport": args.transport,
+            "server": args.server,
+            "seed": args.seed,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "relay_latency_ms": {
+            "samples": len(ms),
+            "p50": _percentile(ms, 50),
+            "p95": _percentile(ms, 95),
+            "p99": _percentile(ms, 99),
+            "max": max(ms) if ms else None,
+        },
+        "text_delivery_ms": {
+            "samples": len(text_ms),
+            "p50": _percentile(text_ms, 50),
+            "max": max(text_ms) if text_ms else None,
+        },
+        "throughput": {
+            "keystrokes": results.keystrokes,
+            "errors": results.errors,
+            "keystrokes_per_s": results.keystrokes / elapsed,
+            "messages_received": results.messages_received,
+            "messages_per_s": results.messages_received / elapsed,
+        },
+        "connections": {
+            "joined": sum(1 for t in typists if t.player_id is not None),
+            "playing": sum(1 for t in typists if t.playing),
+            "dropped": dropped,
+            "lost": lost,
+        },
+        "host": host_stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--typists", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of typing")
+    parser.add_argument("--cpm", type=float, default=300.0, help="keystrokes per minute")
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--text-size", type=int, default=20000, help="characters")
+    parser.add_argument("--transport", choices=sorted(TRANSPORTS), default="selector")
+    parser.add_argument("--server", action="store_true", help="load the room server")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="also write the JSON results here")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--text-file", help=argparse.SUPPRESS)
+    parser.add_argument("--verbose", action="store_true", help="log to stderr")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+    report = run(args)
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
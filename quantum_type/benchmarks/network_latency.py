@@ -0,0 +1,105 @@
+"""Message latency through the host NetworkHandler with 1, 8 and 64 clients.
+
+Run from the repository root (or with the package installed):
+
+    python -m quantum_type.benchmarks.network_latency [--rounds 200] [--transport asyncio]
+
+"up" is client -> host queue, "down" is one host broadcast -> every client
+queue. Latencies are reported in milliseconds.
+"""
+import argparse
+import queue
+import time
+from types import SimpleNamespace
+
+from quantum_type.logs import setup_logging
+from quantum_type.network import TRANSPORTS, create_network_handler
+
+
+def _make_sink():
+    """The bits of GameLogic that NetworkHandler touches"""
+    return SimpleNamespace(state=SimpleNamespace(queue=queue.Queue()))
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _wait_for(q, phase, seq, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while True:
+        msg = q.get(timeout=max(0.0, deadline - time.perf_counter()))
+        if msg.get("phase") == phase and msg.get("seq") == seq:
+            return time.perf_counter() - msg["sent_at"]
+
+
+def run(n_clients, rounds, transport=None):
+    host_sink = _make_sink()
+    host = create_network_handler(True, "127.0.0.1", 0, transport)
+    host.set_game(host_sink)
+    host.start()
+
+    clients = []
+    for _ in range(n_clients):
+        sink = _make_sink()
+        client = create_network_handler(False, "127.0.0.1", host.port, transport)
+        client.set_game(sink)
+        client.connect("127.0.0.1")
+        client.start()
+        # Clients join with their first message, as GameLogic does
+        client.send_message({"type": "CLIENT_CONNECTED"})
+        clients.append((client, sink))
+
+    deadline = time.time() + 10
+    while len(host.clients) < n_clients and time.time() < deadline:
+        time.sleep(0.01)
+
+    up, down = [], []
+    try:
+        for seq in range(rounds):
+            client, _ = clients[seq % n_clients]
+            msg = {"type": "BENCH", "phase": "up", "seq": seq}
+            msg["sent_at"] = time.perf_counter()
+            client.send_message(msg)
+            up.append(_wait_for(host_sink.state.queue, "up", seq))
+
+        for seq in range(rounds):
+            msg = {"type": "BENCH", "phase": "down", "seq": seq}
+            msg["sent_at"] = time.perf_counter()
+            host.send_message(msg)
+            for _, sink in clients:
+                down.append(_wait_for(sink.state.queue, "down", seq))
+    finally:
+        for client, _ in clients:
+            client.stop()
+        host.stop()
+    return up, down
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 64])
+    parser.add_argument("--transport", choices=sorted(TRANSPORTS), default="selector")
+    args = parser.parse_args()
+    setup_logging("WARNING")
+
+    rows = []
+    for n_clients in args.clients:
+        up, down = run(n_clients, args.rounds, args.transport)
+        rows.append((n_clients, up, down))
+
+    print(f"{'clients':>7}  {'dir':>4}  {'p50':>7}  {'p95':>7}  {'p99':>7}  {'max':>7}")
+    for n_clients, up, down in rows:
+        for label, samples in (("up", up), ("down", down)):
+            ms = [s * 1000 for s in samples]
+            print(
+                f"{n_clients:>7}  {label:>4}  {_percentile(ms, 50):7.3f}  "
+                f"{_percentile(ms, 95):7.3f}  {_percentile(ms, 99):7.3f}  {max(ms):7.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Headless replay of a recorded match, as a repeatable game-engine workload.
+
+Run from the repository root (or with the package installed):
+
+    python -m quantum_type.benchmarks.replay_throughput [--recording match.qtr] [--repeat 50]
+                                           [--cpm 400] [--error-rate 0.05]
+
+Without ``--recording`` a single-player match is recorded first: a bot
+types with exponentially distributed gaps around ``--cpm`` on a simulated
+clock, so the full minute is recorded in a fraction of a second. The
+recording is then replayed ``--repeat`` times into ``HeadlessUI`` as fast
+as possible, through the same engine paths a live match takes, followed by
+a seek to every second of the match. Replays of real matches (from
+``~/.quantum_type/recordings``) make good profiling runs, e.g. under
+``python -m cProfile``.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from quantum_type.benchmarks.engine_throughput import make_text
+from quantum_type.core import GAME_DURATION, GameEngine, GameState, HeadlessUI, Recording, Replayer
+from quantum_type.core.recorder import REC_KEY
+
+
+def record_match(cpm, error_rate, seed=0):
+    """Record a simulated single-player match and load it back"""
+    with tempfile.TemporaryDirectory() as directory:
+        ui = HeadlessUI()
+        engine = GameEngine(GameState(), ui, recording_dir=directory)
+        now = 0.0
+        engine.clock = lambda: now
+        ui.set_game_logic(engine)
+        engine.set_single_player_mode()
+        engine.use_text(make_text(int(cpm * GAME_DURATION / 60) + 1000, seed))
+        engine.start_game()
+
+        rng = random.Random(seed)
+        text = engine.text_content
+        while True:
+            now += rng.expovariate(cpm / 60)
+            if now >= GAME_DURATION or ui.progress >= len(text):
+                break
+            if rng.random() < error_rate:
+                ui.press("#")
+            else:
+                ui.press(text[ui.progress])
+        now = GAME_DURATION
+        engine.end_game()
+        (name,) = os.listdir(directory)
+        path = os.path.join(directory, name)
+        return Recording.load(path), os.path.getsize(path)
+
+
+def run(recording, repeat):
+    callbacks = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        ui = HeadlessUI()
+        callbacks += Replayer(recording, ui, speed=None).run()
+    replay_seconds = time.perf_counter() - start
+
+    replayer = Replayer(recording, HeadlessUI(), speed=None)
+    replayer.start()
+    seeks = [float(s) for s in range(int(recording.duration) + 1)]
+    random.Random(0).shuffle(seeks)
+    start = time.perf_counter()
+    for seconds in seeks:
+        replayer.seek(seconds)
+    seek_seconds = time.perf_counter() - start
+
+    keys = sum(1 for _, kind, _ in recording.events if kind == REC_KEY) * repeat
+    return {
+        "replays": repeat,
+        "events": len(recording.events) * repeat,
+        "keystrokes": keys,
+        "callbacks": callbacks,
+        "seconds": replay_seconds,
+        "us_per_key": replay_seconds / keys * 1e6 if keys else 0.0,
+        "speedup": recording.duration * repeat / replay_seconds if replay_seconds else 0.0,
+        "seeks": len(seeks),
+        "ms_per_seek": seek_seconds / len(seeks) * 1000,
+        "progress": ui.progress,
+        "score": ui.my_score,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recording", help="replay this file instead of a simulated match")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--cpm", type=float, default=400.0, help="keystrokes per minute")
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.recording:
+        recording = Recording.load(args.recording)
+        size = os.path.getsize(args.recording)
+    else:
+        recording, size = record_match(args.cpm, args.error_rate, args.seed)
+    print(
+        f"Recording: {recording.duration:.1f} s, {len(recording.events):,} events, "
+        f"{len(recording.snapshots)} snapshots, {size:,} bytes"
+    )
+    result = run(recording, args.repeat)
+    print(
+        f"{result['replays']} replays, {result['keystrokes']:,} keystrokes in "
+        f"{result['seconds']:.3f} s ({result['us_per_key']:.2f} us each, "
+        f"{result['speedup']:,.0f}x real time), final score {result['score']}"
+    )
+    print(f"{result['seeks']} seeks: {result['ms_per_seek']:.2f} ms each")
+
+
+if __name__ == "__main__":
+    main()
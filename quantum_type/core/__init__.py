@@ -0,0 +1,29 @@
+from .game_state import GameState
+from .typing_target import TypingTarget, normalize_text
+from .keystrokes import KeystrokeLog
+from .analytics import LiveStats
+from .engine import COUNTDOWN_SECONDS, GAME_DURATION, GameEngine
+from .headless_ui import HeadlessUI
+from .recorder import MatchRecorder, Recording
+from .history import MatchHistory
+from .corpus import Corpus
+from .ingest import TextLoader
+from .replay import Replayer
+
+__all__ = [
+    'GameState',
+    'TypingTarget',
+    'normalize_text',
+    'KeystrokeLog',
+    'LiveStats',
+    'GameEngine',
+    'GAME_DURATION',
+    'COUNTDOWN_SECONDS',
+    'HeadlessUI',
+    'MatchRecorder',
+    'Recording',
+    'MatchHistory',
+    'Corpus',
+    'TextLoader',
+    'Replayer',
+]
@@ -0,0 +1,252 @@
+"""Typing speed and accuracy from keystroke logs.
+
+The batch functions take ``KeystrokeLog.columns()`` (or a log) and work a
+column at a time with ``zip``/``map`` over ``array`` objects, without
+building per-record objects, so thousands of saved sessions can be
+processed in one go. Latency results are kept as sums and counts so they
+can be merged across sessions before averaging. ``LiveStats`` is the
+incremental version the engine updates on every key press during a match.
+
+A word is five characters. The engine does not let a wrong key into the
+text, so net WPM counts only correct keystrokes while gross WPM counts all
+of them, and the difference is the mistakes per minute.
+"""
+from bisect import bisect_right
+from collections import Counter, deque
+from itertools import compress
+
+CHARS_PER_WORD = 5
+ROLLING_WINDOW = 10.0  # Seconds of typing the rolling speed covers
+MAX_LATENCY = 2.0  # Longer gaps are pauses, not the time to find a key
+
+
+def _columns(source):
+    return source.columns() if hasattr(source, "columns") else source
+
+
+def wpm(chars, seconds):
+    if seconds <= 0:
+        return 0.0
+    return chars / CHARS_PER_WORD / (seconds / 60)
+
+
+def summary(source, duration=None):
+    """Overall numbers: keystrokes, errors, accuracy and net/gross WPM.
+
+    ``duration`` is the length of the match in seconds; without it the time
+    from the first to the last keystroke is used.
+    """
+    columns = _columns(source)
+    keystrokes = len(columns.times)
+    correct = sum(columns.correct)
+    if duration is None:
+        duration = columns.times[-1] - columns.times[0] if keystrokes > 1 else 0.0
+    return {
+        "keystrokes": keystrokes,
+        "correct": correct,
+        "errors": keystrokes - correct,
+        "accuracy": correct / keystrokes if keystrokes else 1.0,
+        "seconds": duration,
+        "gross_wpm": wpm(keystrokes, duration),
+        "net_wpm": wpm(correct, duration),
+    }
+
+
+def rolling_wpm(source, window=ROLLING_WINDOW, step=1.0):
+    """Net WPM over the trailing ``window`` seconds, every ``step`` seconds.
+
+    Returns a list of ``(seconds since the first key, wpm)``.
+    """
+    columns = _columns(source)
+    if not columns.times:
+        return []
+    start = columns.times[0]
+    # Times of correct keys only, relative to the first key
+    hits = [t - start for t in compress(columns.times, columns.correct)]
+    end = columns.times[-1] - start
+    points = []
+    t = 0.0
+    while t < end:
+        t = min(t + step, end)
+        span = min(window, t)
+        first = bisect_right(hits, t - span) if t > span else 0
+        points.append((t, wpm(bisect_right(hits, t) - first, span)))
+    return points
+
+
+def _latency_sums(columns, max_latency, bigrams=True):
+    """One pass over a session: {codepoint: [count, seconds]} per char and
+    {(codepoint, codepoint): [count, seconds]} per bigram.
+
+    The time to type a char is the gap since the previous key, counted for
+    correct keys only and only when the gap is at most ``max_latency``. A
+    bigram also needs the previous key to be the correct previous char.
+    """
+    times, positions = columns.times, columns.positions
+    expected, correct = columns.expected, columns.correct
+    chars = {}
+    pairs = {}
+    previous = None
+    for time, position, cp, ok in zip(times, positions, expected, correct):
+        if ok and previous is not None:
+            gap = time - previous[0]
+            if gap <= max_latency:
+                entry = chars.get(cp)
+                if entry is None:
+                    chars[cp] = [1, gap]
+                else:
+                    entry[0] += 1
+                    entry[1] += gap
+                if bigrams and previous[3] and previous[1] + 1 == position:
+                    key = (previous[2], cp)
+                    entry = pairs.get(key)
+                    if entry is None:
+                        pairs[key] = [1, gap]
+                    else:
+                        entry[0] += 1
+                        entry[1] += gap
+        previous = (time, position, cp, ok)
+    return chars, pairs
+
+
+def char_latency(source, max_latency=MAX_LATENCY):
+    """{char: [count, total seconds]} of the time it took to type each char"""
+    chars, _ = _latency_sums(_columns(source), max_latency, bigrams=False)
+    return {chr(cp): entry for cp, entry in chars.items()}
+
+
+def bigram_latency(source, max_latency=MAX_LATENCY):
+    """{(previous char, char): [count, total seconds]} for correct keys that
+    follow a correct key at the previous position"""
+    _, pairs = _latency_sums(_columns(source), max_latency)
+    return {(chr(a), chr(b)): entry for (a, b), entry in pairs.items()}
+
+
+def _error_counts(columns):
+    attempts = Counter(columns.expected)
+    mistakes = Counter(compress(columns.expected, map((1).__sub__, columns.correct)))
+    return {cp: [mistakes[cp], count] for cp, count in attempts.items()}
+
+
+def error_heatmap(source):
+    """{char: [mistakes, attempts]} per expected character"""
+    return {chr(cp): entry for cp, entry in _error_counts(_columns(source)).items()}
+
+
+def confusions(source):
+    """Counter of (expected char, typed char) for every wrong key"""
+    columns = _columns(source)
+    wrong = list(map((1).__sub__, columns.correct))
+    return Counter(
+        (chr(expected), chr(typed) if typed else "")
+        for expected, typed in zip(
+            compress(columns.expected, wrong), compress(columns.typed, wrong)
+        )
+    )
+
+
+def error_positions(source):
+    """Counter of text positions that were mistyped, for a heatmap over the text"""
+    columns = _columns(source)
+    return Counter(compress(columns.positions, map((1).__sub__, columns.correct)))
+
+
+def mean_latency(totals):
+    """{key: mean milliseconds} from a latency dict, slowest first"""
+    means = {key: total / count * 1000 for key, (count, total) in totals.items() if count}
+    return dict(sorted(means.items(), key=lambda item: item[1], reverse=True))
+
+
+def merge(into, totals):
+    """Add a latency or heatmap dict into ``into``, in place"""
+    for key, (count, total) in totals.items():
+        entry = into.setdefault(key, [0, 0])
+        entry[0] += count
+        entry[1] += total
+    return into
+
+
+def analyse_sessions(sources, max_latency=MAX_LATENCY):
+    """Aggregate any number of logs into one report"""
+    report = {
+        "sessions": 0,
+        "keystrokes": 0,
+        "correct": 0,
+        "seconds": 0.0,
+        "char_latency": {},
+        "bigram_latency": {},
+        "error_heatmap": {},
+    }
+    for source in sources:
+        columns = _columns(source)
+        numbers = summary(columns)
+        report["sessions"] += 1
+        report["keystrokes"] += numbers["keystrokes"]
+        report["correct"] += numbers["correct"]
+        report["seconds"] += numbers["seconds"]
+        chars, pairs = _latency_sums(columns, max_latency)
+        merge(report["char_latency"], chars)
+        merge(report["bigram_latency"], pairs)
+        merge(report["error_heatmap"], _error_counts(columns))
+    # Sums were kept by codepoint; name them once at the end
+    report["char_latency"] = {chr(cp): entry for cp, entry in report["char_latency"].items()}
+    report["bigram_latency"] = {
+        (chr(a), chr(b)): entry for (a, b), entry in report["bigram_latency"].items()
+    }
+    report["error_heatmap"] = {chr(cp): entry for cp, entry in report["error_heatmap"].items()}
+    keystrokes, correct, seconds = report["keystrokes"], report["correct"], report["seconds"]
+    report["accuracy"] = correct / keystrokes if keystrokes else 1.0
+    report["gross_wpm"] = wpm(keystrokes, seconds)
+    report["net_wpm"] = wpm(correct, seconds)
+    return report
+
+
+class LiveStats:
+    """Speed and accuracy kept up to date one keystroke at a time.
+
+    Every update is O(1) (amortised for the rolling window), so the engine
+    can call ``add`` on each key press and a UI can poll ``snapshot`` as
+    often as it redraws.
+    """
+
+    def __init__(self, window=ROLLING_WINDOW):
+        self.window = window
+        self.reset()
+
+    def reset(self, start=None):
+        self.start = start  # Match start (monotonic); defaults to the first key
+        self.last = None
+        self.keystrokes = 0
+        self.correct = 0
+        self._recent = deque()  # Times of recent correct keys
+
+    def add(self, time, correct):
+        if self.start is None:
+            self.start = time
+        self.last = time
+        self.keystrokes += 1
+        if correct:
+            self.correct += 1
+            self._recent.append(time)
+        self._trim(time)
+
+    def _trim(self, now):
+        recent = self._recent
+        while recent and recent[0] < now - self.window:
+            recent.popleft()
+
+    def snapshot(self, now=None):
+        """{net_wpm, gross_wpm, rolling_wpm, accuracy, keystrokes, errors}"""
+        now = self.last if now is None else now
+        elapsed = now - self.start if self.start is not None and now is not None else 0.0
+        if now is not None:
+            self._trim(now)
+        span = min(self.window, elapsed)
+        return {
+            "keystrokes": self.keystrokes,
+            "errors": self.keystrokes - self.correct,
+            "accuracy": self.correct / self.keystrokes if self.keystrokes else 1.0,
+            "gross_wpm": wpm(self.keystrokes, elapsed),
+            "net_wpm": wpm(self.correct, elapsed),
+            "rolling_wpm": wpm(len(self._recent), span),
+        }
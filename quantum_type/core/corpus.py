@@ -0,0 +1,410 @@
+"""A directory of practice texts, indexed for random passages.
+
+``Corpus.open`` scans every ``*.txt`` file under a directory once and keeps
+an index next to them (``INDEX_NAME``). For every paragraph the index has
+its character count, character-set stats (capitals, digits, symbols,
+non-ASCII characters, words) and a difficulty score, and for every sentence
+its byte range and character count. Files whose size and modification time
+have not changed are taken over from the previous index instead of being
+scanned again.
+
+``passage`` picks a paragraph (optionally in a difficulty band), then
+whole sentences from there on until the target length is reached, and
+reads just those bytes through ``mmap``. Nothing else of the file is
+loaded, so a gigabyte corpus costs no more per passage than a small one.
+
+Texts are read as UTF-8; other encodings still index, with undecodable
+bytes shown as U+FFFD.
+"""
+import json
+import mmap
+import os
+import random
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+from quantum_type.logs import get_logger
+
+log = get_logger("corpus")
+
+CORPUS_DIR = os.path.join(os.path.expanduser("~"), ".quantum_type", "corpus")
+INDEX_NAME = ".corpus-index"
+DEFAULT_LENGTH = 400  # Characters in a passage
+DIFFICULTY_TOLERANCE = 5.0
+MAX_OPEN_FILES = 16
+
+# Paragraphs are separated by blank lines
+_PARAGRAPH_BREAK = re.compile(rb"\r?\n(?:[ \t]*\r?\n)+")
+# A sentence ends with . ! or ? (and closing quotes or brackets) before
+# whitespace, or with a CJK full stop, exclamation or question mark
+_SENTENCE_END = re.compile(rb"[.!?]+[\"')\]]*(?=\s)|\xe3\x80\x82|\xef\xbc[\x81\x9f]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _keep_only(allowed):
+    """A ``bytes.translate`` delete table that removes every other byte"""
+    return bytes(b for b in range(256) if b not in allowed)
+
+
+_UPPER = _keep_only(range(ord("A"), ord("Z") + 1))
+_DIGITS = _keep_only(range(ord("0"), ord("9") + 1))
+# ASCII punctuation that needs a reach or Shift; . , and ' are home keys
+_SYMBOLS = _keep_only(b for b in range(33, 127) if chr(b) in "!\"#$%&()*+-/:;<=>?@[\\]^_`{|}~")
+_CONTINUATION = _keep_only(range(0x80, 0xC0))  # Bytes inside a UTF-8 sequence
+_LEADING = _keep_only(range(0xC0, 0x100))  # First byte of a non-ASCII char
+
+# Columns of the index, with their array typecodes
+_PARAGRAPH_COLUMNS = (
+    ("first_sentence", "I"),
+    ("chars", "I"),
+    ("upper", "I"),
+    ("digits", "I"),
+    ("symbols", "I"),
+    ("non_ascii", "I"),
+    ("words", "I"),
+    ("difficulty", "f"),
+)
+_SENTENCE_COLUMNS = (
+    ("start", "Q"),
+    ("end", "Q"),
+    ("chars", "I"),
+)
+
+_MAGIC = b"QTCX"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHI")  # Magic, version, length of the JSON file table
+
+
+def difficulty(chars, upper, digits, symbols, non_ascii, words):
+    """Roughly how hard a text is to type: longer words, capitals, digits,
+    symbols and characters off the keyboard all make it harder"""
+    if not chars:
+        return 0.0
+    return (
+        8.0 * chars / max(1, words)
+        + 100.0 * upper / chars
+        + 150.0 * digits / chars
+        + 200.0 * symbols / chars
+        + 300.0 * non_ascii / chars
+    )
+
+
+def _columns(spec):
+    return {name: array(typecode) for name, typecode in spec}
+
+
+def _char_count(data, ascii_only):
+    return len(data) if ascii_only else len(data) - len(data.translate(None, _CONTINUATION))
+
+
+def _scan(data, paragraphs, sentences):
+    """Append the paragraphs and sentences of one file's bytes to the columns"""
+    size = len(data)
+    starts = [0]
+    ends = []
+    for match in _PARAGRAPH_BREAK.finditer(data):
+        ends.append(match.start())
+        starts.append(match.end())
+    ends.append(size)
+
+    for start, end in zip(starts, ends):
+        block = data[start:end]
+        stripped = block.strip()
+        if not stripped:
+            continue
+        start += len(block) - len(block.lstrip())
+        block = stripped
+        non_ascii = len(block.translate(None, _LEADING))
+        ascii_only = non_ascii == 0 and not block.translate(None, _CONTINUATION)
+        chars = _char_count(block, ascii_only)
+        upper = len(block.translate(None, _UPPER))
+        digits = len(block.translate(None, _DIGITS))
+        symbols = len(block.translate(None, _SYMBOLS))
+        words = len(block.split())
+        paragraphs["first_sentence"].append(len(sentences["start"]))
+        paragraphs["chars"].append(chars)
+        paragraphs["upper"].append(upper)
+        paragraphs["digits"].append(digits)
+        paragraphs["symbols"].append(symbols)
+        paragraphs["non_ascii"].append(non_ascii)
+        paragraphs["words"].append(words)
+        paragraphs["difficulty"].append(
+            difficulty(chars, upper, digits, symbols, non_ascii, words)
+        )
+
+        cuts = [match.end() for match in _SENTENCE_END.finditer(block)]
+        if not cuts or cuts[-1] != len(block):
+            cuts.append(len(block))
+        previous = 0
+        for cut in cuts:
+            sentence = block[previous:cut]
+            lead = len(sentence) - len(sentence.lstrip())
+            if lead < len(sentence):
+                sentences["start"].append(start + previous + lead)
+                sentences["end"].append(start + cut)
+                sentences["chars"].append(_char_count(sentence[lead:], ascii_only))
+            previous = cut
+
+
+class Corpus:
+    """The index of a corpus directory and the passages drawn from it"""
+
+    def __init__(self, directory, files, paragraphs, sentences, order=None, seed=None):
+        self.directory = directory
+        # [{path, size, mtime, paragraphs: [first, end), sentences: [first, end)}]
+        self.files = files
+        self.paragraphs = paragraphs
+        self.sentences = sentences
+        self.random = random.Random(seed)
+        self._file_ends = [entry["sentences"][1] for entry in files]
+        # Paragraph ids ordered by difficulty, for picking from a band
+        difficulties = paragraphs["difficulty"]
+        if order is None:
+            order = array("I", sorted(range(len(difficulties)), key=difficulties.__getitem__))
+        self.order = order
+        self._difficulties = array("f", map(difficulties.__getitem__, order))
+        self._maps = OrderedDict()  # file id -> (file, mmap), least recently used first
+
+    def __len__(self):
+        return len(self.paragraphs["chars"])
+
+    @property
+    def chars(self):
+        return sum(self.paragraphs["chars"])
+
+    # Building and saving
+
+    @classmethod
+    def open(cls, directory=CORPUS_DIR, index_path=None, seed=None):
+        """The corpus in directory, updating its index if any file changed"""
+        index_path = index_path or os.path.join(directory, INDEX_NAME)
+        previous = None
+        try:
+            previous = cls.load(directory, index_path, seed=seed)
+        except (OSError, ValueError) as e:
+            log.info("Building corpus index for %s (%s)", directory, e)
+        current = cls._listing(directory)
+        if previous is not None and [
+            (f["path"], f["size"], f["mtime"]) for f in previous.files
+        ] == current:
+            return previous
+        corpus = cls.build(directory, previous, seed)
+        try:
+            corpus.save(index_path)
+        except OSError as e:
+            log.warning("Could not save corpus index %s: %s", index_path, e)
+        return corpus
+
+    @staticmethod
+    def _listing(directory):
+        """(relative path, size, mtime) of every text file, in a stable order"""
+        listing = []
+        for root, dirs, names in os.walk(directory):
+            dirs.sort()
+            for name in sorted(names):
+                if name.lower().endswith(".txt"):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    listing.append(
+                        (os.path.relpath(path, directory), stat.st_size, stat.st_mtime_ns)
+                    )
+        return listing
+
+    @classmethod
+    def build(cls, directory, previous=None, seed=None):
+        """Scan directory, reusing what previous indexed of unchanged files"""
+        known = {}
+        if previous is not None:
+            known = {(f["path"], f["size"], f["mtime"]): f for f in previous.files}
+        files = []
+        paragraphs = _columns(_PARAGRAPH_COLUMNS)
+        sentences = _columns(_SENTENCE_COLUMNS)
+        scanned = 0
+        for path, size, mtime in cls._listing(directory):
+            first = (len(paragraphs["chars"]), len(sentences["start"]))
+            old = known.get((path, size, mtime))
+            if old is not None:
+                cls._copy(previous, old, paragraphs, sentences)
+            elif size:
+                with open(os.path.join(directory, path), "rb") as file:
+                    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                        _scan(data, paragraphs, sentences)
+                scanned += 1
+            files.append({
+                "path": path,
+                "size": size,
+                "mtime": mtime,
+                "paragraphs": [first[0], len(paragraphs["chars"])],
+                "sentences": [first[1], len(sentences["start"])],
+            })
+        log.info(
+            "Indexed %d files (%d scanned): %d paragraphs, %d sentences",
+            len(files), scanned, len(paragraphs["chars"]), len(sentences["start"]),
+        )
+        return cls(directory, files, paragraphs, sentences, seed=seed)
+
+    @staticmethod
+    def _copy(previous, entry, paragraphs, sentences):
+        p_first, p_end = entry["paragraphs"]
+        s_first, s_end = entry["sentences"]
+        shift = len(sentences["start"]) - s_first
+        for name, column in paragraphs.items():
+            part = previous.paragraphs[name][p_first:p_end]
+            if name == "first_sentence":
+                part = array("I", (i + shift for i in part))
+            column.extend(part)
+        for name, column in sentences.items():
+            column.extend(previous.sentences[name][s_first:s_end])
+
+    def save(self, path):
+        """Write the index: a header, the file table as JSON, the counts, then
+        each paragraph column, the difficulty order and each sentence column"""
+        table = json.dumps(self.files).encode()
+        columns = [self.paragraphs[name] for name, _ in _PARAGRAPH_COLUMNS]
+        columns.append(self.order)
+        columns += [self.sentences[name] for name, _ in _SENTENCE_COLUMNS]
+        counts = struct.pack("<QQ", len(self), len(self.sentences["start"]))
+        temp = f"{path}.tmp"
+        with open(temp, "wb") as file:
+            file.write(_HEADER.pack(_MAGIC, _VERSION, len(table)))
+            file.write(table)
+            file.write(counts)
+            for column in columns:
+                if sys.byteorder == "big":
+                    column = array(column.typecode, column)
+                    column.byteswap()
+                file.write(column.tobytes())
+        os.replace(temp, path)
+
+    @classmethod
+    def load(cls, directory, path, seed=None):
+        with open(path, "rb") as file:
+            data = file.read()
+        if len(data) < _HEADER.size:
+            raise ValueError("Not a corpus index")
+        magic, version, table_size = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Not a corpus index")
+        view = memoryview(data)
+        offset = _HEADER.size
+        files = json.loads(data[offset:offset + table_size])
+        offset += table_size
+        counts = struct.unpack_from("<QQ", data, offset)
+        offset += 16
+        paragraphs = _columns(_PARAGRAPH_COLUMNS)
+        order = array("I")
+        sentences = _columns(_SENTENCE_COLUMNS)
+        layout = [(column, counts[0]) for column in paragraphs.values()]
+        layout.append((order, counts[0]))
+        layout += [(column, counts[1]) for column in sentences.values()]
+        for column, count in layout:
+            size = column.itemsize * count
+            column.frombytes(view[offset:offset + size])
+            if sys.byteorder == "big":
+                column.byteswap()
+            offset += size
+            if len(column) != count:
+                raise ValueError("Truncated corpus index")
+        return cls(directory, files, paragraphs, sentences, order, seed)
+
+    # Passages
+
+    def _map(self, file_id):
+        entry = self._maps.get(file_id)
+        if entry is not None:
+            self._maps.move_to_end(file_id)
+            return entry[1]
+        file = open(os.path.join(self.directory, self.files[file_id]["path"]), "rb")
+        try:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            file.close()
+            raise
+        self._maps[file_id] = (file, data)
+        if len(self._maps) > MAX_OPEN_FILES:
+            _, (old_file, old_data) = self._maps.popitem(last=False)
+            old_data.close()
+            old_file.close()
+        return data
+
+    def close(self):
+        for file, data in self._maps.values():
+            data.close()
+            file.close()
+        self._maps.clear()
+
+    def pick_paragraph(self, difficulty=None, tolerance=DIFFICULTY_TOLERANCE):
+        """A random paragraph id, near ``difficulty`` if given"""
+        if not len(self):
+            raise ValueError("The corpus has no text")
+        if difficulty is None:
+            return self.random.randrange(len(self))
+        lo = bisect_left(self._difficulties, difficulty - tolerance)
+        hi = bisect_right(self._difficulties, difficulty + tolerance)
+        if lo == hi:
+            # Nothing in the band: the closest paragraph on either side
+            nearest = min(
+                (i for i in (lo - 1, lo) if 0 <= i < len(self)),
+                key=lambda i: abs(self._difficulties[i] - difficulty),
+            )
+            lo, hi = nearest, nearest + 1
+        return self.order[self.random.randrange(lo, hi)]
+
+    def passage(self, length=DEFAULT_LENGTH, difficulty=None, tolerance=DIFFICULTY_TOLERANCE):
+        """A random run of whole sentences of about ``length`` characters"""
+        paragraph = self.pick_paragraph(difficulty, tolerance)
+        return self.read(*self.span(paragraph, length))
+
+    def span(self, paragraph, length):
+        """File id, first and last sentence id of a passage starting in paragraph"""
+        first_sentence = self.paragraphs["first_sentence"][paragraph]
+        file_id = bisect_right(self._file_ends, first_sentence)
+        file_first, file_end = self.files[file_id]["sentences"]
+        chars = self.sentences["chars"]
+        end_sentence = (
+            self.paragraphs["first_sentence"][paragraph + 1]
+            if paragraph + 1 < len(self) else len(chars)
+        )
+        first = self.random.randrange(first_sentence, end_sentence)
+        last = first
+        total = chars[first]
+        # Whole sentences forward, then backward if the file runs out
+        while total < length and last + 1 < file_end:
+            last += 1
+            total += chars[last]
+        while total < length and first > file_first:
+            first -= 1
+            total += chars[first]
+        return file_id, first, last
+
+    def read(self, file_id, first, last):
+        """The text of sentences first..last, with paragraphs on their own lines"""
+        data = self._map(file_id)
+        raw = data[self.sentences["start"][first]:self.sentences["end"][last]]
+        # Hard-wrapped lines join up; only paragraph breaks stay as Enter
+        blocks = (
+            _WHITESPACE.sub(" ", block.decode("utf-8", errors="replace")).strip()
+            for block in _PARAGRAPH_BREAK.split(raw)
+        )
+        return "\n".join(block for block in blocks if block)
+
+
+def open_corpus(directory=None):
+    """The corpus in directory (``CORPUS_DIR`` if it exists by default), or
+    None (and a warning) if there is none or it can't be read"""
+    if directory is None:
+        if not os.path.isdir(CORPUS_DIR):
+            return None
+        directory = CORPUS_DIR
+    elif not os.path.isdir(directory):
+        log.warning("Corpus disabled, %s is not a directory", directory)
+        return None
+    try:
+        return Corpus.open(directory)
+    except OSError as e:
+        log.warning("Corpus disabled, could not read %s: %s", directory, e)
+        return None
@@ -0,0 +1,752 @@
+import math
+import queue
+import socket
+import time
+
+from quantum_type.core.corpus import DEFAULT_LENGTH
+from quantum_type.core.history import match_record
+from quantum_type.core.ingest import LoadCancelled, TextLoader
+from quantum_type.core.keystrokes import NO_CHAR
+from quantum_type.core.recorder import RECORDING_DIR, MatchRecorder
+from quantum_type.core.typing_target import KEYSYMS, MODIFIER_KEYSYMS, TypingTarget
+from quantum_type.logs import get_logger
+from quantum_type.network import create_network_handler
+from quantum_type.network.scoreboard import rank_players, winner_of
+from quantum_type.network.text_transfer import text_digest
+
+GAME_DURATION = 60
+COUNTDOWN_SECONDS = 3
+DEFAULT_PORT = 12345
+QUEUE_POLL_MS = 100  # How often network messages are handled on the UI thread
+LOAD_POLL_MS = 50  # How often a text being loaded reports its progress
+
+log = get_logger("game")
+
+# Codepoint a named key types, for the keystroke log
+_KEYSYM_CODEPOINTS = {name: cp for cp, names in KEYSYMS.items() for name in names}
+
+
+class GameEngine:
+    """The rules of a match, independent of any toolkit.
+
+    The engine owns the game state, the countdown and match timers, the
+    keystroke checks and the handling of network messages. It only talks
+    to the frontend through the ``AbstractUI`` interface, including for
+    scheduling (``ui.after``), so the Tk and pygame frontends and the
+    headless runner all drive the same code.
+
+    Every match is recorded to ``recording_dir`` (see ``core.recorder``);
+    pass None to record nothing. Results are saved to ``history``, a
+    ``core.history.MatchHistory``, when there is one. Random passages come
+    from ``corpus``, a ``core.corpus.Corpus``, when there is one.
+    """
+
+    def __init__(self, game_state, ui, recording_dir=RECORDING_DIR, history=None,
+                 corpus=None):
+        self.state = game_state
+        self.ui = ui
+        self.text_content = ""
+        self.target = TypingTarget("")  # Compiled form of text_content
+        self._timer_job = None  # Pending countdown / timer callback
+        self.clock = time.monotonic  # Local clock; a replay brings its own
+        self.recording_dir = recording_dir
+        self.recorder = None  # MatchRecorder of the match being played
+        self.history = history
+        self.corpus = corpus
+        self._text_digest = None
+        self._loader = None  # TextLoader of the file being read
+        self._loader_job = None
+
+    def set_single_player_mode(self):
+        self.state.is_single_player = True
+        self.ui.hide_multiplayer_elements()
+        self.ui.set_start_enabled(True)
+        self.ui.set_back_enabled(True)
+
+    def set_host_mode(self):
+        self.state.is_host = True
+        self.state.is_single_player = False
+        self.state.player_id = 0
+        self.state.players = {0: {"name": "Host", "progress": 0, "score": 0}}
+        self.ui.set_back_enabled(True)
+
+        # Get local IP address instead of possibly getting WAN IP
+        try:
+            # This trick gets the IP used to connect to local network
+            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            s.connect(("8.8.8.8", 80))  # Google's DNS server
+            host_ip = s.getsockname()[0]
+            s.close()
+        except:
+            # Fallback if the above method fails
+            host_ip = socket.gethostbyname(socket.gethostname())
+
+        self.state.network = create_network_handler(True, host_ip, DEFAULT_PORT)
+        self.state.network.set_game(self)
+        self.state.network.start()
+        # Show host information in UI
+        self.ui.display_host_info(host_ip)
+        return host_ip
+
+    def set_client_mode(self, host_ip):
+        self.state.is_host = False
+        self.state.is_single_player = False
+        self.state.player_id = None  # Assigned by the host in CLIENT_JOINED
+        self.state.players = {}
+        self.state.network = create_network_handler(False, host_ip, DEFAULT_PORT)
+        self.state.network.set_game(self)
+        self.state.network.connect(host_ip)
+        self.state.network.start()
+
+    def start_game(self):
+        if not self.state.is_single_player:
+            # 開始倒計時而不是直接開始遊戲
+            self.start_countdown()
+        else:
+            self.start_actual_game()
+
+    def host_now(self):
+        """Now on the match timeline: the host's monotonic clock"""
+        if self.state.network and not self.state.is_single_player:
+            return self.state.network.host_time()
+        return self.clock()
+
+    def clock_synced(self):
+        return bool(self.state.network) and self.state.network.clock_synced
+
+    def _after_host_time(self, host_time, callback):
+        """Run callback when the host clock reaches host_time"""
+        delay = max(0, math.ceil((host_time - self.host_now()) * 1000))
+        return self.ui.after(delay, callback)
+
+    def start_countdown(self):
+        # 倒計時結束的時刻以主機時間表示，所有玩家同時開始
+        start_at = self.host_now() + COUNTDOWN_SECONDS
+        if self.state.is_host:
+            # 主機發送倒計時開始的消息
+            msg = {
+                "type": "COUNTDOWN_START",
+                "time": time.time(),
+                "start_at": start_at,
+                "duration": GAME_DURATION,
+            }
+            self.state.network.send_message(msg)
+        self.countdown(start_at)
+
+    def countdown(self, start_at):
+        self.reset_match()
+        self.state.start_at = start_at
+        self._cancel_timer()
+        self.start_recording()
+        self._countdown_tick()
+
+    def _countdown_tick(self):
+        remaining = self.state.start_at - self.host_now()
+        if remaining > 0:
+            # 顯示當前倒計時數字，到下一個整秒時再更新
+            count = math.ceil(remaining)
+            self.ui.show_countdown(count)
+            self._timer_job = self._after_host_time(
+                self.state.start_at - (count - 1), self._countdown_tick
+            )
+        else:
+            # 倒計時結束，開始遊戲
+            self._timer_job = None
+            self.ui.hide_countdown()
+            self.start_actual_game()
+
+    def start_actual_game(self):
+        if self.state.game_started:
+            return
+        if self.state.start_at is None or self.state.is_single_player:
+            self.state.start_at = self.host_now()
+        self.state.start_time = time.time()
+        self.state.game_started = True
+        self.start_recording()
+        self.state.keystrokes.clear()
+        self.state.stats.reset(self.clock())
+        self.start_timer()
+        self.ui.bind_key_press(self.on_key_press)
+        self.highlight_current_character()
+        if not self.state.is_single_player and self.state.is_host:
+            msg = {
+                "type": "START",
+                "start_time": self.state.start_time,
+                "start_at": self.state.start_at,
+                "duration": GAME_DURATION,
+            }
+            self.state.network.send_message(msg)
+
+    def _cancel_timer(self):
+        if self._timer_job is not None:
+            self.ui.after_cancel(self._timer_job)
+            self._timer_job = None
+
+    def start_timer(self):
+        """Update the clock display on every whole second of the match"""
+        self._cancel_timer()
+        if self.state.game_started:
+            end_at = self.state.start_at + GAME_DURATION
+            remaining = end_at - self.host_now()
+            if remaining > 0:
+                self.ui.update_timer_display(remaining)
+                self.ui.update_stats(self.state.stats.snapshot(self.clock()))
+                next_second = end_at - (math.ceil(remaining) - 1)
+                self._timer_job = self._after_host_time(next_second, self.start_timer)
+            else:
+                self.end_game()
+
+    def end_game(self):
+        self.state.game_started = False
+        if self.state.is_single_player or self.state.is_host:
+            # A client keeps recording until the host's END arrives
+            self.stop_recording()
+        self.ui.update_stats(self.state.stats.snapshot(self.clock()))
+        if self.state.is_single_player:
+            self.save_result()
+            self.ui.show_result("", self.state.my_score, None)
+        elif self.state.is_host:
+            ranking = self.ranking()
+            winner = winner_of(ranking)
+            msg = {"type": "END", "winner": winner, "ranking": ranking}
+            self.state.network.send_message(msg)
+            self.save_result(ranking, winner)
+            self.ui.show_result(winner, self.state.my_score, None, ranking)
+
+    def ranking(self):
+        """Everyone in the match ordered by score, including this player"""
+        players = {pid: dict(info) for pid, info in self.state.players.items()}
+        me = players.setdefault(self.state.player_id, {"name": "Host"})
+        me["score"] = self.state.my_score
+        return rank_players(players)
+
+    def determine_winner(self):
+        return winner_of(self.ranking())
+
+    def update_player(self, player_id, progress, score):
+        if player_id is None or player_id == self.state.player_id:
+            return
+        player = self.state.players.setdefault(
+            player_id, {"name": f"Player {player_id}", "progress": 0, "score": 0}
+        )
+        player["progress"] = progress
+        player["score"] = score
+
+    def reset_match(self):
+        """Clear everything one match leaves behind: progress, scores,
+        the keystroke log and the live stats"""
+        self.state.my_progress = 0
+        self.state.my_score = 0
+        self.state.keystrokes.clear()
+        self.state.stats.reset()
+        for player in self.state.players.values():
+            player["progress"] = 0
+            player["score"] = 0
+        self.ui.update_score_display(self.state.my_score)
+        self.refresh_opponents()
+        self.highlight_current_character()
+
+    def refresh_opponents(self):
+        opponents = {
+            pid: info
+            for pid, info in self.state.players.items()
+            if pid != self.state.player_id
+        }
+        self.ui.update_players(opponents)
+        if opponents:
+            # The big opponent pane follows whoever is in the lead
+            leader = max(opponents.values(), key=lambda info: info["score"])
+            self.ui.update_opponent_progress(leader["progress"])
+            self.ui.update_score_display(self.state.my_score, leader["score"])
+
+    def set_players(self, rows):
+        """Apply a PLAYERS list of [player_id, name], keeping known progress"""
+        players = {}
+        for player_id, name in rows:
+            info = self.state.players.get(player_id, {"progress": 0, "score": 0})
+            info["name"] = name
+            players[player_id] = info
+        self.state.players = players
+
+    def resume_from_snapshot(self, msg):
+        """Catch up after a reconnect from the host's SNAPSHOT"""
+        self.state.player_id = msg["player_id"]
+        self.set_players(msg["names"])
+        for player_id, index, score in msg["players"]:
+            self.update_player(player_id, index, score)
+        self.refresh_opponents()
+
+        index, score = msg["progress"]
+        if msg["digest"] and msg["digest"] == self.state.network.text_digest:
+            if index > self.state.my_progress:
+                # The host saw more than we remember (e.g. after a restart)
+                self.state.my_progress, self.state.my_score = index, score
+                self.ui.update_score_display(self.state.my_score)
+                self.highlight_current_character()
+            elif self.state.my_progress > index:
+                # Keystrokes typed while we were offline
+                self.send_progress()
+
+        if msg["phase"] == "countdown" and msg["start_at"] is not None:
+            self.countdown(msg["start_at"])
+        elif msg["phase"] == "playing":
+            self.state.start_at = self.host_now() - (msg["duration"] - msg["remaining"])
+            if not self.state.game_started:
+                self.state.game_started = True
+                self.ui.bind_key_press(self.on_key_press)
+                self.highlight_current_character()
+            self.start_timer()
+        elif self.state.game_started:
+            # The match ended while we were away; END will not be resent
+            self.state.game_started = False
+            self.stop_recording()
+            self.halt()
+
+    def send_progress(self):
+        msg = {
+            "type": "PROGRESS",
+            "player": self.state.player_id,
+            "index": self.state.my_progress,
+            "score": self.state.my_score,
+        }
+        self.state.network.send_message(msg)
+
+    def set_text(self, text):
+        """Normalise and index a new practice text; returns the text as typed"""
+        return self.set_target(TypingTarget(text))
+
+    def set_target(self, target):
+        """Make an already compiled TypingTarget the practice text"""
+        self.target = target
+        self.text_content = target.text
+        self._text_digest = None
+        return self.text_content
+
+    @property
+    def text_digest(self):
+        """SHA-256 of the practice text, which names it in recordings and history"""
+        if self._text_digest is None:
+            self._text_digest = text_digest(self.text_content)
+        return self._text_digest
+
+    def on_key_press(self, event):
+        """Key handler given to ``ui.bind_key_press``; ``event`` has Tk's
+        ``char`` and ``keysym``. Frontends with other events override this
+        and call ``on_key``."""
+        self.on_key(event.char, event.keysym)
+
+    def on_key(self, char, keysym):
+        if self.state.game_started:
+            self.process_key_input(char, keysym)
+
+    def process_key_input(self, char, keysym):
+        if keysym in MODIFIER_KEYSYMS:
+            return
+        progress = self.state.my_progress
+        if self.target.is_complete(progress):
+            return
+
+        # 換行符需按 Enter 鍵，其他字符需輸入相同字符
+        correct = self.target.matches(progress, char, keysym)
+        self.record_keystroke(progress, char, keysym, correct)
+        if correct:
+            self.state.my_progress += 1
+            self.state.my_score += 1
+            self.ui.update_score_display(self.state.my_score)
+            self.highlight_current_character()
+            if not self.state.is_single_player:
+                self.send_progress()
+        else:
+            # 錯誤輸入，顯示紅色高亮提示
+            self.ui.show_error_highlight(progress)
+
+    def record_keystroke(self, position, char, keysym, correct):
+        self.log_keystroke(self.clock(), position, char, keysym, correct)
+        if self.recorder is not None:
+            self._record(self.recorder.key, position, char, keysym, correct)
+
+    def log_keystroke(self, now, position, char, keysym, correct):
+        """Add a key press to the keystroke log and the live stats"""
+        typed = _KEYSYM_CODEPOINTS.get(keysym) or (ord(char[0]) if char else NO_CHAR)
+        self.state.keystrokes.append(
+            now, position, self.target.codepoints[position], typed, correct
+        )
+        self.state.stats.add(now, correct)
+
+    # Recording
+
+    def start_recording(self):
+        """Record the match from here on, unless it already is"""
+        if self.recorder is not None or self.recording_dir is None:
+            return
+        now = self.host_now()
+        info = {
+            "is_host": self.state.is_host,
+            "is_single_player": self.state.is_single_player,
+            "room": self.state.room_code,
+            "started": time.time(),
+        }
+        self.recorder = MatchRecorder.create(
+            self.recording_dir, now, info, self.text_content, self.text_digest
+        )
+        if self.recorder is not None:
+            self.recorder.snapshot(now, self.save_state(now))
+
+    def save_result(self, ranking=None, winner=""):
+        """Hand the finished match to the history database"""
+        if self.history is None:
+            return
+        stats = self.state.stats.snapshot(self.clock())
+        me = {
+            "player": self.history.player_name,
+            "score": self.state.my_score,
+            "rank": 1,
+            "me": True,
+            "keystrokes": stats["keystrokes"],
+            "errors": stats["errors"],
+            "accuracy": stats["accuracy"],
+            "net_wpm": stats["net_wpm"],
+            "gross_wpm": stats["gross_wpm"],
+        }
+        results = [me]
+        for entry in ranking or ():
+            if entry["player"] == self.state.player_id:
+                me["rank"] = entry["rank"]
+            else:
+                results.append(
+                    {"player": entry["name"], "score": entry["score"], "rank": entry["rank"]}
+                )
+        if self.state.is_single_player:
+            mode = "single"
+        else:
+            mode = "host" if self.state.is_host else "client"
+        self.history.record_match(
+            match_record(self.text_digest, mode, GAME_DURATION, results, winner)
+        )
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close(self.host_now())
+            self.recorder = None
+
+    def _record(self, write, *args):
+        """Write a record now, after a snapshot if one is due"""
+        now = self.host_now()
+        recorder = self.recorder
+        if recorder.snapshot_due(now):
+            recorder.snapshot(now, self.save_state(recorder.origin))
+        write(now, *args)
+
+    def save_state(self, origin=0.0):
+        """What a replay needs to pick the match up here; times are
+        relative to origin on the host's timeline"""
+        state = self.state
+        return {
+            "player_id": state.player_id,
+            "players": [[pid, info] for pid, info in state.players.items()],
+            "progress": state.my_progress,
+            "score": state.my_score,
+            "started": state.game_started,
+            "start_at": None if state.start_at is None else state.start_at - origin,
+        }
+
+    def restore_state(self, saved, origin=0.0):
+        """Put the match back the way ``save_state`` found it"""
+        state = self.state
+        self._cancel_timer()
+        state.player_id = saved["player_id"]
+        state.players = {pid: dict(info) for pid, info in saved["players"]}
+        state.my_progress = saved["progress"]
+        state.my_score = saved["score"]
+        state.game_started = saved["started"]
+        state.start_at = None if saved["start_at"] is None else origin + saved["start_at"]
+        self.ui.update_score_display(state.my_score)
+        self.refresh_opponents()
+        self.highlight_current_character()
+        self.resume()
+
+    def halt(self):
+        """Stop the match clock and key handling, leaving the state as it is"""
+        self._cancel_timer()
+        self.ui.unbind_key_press()
+
+    def resume(self):
+        """Restart the clock (and key handling) for the phase the match is in"""
+        if self.state.game_started:
+            self.ui.bind_key_press(self.on_key_press)
+            self.start_timer()
+        elif self.state.start_at is not None and self.host_now() < self.state.start_at:
+            self.countdown(self.state.start_at)
+        else:
+            self.ui.hide_countdown()
+            self.ui.unbind_key_press()
+
+    def process_queue(self):
+        """Handle queued network messages, then check again in a moment"""
+        if not self.state.is_single_player:
+            try:
+                while True:
+                    msg = self.state.queue.get_nowait()
+                    log.debug("Processing message: %s", msg["type"])
+                    self.handle_message(msg)
+            except queue.Empty:
+                pass
+        self.ui.after(QUEUE_POLL_MS, self.process_queue)
+
+    def handle_message(self, msg):
+        if self.recorder is not None:
+            self._record(self.recorder.message, msg)
+        if msg["type"] == "CLIENT_JOINED":
+            if not self.state.is_host and "player_id" in msg:
+                self.state.player_id = msg["player_id"]
+            # A status line, not a dialog: joins must not block the lobby
+            self.ui.set_start_enabled(True)
+            if self.state.is_host:
+                self.ui.set_status("客戶端已連接，可以開始遊戲", "green")
+            else:
+                self.ui.set_status("已加入房間", "green")
+        elif msg["type"] == "PLAYERS":
+            self.set_players(msg["players"])
+            self.refresh_opponents()
+        elif msg["type"] == "SNAPSHOT":
+            self.resume_from_snapshot(msg)
+        elif msg["type"] == "CONNECTION":
+            # The network layer lost the host and is reconnecting on its own
+            if msg["state"] == "reconnecting":
+                self.ui.set_status(
+                    f"連線中斷，正在重新連線 (第{msg['attempt']}次)...", "red"
+                )
+            elif msg["state"] == "connected":
+                self.ui.set_status("已重新連線", "green")
+            elif msg["state"] == "lost":
+                self.ui.set_status("無法重新連線到主機", "red")
+                self.ui.show_error("連接錯誤", "與主機的連線已中斷")
+        elif msg["type"] == "CLIENT_CONNECTED":
+            # Host receives confirmation from client
+            if self.state.is_host:
+                self.ui.set_status("客戶端已連接，可以開始遊戲", "green")
+                self.ui.set_start_enabled(True)
+        elif msg["type"] == "START":
+            self.state.start_time = msg["start_time"]
+            if "start_at" in msg and self.clock_synced():
+                self.state.start_at = msg["start_at"]
+            elif not self.state.game_started:
+                # No shared timeline with this host: the match starts now
+                self.state.start_at = self.host_now()
+            self.state.game_started = True
+            self.start_recording()
+            # Make sure opponent text is visible for client
+            if not self.state.is_host:
+                self.ui.show_multiplayer_elements()
+                # Set initial highlight for client
+                self.highlight_current_character()
+            self.start_timer()
+            self.ui.bind_key_press(self.on_key_press)
+        elif msg["type"] == "PROGRESS":
+            # Host only: the network layer stamps the sender's player id
+            self.update_player(msg.get("player"), msg["index"], msg["score"])
+            self.refresh_opponents()
+        elif msg["type"] == "SCOREBOARD":
+            for player_id, index, score in msg["players"]:
+                self.update_player(player_id, index, score)
+            self.refresh_opponents()
+        elif msg["type"] == "END":
+            self.state.game_started = False
+            self.stop_recording()
+            self.save_result(msg.get("ranking"), msg["winner"])
+            self.ui.show_result(
+                msg["winner"], self.state.my_score, None, msg.get("ranking")
+            )
+            self.ui.unbind_key_press()
+        elif msg["type"] == "NOTICE":
+            # Errors and notes from the network thread, which can't touch the UI
+            if msg["level"] == "error":
+                self.ui.show_error(msg["title"], msg["message"])
+            else:
+                self.ui.show_info(msg["title"], msg["message"])
+        elif msg["type"] == "TEXT_TRANSFER":
+            # Progress of an incoming text; the network layer reassembles it
+            if not self.state.is_host:
+                self.ui.set_status(
+                    f"正在接收文本 ({msg['received']}/{msg['total']})", "blue"
+                )
+
+        elif msg["type"] == "LOAD_TEXT":
+            # 客戶端接收文本並更新顯示區域
+            self.set_text(msg["text"])
+            self.ui.set_text_content(self.target)
+
+            # Make sure opponent text is visible for client
+            self.ui.show_multiplayer_elements()
+
+            # A new text starts a new match, also the next one in a room
+            self.reset_match()
+
+            # Show notification for client
+            if not self.state.is_host:
+                self.ui.show_info("文本已加載", "主機已加載文本，等待遊戲開始")
+                self.ui.set_status("主機已加載文本，等待遊戲開始", "blue")
+        elif msg["type"] == "COUNTDOWN_START":
+            # 客戶端收到倒計時開始的消息，按主機時間排程
+            if "start_at" in msg and self.clock_synced():
+                self.countdown(msg["start_at"])
+            else:
+                self.countdown(self.host_now() + COUNTDOWN_SECONDS)
+        elif msg["type"] == "CLOCK":
+            # Estimated clock offset and round trip time of a player
+            player = self.state.players.get(msg.get("player"))
+            if player is not None:
+                player["rtt"] = msg["rtt"]
+                player["offset"] = msg["offset"]
+                self.refresh_opponents()
+            log.info(
+                "Player %s: clock offset %.1f ms, RTT %.1f ms",
+                msg.get("player"), msg["offset"] * 1000, msg["rtt"] * 1000,
+            )
+
+    def load_text(self):
+        """Ask the frontend for a text file and make it the one to type"""
+        path = self.ui.choose_text_file()
+        if path is not None:
+            self.load_file(path)
+
+    def load_file(self, path, encoding=None):
+        """Read a text file on a worker thread (see ``core.ingest``); it
+        becomes the text to type once it is compiled"""
+        self.cancel_loading()
+        self._loader = TextLoader(path, encoding).start()
+        self.ui.set_start_enabled(False)
+        self.ui.set_status("正在加載文本... 0%")
+        self._loader_job = self.ui.after(LOAD_POLL_MS, self._check_loader)
+
+    def _check_loader(self):
+        loader = self._loader
+        if not loader.done.is_set():
+            self.ui.set_status(f"正在加載文本... {loader.progress:.0%}")
+            self._loader_job = self.ui.after(LOAD_POLL_MS, self._check_loader)
+            return
+        self._loader = self._loader_job = None
+        if loader.target is not None:
+            self.ui.set_status(f"文本已加載 ({len(loader.target)} 字)")
+            self.use_target(loader.target)
+            return
+        self.ui.set_status("")
+        if not isinstance(loader.error, LoadCancelled):
+            self.ui.show_error("錯誤", f"無法加載文本文件: {loader.error or '沒有讀到文本'}")
+        if self.state.is_host or self.state.is_single_player:
+            self.ui.set_start_enabled(True)
+
+    def cancel_loading(self):
+        """Stop reading the file being loaded, if any"""
+        if self._loader is not None:
+            self._loader.cancel()
+            self.ui.after_cancel(self._loader_job)
+            self._loader = self._loader_job = None
+
+    def load_passage(self, length=DEFAULT_LENGTH, difficulty=None):
+        """Make a random passage from the corpus the text to type"""
+        if self.corpus is None or not len(self.corpus):
+            self.ui.show_error("錯誤", "沒有可用的文章庫")
+            return
+        try:
+            text = self.corpus.passage(length, difficulty)
+        except (OSError, ValueError) as e:
+            log.error("Error reading corpus passage: %s", e)
+            self.ui.show_error("錯誤", f"無法讀取文章: {str(e)}")
+            return
+        self.use_text(text)
+
+    def use_text(self, text):
+        self.use_target(TypingTarget(text))
+
+    def use_target(self, target):
+        self.set_target(target)
+        log.info("Loaded text file with %d characters", len(self.text_content))
+
+        # Update host's text display, and the opponent display too
+        self.ui.set_text_content(self.target, opponent=not self.state.is_single_player)
+        self.reset_match()
+
+        if not self.state.is_single_player:
+            # If host, send text to client
+            if self.state.is_host:
+                log.info(
+                    "Host sending text to client, length: %d", len(self.text_content)
+                )
+                msg = {"type": "LOAD_TEXT", "text": self.text_content}
+                self.state.network.send_message(msg)
+                # Show confirmation message
+                self.ui.show_info("文本已加載", "文本已加載，等待開始遊戲")
+
+        # Enable start button
+        if self.state.is_host or self.state.is_single_player:
+            self.ui.set_start_enabled(True)
+
+    def connect_to_host(self):
+        # 格式: IP、IP:埠 或 IP/房間碼 (連接專用伺服器時)
+        address, _, room_code = self.ui.get_host_address().strip().partition("/")
+        host_ip, _, port = address.partition(":")
+        if not host_ip:
+            self.ui.show_error("錯誤", "請輸入主機IP地址")
+            return
+        try:
+            port = int(port) if port else DEFAULT_PORT
+        except ValueError:
+            self.ui.show_error("錯誤", f"無效的埠號: {port}")
+            return
+
+        # Set client mode first
+        self.state.is_host = False
+        self.state.is_single_player = False
+        self.state.player_id = None  # Assigned by the host in CLIENT_JOINED
+        self.state.players = {}
+
+        # Then create network connection
+        try:
+            self.state.network = create_network_handler(False, host_ip, port)
+            self.state.network.set_game(self)
+            self.state.network.connect(host_ip)
+            self.state.network.start()
+
+            # Update UI to show successful connection
+            self.ui.connect_to_host()
+
+            # Send a message to host to confirm connection; it also tells the
+            # host which codecs and text delivery we support
+            msg = {"type": "CLIENT_CONNECTED"}
+            self.state.network.send_message(msg)
+
+            # A dedicated server needs to know which room we are joining
+            self.state.room_code = room_code.strip().upper()
+            if self.state.room_code:
+                msg = {"type": "JOIN", "room": self.state.room_code}
+                self.state.network.send_message(msg)
+        except Exception as e:
+            self.ui.show_error("連接錯誤", f"無法連接到主機: {str(e)}")
+
+    def highlight_current_character(self):
+        """Move the player's cursor to the current character"""
+        self.ui.update_my_progress(self.state.my_progress)
+
+    def back_to_home(self):
+        self._cancel_timer()
+        self.cancel_loading()
+        self.stop_recording()
+        self.state.start_at = None
+        self.state.game_started = False
+
+        # Stop network handler if active (host mode cleanup)
+        if hasattr(self.state, "network") and self.state.network:
+            self.state.network.stop()
+            self.state.network = None
+
+        self.ui.unbind_key_press()
+        self.ui.show_main_menu()
+
+        # Reset state variables
+        self.state.is_host = False
+        self.state.is_single_player = False
+        self.state.my_progress = 0
+        self.state.my_score = 0
+        self.state.player_id = 0
+        self.state.players = {}
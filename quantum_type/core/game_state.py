@@ -0,0 +1,27 @@
+import queue
+import time
+
+from quantum_type.core.analytics import LiveStats
+from quantum_type.core.keystrokes import KeystrokeLog
+
+
+class GameState:
+    def __init__(self):
+        self.is_host = False
+        self.is_single_player = True
+        self.network = None
+        self.queue = queue.Queue()
+        self.game_started = False
+        self.start_time = 0
+        # Match start on the host's monotonic timeline (see network.clock)
+        self.start_at = None
+        self.my_progress = 0
+        self.my_score = 0
+        # Every key pressed this match, and speed/accuracy so far
+        self.keystrokes = KeystrokeLog()
+        self.stats = LiveStats()
+        # Everyone in the match, keyed by the player id the host assigns:
+        # {player_id: {"name": ..., "progress": ..., "score": ...}}
+        self.player_id = 0
+        self.players = {}
+        self.room_code = ""
@@ -0,0 +1,195 @@
+import heapq
+import itertools
+import time
+from types import SimpleNamespace
+
+from quantum_type.abstract_ui import AbstractUI
+
+
+class HeadlessUI(AbstractUI):
+    """A frontend with no display, for bots, tests and benchmarks.
+
+    What a real UI would show is kept in plain attributes. Callbacks from
+    ``after`` run on the caller's thread whenever ``run_pending`` or ``run``
+    is called, against ``time.monotonic``. ``choose_text_file`` returns the
+    path given to the constructor.
+    """
+
+    def __init__(self, text_path=None, host_address=""):
+        self.game_logic = None
+        self.text_path = text_path
+        self.host_address = host_address
+        self.key_callback = None
+        self._timers = []  # Heap of (due, job, callback)
+        self._cancelled = set()
+        self._jobs = itertools.count()
+        self.show_main_menu()
+
+    def set_game_logic(self, game_logic):
+        self.game_logic = game_logic
+
+    def setup_ui(self):
+        self.game_logic.process_queue()
+
+    # Scheduling
+
+    def after(self, delay, callback):
+        job = next(self._jobs)
+        heapq.heappush(self._timers, (time.monotonic() + delay / 1000, job, callback))
+        return job
+
+    def after_cancel(self, job):
+        self._cancelled.add(job)
+
+    def next_due(self):
+        """When the next callback is due, or None"""
+        while self._timers and self._timers[0][1] in self._cancelled:
+            _, job, _ = heapq.heappop(self._timers)
+            self._cancelled.discard(job)
+        return self._timers[0][0] if self._timers else None
+
+    def run_pending(self):
+        """Run every callback that is due; returns how many ran"""
+        ran = 0
+        now = time.monotonic()
+        while True:
+            due = self.next_due()
+            if due is None or due > now:
+                return ran
+            _, _, callback = heapq.heappop(self._timers)
+            callback()
+            ran += 1
+
+    def run(self, duration=None, until=None):
+        """Run callbacks as they fall due, for ``duration`` seconds or until
+        ``until()`` is true; returns whether ``until`` was met"""
+        deadline = None if duration is None else time.monotonic() + duration
+        while True:
+            self.run_pending()
+            if until is not None and until():
+                return True
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                return False
+            wake = [t for t in (self.next_due(), deadline) if t is not None]
+            if not wake:
+                return False
+            time.sleep(max(0.0, min(wake) - now))
+
+    # Input
+
+    def bind_key_press(self, callback):
+        self.key_callback = callback
+
+    def unbind_key_press(self):
+        self.key_callback = None
+
+    def press(self, char, keysym=None):
+        """Simulate a key press with Tk's ``char`` and ``keysym``"""
+        if keysym is None:
+            keysym = "Return" if char == "\n" else char
+        if self.key_callback is not None:
+            self.key_callback(SimpleNamespace(char=char, keysym=keysym))
+
+    def type_text(self, text):
+        for char in text:
+            self.press(char)
+
+    def choose_text_file(self):
+        return self.text_path
+
+    def get_host_address(self):
+        return self.host_address
+
+    # Displays
+
+    def update_my_progress(self, progress):
+        self.progress = progress
+
+    def update_opponent_progress(self, progress):
+        self.opponent_progress = progress
+
+    def update_players(self, players):
+        self.players = {pid: dict(info) for pid, info in players.items()}
+
+    def update_score_display(self, my_score, opponent_score=None):
+        self.my_score = my_score
+        if opponent_score is not None:
+            self.opponent_score = opponent_score
+
+    def update_timer_display(self, remaining):
+        self.remaining = remaining
+
+    def update_stats(self, stats):
+        self.stats = stats
+
+    def show_countdown(self, count):
+        self.countdown = count
+
+    def hide_countdown(self):
+        self.countdown = None
+
+    def show_result(self, winner, my_score=None, opponent_score=None, ranking=None):
+        self.result = {
+            "winner": winner,
+            "my_score": my_score,
+            "opponent_score": opponent_score,
+            "ranking": ranking,
+        }
+
+    def set_text_content(self, target, opponent=True):
+        self.target = target
+
+    def clear_text_content(self):
+        self.target = None
+
+    def show_error_highlight(self, index):
+        self.errors += 1
+
+    def set_start_enabled(self, enabled):
+        self.start_enabled = enabled
+
+    def set_back_enabled(self, enabled):
+        self.back_enabled = enabled
+
+    def set_status(self, text, color=None):
+        self.status = text
+
+    def show_info(self, title, message):
+        self.messages.append(("info", title, message))
+
+    def show_error(self, title, message):
+        self.messages.append(("error", title, message))
+
+    def display_host_info(self, host_ip):
+        self.screen = "host"
+        self.host_ip = host_ip
+
+    def connect_to_host(self):
+        self.screen = "client"
+
+    def show_multiplayer_elements(self):
+        self.multiplayer = True
+
+    def hide_multiplayer_elements(self):
+        self.multiplayer = False
+
+    def show_main_menu(self):
+        self.screen = "main_menu"
+        self.host_ip = None
+        self.target = None
+        self.progress = 0
+        self.opponent_progress = 0
+        self.players = {}
+        self.my_score = 0
+        self.opponent_score = None
+        self.remaining = None
+        self.stats = None
+        self.countdown = None
+        self.result = None
+        self.errors = 0
+        self.status = None
+        self.messages = []
+        self.multiplayer = False
+        self.start_enabled = False
+        self.back_enabled = False
@@ -0,0 +1,298 @@
+"""Match history, player stats and per-text personal bests in SQLite.
+
+Finished matches are handed to ``MatchHistory.record_match``, which only
+puts them on a queue: a writer thread takes whatever has piled up (up to
+``BATCH_SIZE`` matches) and writes it in one transaction, so the end of a
+game never waits on the disk. The database runs in WAL mode, so reads on
+the UI thread carry on while the writer commits.
+
+Leaderboard queries go through a cache that is emptied every time the
+writer commits; until then a repeated query costs a dict lookup. The
+indexes cover the two hot queries: the top players on a text (from the
+personal bests table) and a player's history, newest first.
+
+Every player writes their own result with their own name; opponents are
+stored with the match under the names they had in it, but only the local
+player gets a personal best.
+"""
+import getpass
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from quantum_type.logs import get_logger
+
+log = get_logger("history")
+
+HISTORY_PATH = os.path.join(os.path.expanduser("~"), ".quantum_type", "history.db")
+BATCH_SIZE = 64  # Matches written per transaction at most
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    played_at REAL NOT NULL,
+    text_digest TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    duration REAL NOT NULL,
+    winner TEXT,
+    players INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    match_id INTEGER NOT NULL REFERENCES matches(id),
+    player TEXT NOT NULL,
+    text_digest TEXT NOT NULL,
+    played_at REAL NOT NULL,
+    score INTEGER NOT NULL,
+    rank INTEGER,
+    is_me INTEGER NOT NULL,
+    keystrokes INTEGER,
+    errors INTEGER,
+    accuracy REAL,
+    net_wpm REAL,
+    gross_wpm REAL
+);
+CREATE TABLE IF NOT EXISTS personal_bests (
+    player TEXT NOT NULL,
+    text_digest TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    net_wpm REAL,
+    accuracy REAL,
+    played_at REAL NOT NULL,
+    match_id INTEGER NOT NULL,
+    PRIMARY KEY (player, text_digest)
+);
+-- Covers player_stats, so a player's totals never touch the table itself
+CREATE INDEX IF NOT EXISTS results_by_player
+    ON results (player, played_at DESC, rank, score, net_wpm, accuracy);
+CREATE INDEX IF NOT EXISTS results_by_text ON results (text_digest, score DESC);
+CREATE INDEX IF NOT EXISTS bests_by_text ON personal_bests (text_digest, score DESC);
+"""
+
+_INSERT_MATCH = (
+    "INSERT INTO matches (played_at, text_digest, mode, duration, winner, players) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+_INSERT_RESULT = (
+    "INSERT INTO results (match_id, player, text_digest, played_at, score, rank, is_me, "
+    "keystrokes, errors, accuracy, net_wpm, gross_wpm) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+# Keep the higher score; a tie keeps the earlier match
+_UPSERT_BEST = (
+    "INSERT INTO personal_bests (player, text_digest, score, net_wpm, accuracy, "
+    "played_at, match_id) VALUES (?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (player, text_digest) DO UPDATE SET score = excluded.score, "
+    "net_wpm = excluded.net_wpm, accuracy = excluded.accuracy, "
+    "played_at = excluded.played_at, match_id = excluded.match_id "
+    "WHERE excluded.score > personal_bests.score"
+)
+
+_STOP = object()
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=10)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    # Safe with WAL: a crash can lose the last commits but never corrupts
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class MatchHistory:
+    """The history database, with a background writer.
+
+    A match is a dict of ``played_at`` (wall time), ``digest``, ``mode``,
+    ``duration``, ``winner`` and ``results``, one dict per player with
+    ``player``, ``score``, ``rank``, ``me`` and, for the local player,
+    ``keystrokes``, ``errors``, ``accuracy``, ``net_wpm`` and ``gross_wpm``.
+    """
+
+    def __init__(self, path=HISTORY_PATH, player_name=None):
+        self.path = path
+        self.player_name = player_name or getpass.getuser()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = _connect(path)
+        with conn:
+            conn.executescript(_SCHEMA)
+        conn.close()
+        self._local = threading.local()  # A read connection per thread
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        self.generation = 0  # Commits so far; cached results are from one
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    @classmethod
+    def open(cls, path=HISTORY_PATH, player_name=None):
+        """The history at path, or None (and a warning) if it can't be opened"""
+        try:
+            return cls(path, player_name)
+        except (OSError, sqlite3.Error) as e:
+            log.warning("Match history disabled, could not open %s: %s", path, e)
+            return None
+
+    # Writing
+
+    def record_match(self, match):
+        """Queue a finished match; returns at once"""
+        self._queue.put(match)
+
+    def flush(self):
+        """Wait until every queued match is in the database"""
+        self._queue.join()
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._writer.join()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _write_loop(self):
+        conn = _connect(self.path)
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            matches = [match for match in batch if match is not _STOP]
+            stopping = len(matches) < len(batch)
+            if matches and self._save(conn, matches):
+                self.invalidate()
+            for _ in batch:
+                self._queue.task_done()
+        conn.close()
+
+    def _save(self, conn, matches):
+        """Insert matches in one transaction, or one at a time if that
+        fails so a bad match only loses itself; True if any was saved"""
+        try:
+            with conn:
+                self._insert(conn, matches)
+        except (sqlite3.Error, KeyError, TypeError) as e:
+            if len(matches) == 1:
+                log.error("Could not save match: %s", e)
+                return False
+            log.warning(
+                "Could not save %d matches together, saving one by one: %s", len(matches), e
+            )
+        else:
+            log.debug("Saved %d matches", len(matches))
+            return True
+        saved = False
+        for match in matches:
+            saved = self._save(conn, [match]) or saved
+        return saved
+
+    def _insert(self, conn, matches):
+        results = []
+        bests = []
+        for match in matches:
+            digest = match["digest"]
+            played_at = match["played_at"]
+            match_id = conn.execute(
+                _INSERT_MATCH,
+                (played_at, digest, match["mode"], match["duration"], match["winner"],
+                 len(match["results"])),
+            ).lastrowid
+            for result in match["results"]:
+                results.append((
+                    match_id, result["player"], digest, played_at, result["score"],
+                    result.get("rank"), int(result.get("me", False)),
+                    result.get("keystrokes"), result.get("errors"),
+                    result.get("accuracy"), result.get("net_wpm"), result.get("gross_wpm"),
+                ))
+                if result.get("me"):
+                    # Opponents are only known by their names in this match
+                    bests.append((
+                        result["player"], digest, result["score"], result.get("net_wpm"),
+                        result.get("accuracy"), played_at, match_id,
+                    ))
+        conn.executemany(_INSERT_RESULT, results)
+        conn.executemany(_UPSERT_BEST, bests)
+
+    # Reading
+
+    def invalidate(self):
+        """Forget every cached query result"""
+        with self._cache_lock:
+            self._cache.clear()
+            self.generation += 1
+
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = _connect(self.path)
+        return conn
+
+    def _query(self, sql, args):
+        """Rows of a query as dicts, from the cache when nothing was written since"""
+        key = (sql, args)
+        with self._cache_lock:
+            rows = self._cache.get(key)
+            generation = self.generation
+        if rows is None:
+            rows = [dict(row) for row in self._reader().execute(sql, args)]
+            with self._cache_lock:
+                # A commit in the meantime may have made these rows stale
+                if self.generation == generation:
+                    self._cache[key] = rows
+        return rows
+
+    def leaderboard(self, digest, limit=10):
+        """Each player's best on a text, best first"""
+        return self._query(
+            "SELECT player, score, net_wpm, accuracy, played_at FROM personal_bests "
+            "WHERE text_digest = ? ORDER BY score DESC, played_at LIMIT ?",
+            (digest, limit),
+        )
+
+    def player_history(self, player=None, limit=50):
+        """A player's results (the local player's by default), newest first"""
+        return self._query(
+            "SELECT r.match_id, r.played_at, r.text_digest, m.mode, m.winner, r.score, "
+            "r.rank, m.players, r.net_wpm, r.accuracy FROM results r "
+            "JOIN matches m ON m.id = r.match_id "
+            "WHERE r.player = ? ORDER BY r.played_at DESC LIMIT ?",
+            (player or self.player_name, limit),
+        )
+
+    def personal_best(self, digest, player=None):
+        rows = self._query(
+            "SELECT score, net_wpm, accuracy, played_at, match_id FROM personal_bests "
+            "WHERE player = ? AND text_digest = ?",
+            (player or self.player_name, digest),
+        )
+        return rows[0] if rows else None
+
+    def player_stats(self, player=None, since=None):
+        """Matches played, wins, best and average speed and accuracy"""
+        rows = self._query(
+            "SELECT COUNT(*) AS matches, SUM(rank = 1) AS wins, MAX(score) AS best_score, "
+            "AVG(net_wpm) AS net_wpm, MAX(net_wpm) AS best_net_wpm, AVG(accuracy) AS accuracy "
+            "FROM results WHERE player = ? AND played_at >= ?",
+            (player or self.player_name, since or 0.0),
+        )
+        return rows[0]
+
+
+def match_record(digest, mode, duration, results, winner="", played_at=None):
+    """The dict ``MatchHistory.record_match`` takes"""
+    return {
+        "played_at": time.time() if played_at is None else played_at,
+        "digest": digest,
+        "mode": mode,
+        "duration": duration,
+        "winner": winner,
+        "results": results,
+    }
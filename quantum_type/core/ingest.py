@@ -0,0 +1,185 @@
+"""Loading practice texts from disk without blocking the UI.
+
+``TextLoader`` reads a file on a worker thread, ``CHUNK_SIZE`` bytes at a
+time. The encoding comes from the byte order mark if there is one;
+otherwise the first ``SAMPLE_SIZE`` bytes are tried as UTF-16 if they look
+like it (every other byte zero), then as UTF-8, then as Big5 and
+GB18030, the one with more common Chinese characters winning, then as
+Windows-1252, and finally as Latin-1, which decodes anything. Bytes that
+turn out not to fit the detected encoding later in the file become U+FFFD
+rather than failing the load.
+
+Each decoded chunk is normalised (``normalize_text``: line endings, tabs,
+typographic quotes and dashes, control characters) and indexed into the
+``TypingTarget`` straight away, so the file is read, decoded and compiled
+in one pass and the whole text is never held twice. The UI thread only
+looks at ``progress`` and, once ``done`` is set, takes ``target``.
+"""
+import codecs
+import os
+import threading
+
+from quantum_type.core.typing_target import TypingTarget, normalize_text
+from quantum_type.logs import get_logger
+
+log = get_logger("ingest")
+
+CHUNK_SIZE = 64 * 1024  # Bytes read, decoded and indexed at a time
+SAMPLE_SIZE = 64 * 1024  # Bytes the encoding is guessed from
+CJK_ENCODINGS = ("big5", "gb18030")
+
+# Frequent characters in both scripts: a Big5 file read as GB18030 (or the
+# other way round) still decodes, but into rare characters
+_COMMON_HANZI = "的一是不了人我在有他这這中大来來上国國个個到说說们們为為和你地出道也时時年"
+
+# UTF-32 LE before UTF-16 LE: its BOM starts with the UTF-16 one
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+
+class LoadCancelled(Exception):
+    pass
+
+
+def _decode(sample, encoding):
+    """sample decoded, allowing a char cut off at the end; None if invalid"""
+    try:
+        return codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+    except UnicodeDecodeError:
+        return None
+
+
+def detect_encoding(sample):
+    """(encoding, length of the BOM) for a file starting with sample"""
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding, len(bom)
+    # UTF-16 without a BOM: ASCII-range text leaves every other byte zero.
+    # Checked first, as zero bytes are valid (if unlikely) UTF-8
+    pairs = len(sample) // 2
+    if pairs:
+        even = sample[0:pairs * 2:2].count(0)
+        odd = sample[1:pairs * 2:2].count(0)
+        if odd > pairs // 4 and even < pairs // 20 and _decode(sample, "utf-16-le"):
+            return "utf-16-le", 0
+        if even > pairs // 4 and odd < pairs // 20 and _decode(sample, "utf-16-be"):
+            return "utf-16-be", 0
+    if _decode(sample, "utf-8") is not None:
+        return "utf-8", 0
+    best, best_score = None, 0
+    for encoding in CJK_ENCODINGS:
+        text = _decode(sample, encoding)
+        if text is not None:
+            score = sum(map(text.count, _COMMON_HANZI))
+            if score > best_score:
+                best, best_score = encoding, score
+    if best is not None:
+        return best, 0
+    if _decode(sample, "cp1252") is not None:
+        return "cp1252", 0
+    return "latin-1", 0
+
+
+def read_text(path, encoding=None):
+    """A text file's normalised text, read on the calling thread"""
+    return "".join(TextLoader(path, encoding).chunks())
+
+
+def _last_break(text):
+    """Index just past the last space or newline in text, 0 if there is none"""
+    return max(text.rfind(" "), text.rfind("\n")) + 1
+
+
+class TextLoader:
+    """Reads, normalises and compiles one text file on a worker thread.
+
+    ``start`` returns at once. While the thread runs, ``progress`` goes
+    from 0 to 1 (the share of the file read). When it is done, ``done`` is
+    set and either ``target`` holds the ``TypingTarget`` or ``error`` the
+    exception that stopped the load.
+    """
+
+    def __init__(self, path, encoding=None, chunk_size=CHUNK_SIZE):
+        self.path = path
+        self.encoding = encoding  # Detected from the first bytes if None
+        self.chunk_size = chunk_size
+        self.progress = 0.0
+        self.target = None
+        self.error = None
+        self.done = threading.Event()
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """Stop reading; ``done`` is set soon after with no target"""
+        self._cancelled.set()
+
+    def wait(self, timeout=None):
+        """Wait for the load to finish; returns the target or raises its error"""
+        self.done.wait(timeout)
+        if self.error is not None:
+            raise self.error
+        return self.target
+
+    def _run(self):
+        try:
+            self.target = TypingTarget.from_chunks(self.chunks())
+            log.info(
+                "Loaded %s (%s): %d characters", self.path, self.encoding, len(self.target)
+            )
+        except LoadCancelled as e:
+            self.error = e
+            log.debug("Loading %s cancelled", self.path)
+        except (OSError, UnicodeError, LookupError) as e:
+            self.error = e
+            log.error("Error loading text file %s: %s", self.path, e)
+        except Exception as e:
+            # Anything else is a bug, but it must still end the load
+            self.error = e
+            log.exception("Unexpected error loading text file %s", self.path)
+        finally:
+            self.done.set()
+
+    def chunks(self):
+        """The file's text, normalised, in pieces that end between words"""
+        with open(self.path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            data = file.read(max(self.chunk_size, SAMPLE_SIZE))
+            skip = 0
+            if self.encoding is None:
+                self.encoding, skip = detect_encoding(data[:SAMPLE_SIZE])
+            decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+            offset = 0
+            pending = ""  # A CR that may be half of a CRLF
+            tail = ""  # Normalised text after the last word break
+            while True:
+                if self._cancelled.is_set():
+                    raise LoadCancelled(self.path)
+                offset += len(data)
+                final = not data
+                text = pending + decoder.decode(data[skip:], final)
+                skip = 0
+                pending = ""
+                if text.endswith("\r") and not final:
+                    text, pending = text[:-1], "\r"
+                text = tail + normalize_text(text)
+                if final:
+                    if text:
+                        yield text
+                    break
+                cut = _last_break(text)
+                tail = text[cut:]
+                if cut:
+                    yield text[:cut]
+                self.progress = min(1.0, offset / size) if size else 1.0
+                data = file.read(self.chunk_size)
+        self.progress = 1.0
@@ -0,0 +1,110 @@
+"""Every keystroke of a match, in a compact ring buffer.
+
+A record is a monotonic timestamp, the position in the text, the expected
+and the typed codepoint and whether the key was right. Records are kept
+column by column in ``array`` objects rather than as a list of dicts, so a
+match costs 21 bytes per key and the analytics can walk whole columns.
+Once ``capacity`` records are held the oldest are overwritten.
+"""
+import struct
+import sys
+from array import array
+from collections import namedtuple
+
+DEFAULT_CAPACITY = 1 << 16  # About an hour of very fast typing
+
+# Codepoint recorded for a key that produced no character
+NO_CHAR = 0
+
+# Columns in record order, with their array typecodes
+COLUMNS = (
+    ("times", "d"),
+    ("positions", "I"),
+    ("expected", "I"),
+    ("typed", "I"),
+    ("correct", "B"),
+)
+
+Columns = namedtuple("Columns", [name for name, _ in COLUMNS])
+
+_MAGIC = b"QTKS"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHI")  # Magic, version, record count
+
+
+class KeystrokeLog:
+    """Ring buffer of keystroke records"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.clear()
+
+    def clear(self):
+        self._columns = [array(typecode) for _, typecode in COLUMNS]
+        (self._times, self._positions, self._expected, self._typed,
+         self._correct) = self._columns
+        self._head = 0  # Oldest record once the buffer has wrapped
+        self.total = 0  # Records ever appended, including overwritten ones
+
+    def __len__(self):
+        return len(self._columns[0])
+
+    @property
+    def dropped(self):
+        """Records overwritten because the buffer was full"""
+        return self.total - len(self)
+
+    def append(self, time, position, expected, typed, correct):
+        # Called on every key press, so the columns are spelt out
+        if self.total < self.capacity:
+            self._times.append(time)
+            self._positions.append(position)
+            self._expected.append(expected)
+            self._typed.append(typed)
+            self._correct.append(correct)
+        else:
+            head = self._head
+            self._times[head] = time
+            self._positions[head] = position
+            self._expected[head] = expected
+            self._typed[head] = typed
+            self._correct[head] = correct
+            self._head = (head + 1) % self.capacity
+        self.total += 1
+
+    def columns(self):
+        """The records as ``Columns`` of arrays, oldest first (copies)"""
+        head = self._head
+        return Columns(*(column[head:] + column[:head] for column in self._columns))
+
+    def records(self):
+        """The records as tuples, oldest first"""
+        return zip(*self.columns())
+
+    def to_bytes(self):
+        """Serialise as a little-endian header followed by each column"""
+        columns = self.columns()
+        parts = [_HEADER.pack(_MAGIC, _VERSION, len(self))]
+        for column in columns:
+            if sys.byteorder == "big":
+                column.byteswap()
+            parts.append(column.tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data, capacity=None):
+        magic, version, count = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Not a keystroke log")
+        log = cls(max(capacity or 0, count, 1))
+        offset = _HEADER.size
+        for column, (_, typecode) in zip(log._columns, COLUMNS):
+            size = array(typecode).itemsize * count
+            column.frombytes(data[offset:offset + size])
+            if sys.byteorder == "big":
+                column.byteswap()
+            offset += size
+        if any(len(column) != count for column in log._columns):
+            raise ValueError("Truncated keystroke log")
+        log.total = count
+        return log
@@ -0,0 +1,207 @@
+"""Matches recorded to disk, for replay and profiling.
+
+A recording is an append-only file: a short header, then one record per
+event. Each record is a kind byte, the time in seconds since the recording
+started (on the host's timeline, see ``network.clock``) and the payload
+length, followed by the payload:
+
+    INFO      JSON: text digest, mode, player id, origin on the timeline
+    TEXT      the practice text, UTF-8
+    SNAPSHOT  JSON: ``GameEngine.save_state()`` at that moment
+    KEY       position, whether it was right, char and keysym of a key press
+    MESSAGE   a network message given to ``handle_message``, in the wire codec
+    END       the match is over (or was left)
+
+A snapshot is written at the start and then every ``SNAPSHOT_INTERVAL``
+seconds of activity, so a replay can seek by restoring the nearest one
+instead of playing from the beginning. The file is flushed after every
+snapshot; a match cut short by a crash still replays up to the last one.
+"""
+import json
+import os
+import struct
+import time
+from bisect import bisect_right
+
+from quantum_type.logs import get_logger
+from quantum_type.network.codec import BINARY_CODEC, decode_payload, encode_payload
+from quantum_type.network.text_transfer import text_digest
+
+log = get_logger("recorder")
+
+RECORDING_DIR = os.path.join(os.path.expanduser("~"), ".quantum_type", "recordings")
+SNAPSHOT_INTERVAL = 5.0  # Seconds between snapshots
+
+REC_INFO = 1
+REC_TEXT = 2
+REC_SNAPSHOT = 3
+REC_KEY = 4
+REC_MESSAGE = 5
+REC_END = 6
+
+_MAGIC = b"QTRC"
+_VERSION = 1
+_HEADER = struct.Struct("<4sH")  # Magic, version
+_RECORD = struct.Struct("<BdI")  # Kind, seconds since the start, payload length
+_KEY = struct.Struct("<IBB")  # Position, correct, length of the UTF-8 char
+
+
+def _json(value):
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+class MatchRecorder:
+    """Writes one match to a recording file as it is played.
+
+    Every method takes ``now`` on the host's timeline; the recorder keeps
+    times relative to ``origin``, the moment recording started.
+    """
+
+    def __init__(self, file, origin, snapshot_interval=SNAPSHOT_INTERVAL):
+        self.file = file
+        self.path = getattr(file, "name", None)
+        self.origin = origin
+        self.snapshot_interval = snapshot_interval
+        self.next_snapshot = origin
+        self.file.write(_HEADER.pack(_MAGIC, _VERSION))
+
+    @classmethod
+    def create(cls, directory, origin, info, text, digest=None):
+        """Start a recording in directory; returns None if it can't be written"""
+        digest = digest or text_digest(text)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{digest[:8]}.qtr"
+        try:
+            os.makedirs(directory, exist_ok=True)
+            recorder = cls(open(os.path.join(directory, name), "wb"), origin)
+        except OSError as e:
+            log.warning("Could not start recording in %s: %s", directory, e)
+            return None
+        recorder._write(REC_INFO, origin, _json(dict(info, digest=digest, origin=origin)))
+        recorder._write(REC_TEXT, origin, text.encode("utf-8"))
+        log.info("Recording match to %s", recorder.path)
+        return recorder
+
+    def _write(self, kind, now, payload):
+        if self.file is None:
+            return
+        try:
+            self.file.write(_RECORD.pack(kind, now - self.origin, len(payload)))
+            self.file.write(payload)
+        except OSError as e:
+            log.warning("Recording stopped, could not write %s: %s", self.path, e)
+            self.file = None
+
+    def snapshot_due(self, now):
+        return now >= self.next_snapshot
+
+    def snapshot(self, now, state):
+        self._write(REC_SNAPSHOT, now, _json(state))
+        self.next_snapshot = now + self.snapshot_interval
+        if self.file is not None:
+            try:
+                self.file.flush()
+            except OSError as e:
+                log.warning("Could not flush recording %s: %s", self.path, e)
+
+    def key(self, now, position, char, keysym, correct):
+        char = char.encode("utf-8")
+        self._write(
+            REC_KEY, now, _KEY.pack(position, correct, len(char)) + char + keysym.encode("utf-8")
+        )
+
+    def message(self, now, msg):
+        try:
+            payload = encode_payload(msg, BINARY_CODEC)
+        except (TypeError, ValueError) as e:
+            log.debug("Not recording %s message: %s", msg.get("type"), e)
+            return
+        self._write(REC_MESSAGE, now, payload)
+
+    def close(self, now):
+        self._write(REC_END, now, b"")
+        if self.file is not None:
+            try:
+                self.file.close()
+            except OSError as e:
+                log.warning("Could not close recording %s: %s", self.path, e)
+            self.file = None
+
+
+class Recording:
+    """A recording read back from disk.
+
+    ``events`` are ``(seconds, kind, data)`` for keys, messages and the end,
+    where a key's data is ``(position, char, keysym, correct)`` and a
+    message's is the message. ``snapshots`` are ``(seconds, index of the
+    next event, state)``; the first one is taken when recording started.
+    """
+
+    def __init__(self, info, text, events, snapshots, complete):
+        self.info = info
+        self.text = text
+        self.events = events
+        self.snapshots = snapshots
+        self.complete = complete  # False if the file stops mid-match
+        self._snapshot_times = [t for t, _, _ in snapshots]
+
+    @property
+    def duration(self):
+        """Seconds from the start of the recording to its last record"""
+        times = [t for t, _, _ in self.events[-1:] + self.snapshots[-1:]]
+        return max(times, default=0.0)
+
+    def snapshot_before(self, seconds):
+        """The last snapshot taken at or before ``seconds``"""
+        return self.snapshots[max(0, bisect_right(self._snapshot_times, seconds) - 1)]
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < _HEADER.size:
+            raise ValueError("Not a match recording")
+        magic, version = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Not a match recording")
+        info = text = None
+        events = []
+        snapshots = []
+        complete = False
+        offset = _HEADER.size
+        end = len(data)
+        while offset + _RECORD.size <= end:
+            kind, seconds, length = _RECORD.unpack_from(data, offset)
+            start = offset + _RECORD.size
+            offset = start + length
+            if offset > end:
+                break  # Cut off while being written
+            payload = data[start:offset]
+            if kind == REC_KEY:
+                position, correct, size = _KEY.unpack_from(payload)
+                head = _KEY.size + size
+                events.append((
+                    seconds,
+                    REC_KEY,
+                    (position, payload[_KEY.size:head].decode("utf-8"),
+                     payload[head:].decode("utf-8"), correct),
+                ))
+            elif kind == REC_MESSAGE:
+                events.append((seconds, REC_MESSAGE, decode_payload(payload)))
+            elif kind == REC_SNAPSHOT:
+                snapshots.append((seconds, len(events), json.loads(payload)))
+            elif kind == REC_INFO:
+                info = json.loads(payload)
+            elif kind == REC_TEXT:
+                text = payload.decode("utf-8")
+            elif kind == REC_END:
+                events.append((seconds, REC_END, None))
+                complete = True
+                break
+        if info is None or text is None or not snapshots:
+            raise ValueError("Truncated match recording")
+        if text_digest(text) != info["digest"]:
+            raise ValueError("Recorded text does not match its digest")
+        return cls(info, text, events, snapshots, complete)
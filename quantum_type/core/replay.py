@@ -0,0 +1,290 @@
+"""Play a recorded match back through the game engine.
+
+The replay runs a fresh ``GameEngine`` on its own clock, which starts where
+the recording's host timeline started, so the times inside recorded
+messages (START, SNAPSHOT, ...) mean the same thing they did live. Every
+callback the engine schedules, and every recorded event, waits in one heap
+ordered by replay time. ``advance`` runs that heap up to a given moment, so
+the same match comes out whether it is played at 1x, fast-forwarded or run
+headless as fast as possible.
+
+With a real frontend, ``play`` paces the heap against ``time.monotonic``
+at ``speed`` recorded seconds per second. Headless, ``run`` jumps straight
+from one due callback to the next. ``seek`` restores the nearest snapshot
+before the target and plays only the events after it.
+"""
+import heapq
+import itertools
+import math
+import time
+from itertools import islice
+
+from quantum_type.core.engine import GAME_DURATION, GameEngine
+from quantum_type.core.game_state import GameState
+from quantum_type.core.recorder import REC_END, REC_KEY, REC_MESSAGE, Recording
+
+
+class _ReplayEngine(GameEngine):
+    """Takes its keys from the recording rather than the keyboard"""
+
+    def on_key_press(self, event):
+        pass
+
+
+class _ReplayLink:
+    """Stands in for the network handler of a recorded multiplayer match"""
+
+    def __init__(self, replayer, digest):
+        self.replayer = replayer
+        self.text_digest = digest
+        self.clock_synced = True
+
+    def host_time(self):
+        return self.replayer.now()
+
+    def send_message(self, msg):
+        pass
+
+    def stop(self):
+        pass
+
+
+class _ReplayUI:
+    """The frontend as the replayed engine sees it: timers run on the
+    replay clock and dialogs become status lines, so playback never blocks
+    on a message box. Everything else goes straight to the frontend."""
+
+    def __init__(self, ui, replayer):
+        self._ui = ui
+        self._replayer = replayer
+
+    def __getattr__(self, name):
+        return getattr(self._ui, name)
+
+    def after(self, delay, callback):
+        return self._replayer.schedule(self._replayer.now() + delay / 1000, callback)
+
+    def after_cancel(self, job):
+        self._replayer.cancel(job)
+
+    def set_start_enabled(self, enabled):
+        self._ui.set_start_enabled(False)
+
+    def show_info(self, title, message):
+        self._ui.set_status(message)
+
+    def show_error(self, title, message):
+        self._ui.set_status(message, "red")
+
+    def show_main_menu(self):
+        self._replayer.stop()
+        self._ui.show_main_menu()
+
+
+class Replayer:
+    """Replays a ``Recording`` (or the path of one) into any ``AbstractUI``.
+
+    ``speed`` is recorded seconds per real second for ``play``; None means
+    as fast as possible, for headless runs with ``run``.
+    """
+
+    def __init__(self, recording, ui, speed=1.0):
+        if isinstance(recording, str):
+            recording = Recording.load(recording)
+        self.recording = recording
+        self.ui = ui
+        self.speed = speed
+        self.origin = recording.info["origin"]
+        self.engine = _ReplayEngine(GameState(), _ReplayUI(ui, self), recording_dir=None)
+        self.engine.clock = self.now
+        ui.set_game_logic(self.engine)
+        self._now = self.origin
+        self._timers = []  # Heap of (replay time, job, callback)
+        self._cancelled = set()
+        self._jobs = itertools.count()
+        self.position = 0  # Index of the next event to play
+        self.started = False
+        self.stopped = False
+        self._pace = None  # (monotonic, replay time) while playing in real time
+        self._pump_job = None
+
+    def now(self):
+        """Now on the replay clock (the recording's host timeline)"""
+        return self._now
+
+    @property
+    def elapsed(self):
+        """Seconds into the recording"""
+        return self._now - self.origin
+
+    @property
+    def finished(self):
+        return self.stopped or (
+            self.started
+            and self.position >= len(self.recording.events)
+            and not self.engine.state.game_started
+        )
+
+    # Scheduling on the replay clock
+
+    def schedule(self, at, callback):
+        job = next(self._jobs)
+        heapq.heappush(self._timers, (at, job, callback))
+        return job
+
+    def cancel(self, job):
+        self._cancelled.add(job)
+
+    def next_due(self):
+        while self._timers and self._timers[0][1] in self._cancelled:
+            _, job, _ = heapq.heappop(self._timers)
+            self._cancelled.discard(job)
+        return self._timers[0][0] if self._timers else None
+
+    def advance(self, until):
+        """Run everything due up to the replay time ``until``"""
+        while not self.stopped:
+            due = self.next_due()
+            if due is None or due > until:
+                break
+            _, _, callback = heapq.heappop(self._timers)
+            self._now = max(self._now, due)
+            callback()
+        self._now = max(self._now, until)
+
+    # Events
+
+    def start(self):
+        """Load the recorded text and mode, and go to the start"""
+        info = self.recording.info
+        engine = self.engine
+        state = engine.state
+        engine.set_text(self.recording.text)
+        state.is_host = info["is_host"]
+        state.is_single_player = info["is_single_player"]
+        state.room_code = info.get("room", "")
+        if state.is_single_player:
+            self.ui.hide_multiplayer_elements()
+        else:
+            state.network = _ReplayLink(self, info["digest"])
+            # Leave the lobby controls behind, keep the opponents' displays
+            self.ui.hide_multiplayer_elements()
+            self.ui.show_multiplayer_elements()
+        self.ui.set_text_content(engine.target, opponent=not state.is_single_player)
+        self.ui.set_start_enabled(False)
+        self.ui.set_back_enabled(True)
+        self.started = True
+        self.seek(0.0)
+
+    def _play_events(self):
+        events = self.recording.events
+        while self.position < len(events):
+            seconds, kind, data = events[self.position]
+            if self.origin + seconds > self._now:
+                self.schedule(self.origin + seconds, self._play_events)
+                return
+            self.position += 1
+            if kind == REC_KEY:
+                _, char, keysym, _ = data
+                self.engine.on_key(char, keysym)
+            elif kind == REC_MESSAGE:
+                self.engine.handle_message(data)
+            elif kind == REC_END:
+                self._end()
+
+    def _end(self):
+        state = self.engine.state
+        if not state.game_started:
+            return
+        if self._now >= state.start_at + GAME_DURATION:
+            # Recorded just before the match timer fired here
+            self.engine.end_game()
+        else:
+            # The player left in the middle of the match
+            state.game_started = False
+            self.engine.halt()
+
+    def _rebuild_keystrokes(self, position):
+        """Refill the keystroke log and live stats from the recorded keys"""
+        engine = self.engine
+        state = engine.state
+        state.keystrokes.clear()
+        state.stats.reset(state.start_at)
+        for seconds, kind, data in islice(self.recording.events, position):
+            if kind == REC_KEY:
+                engine.log_keystroke(self.origin + seconds, *data)
+
+    def seek(self, seconds):
+        """Jump to ``seconds`` into the recording"""
+        if not self.started:
+            self.start()
+        snapshot_time, position, saved = self.recording.snapshot_before(max(0.0, seconds))
+        self.engine.halt()
+        self._timers.clear()
+        self._cancelled.clear()
+        self.stopped = False
+        self._now = self.origin + snapshot_time
+        self.position = position
+        self.engine.restore_state(saved, self.origin)
+        self._rebuild_keystrokes(position)
+        self.schedule(self._now, self._play_events)
+        self.advance(self.origin + max(snapshot_time, seconds))
+        if self._pace is not None:
+            self._pace = (time.monotonic(), self._now)
+
+    def run(self, until=None):
+        """Play as fast as possible to ``until`` seconds into the recording,
+        or to the end; returns the number of callbacks run"""
+        if not self.started:
+            self.start()
+        end = math.inf if until is None else self.origin + until
+        ran = 0
+        while not self.finished:
+            due = self.next_due()
+            if due is None or due > end:
+                break
+            _, _, callback = heapq.heappop(self._timers)
+            self._now = max(self._now, due)
+            callback()
+            ran += 1
+        return ran
+
+    # Real time
+
+    def play(self):
+        """Play (or carry on playing) in real time at ``speed``"""
+        if not self.started:
+            self.start()
+        self.pause()
+        self._pace = (time.monotonic(), self._now)
+        self._pump()
+
+    def pause(self):
+        if self._pump_job is not None:
+            self.ui.after_cancel(self._pump_job)
+            self._pump_job = None
+        self._pace = None
+
+    def set_speed(self, speed):
+        playing = self._pace is not None
+        self.pause()
+        self.speed = speed
+        if playing:
+            self.play()
+
+    def stop(self):
+        self.pause()
+        self.engine.halt()
+        self._timers.clear()
+        self.stopped = True
+
+    def _pump(self):
+        self._pump_job = None
+        real_start, replay_start = self._pace
+        self.advance(replay_start + (time.monotonic() - real_start) * self.speed)
+        due = self.next_due()
+        if self.finished or due is None:
+            self._pace = None
+            return
+        delay = math.ceil((due - self._now) / self.speed * 1000)
+        self._pump_job = self.ui.after(max(1, delay), self._pump)
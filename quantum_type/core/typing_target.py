@@ -0,0 +1,174 @@
+"""The practice text, compiled once for fast keystroke checks.
+
+``TypingTarget`` is built when a text is loaded. It normalises the text so
+that every character can be typed on a plain keyboard, then indexes it: the
+codepoint of every position, where each line starts and where each word
+starts and ends. Validating a keystroke is a single array lookup, and
+line/column or word queries are a binary search instead of a rescan.
+"""
+import re
+from array import array
+from bisect import bisect_right
+
+# Keys that never count as typing on their own
+MODIFIER_KEYSYMS = frozenset(
+    {
+        "Shift_L",
+        "Shift_R",
+        "Control_L",
+        "Control_R",
+        "Alt_L",
+        "Alt_R",
+        "Meta_L",
+        "Meta_R",
+        "Super_L",
+        "Super_R",
+        "Caps_Lock",
+        "ISO_Level3_Shift",
+    }
+)
+
+# Codepoints typed with a named key rather than one that produces the char
+KEYSYMS = {ord("\n"): ("Return", "KP_Enter")}
+
+TAB_WIDTH = 4
+
+# Typographic characters and the ASCII a keyboard produces for them
+_REPLACEMENTS = {
+    "\u2018": "'",  # Single quotes
+    "\u2019": "'",
+    "\u201a": "'",
+    "\u201b": "'",
+    "\u201c": '"',  # Double quotes
+    "\u201d": '"',
+    "\u201e": '"',
+    "\u201f": '"',
+    "\u2010": "-",  # Hyphens, figure dash, en and em dash, bar and minus
+    "\u2011": "-",
+    "\u2012": "-",
+    "\u2013": "-",
+    "\u2014": "-",
+    "\u2015": "-",
+    "\u2212": "-",
+    "\u2026": "...",  # Ellipsis
+    "\u00a0": " ",  # No-break, thin and narrow no-break space
+    "\u2009": " ",
+    "\u202f": " ",
+    "\t": " " * TAB_WIDTH,
+    "\x85": "\n",  # Next line, line and paragraph separators
+    "\u2028": "\n",
+    "\u2029": "\n",
+}
+_TRANSLATION = str.maketrans(_REPLACEMENTS)
+# Everything else that cannot be typed: other control characters, zero-width
+# and direction marks, and BOMs
+_UNTYPABLE = re.compile(
+    "[\x00-\x08\x0b-\x1f\x7f-\x9f\u200b-\u200f\u202a-\u202e\u2060\ufeff]"
+)
+
+# CJK punctuation, kana, ideographs and fullwidth forms are words of their own
+_CJK = "\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef"
+_WORD = re.compile(f"[{_CJK}]|[^\\s{_CJK}]+")
+
+
+def normalize_text(text):
+    """The text as it will be typed: LF line endings, ASCII punctuation,
+    tabs expanded to spaces and untypable characters removed"""
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return _UNTYPABLE.sub("", text.translate(_TRANSLATION))
+
+
+class TypingTarget:
+    """Index over a normalised practice text"""
+
+    def __init__(self, text, normalize=True):
+        self.text = normalize_text(text) if normalize else text
+        self.length = 0
+        self.codepoints = array("I")
+        self.line_starts = array("I", [0])
+        self.word_starts = array("I")
+        self.word_ends = array("I")
+        self._index(self.text)
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        """A target over already normalised chunks of text, indexed one at a
+        time as they come; a word must not be split between two chunks"""
+        target = cls("", normalize=False)
+        parts = []
+        for chunk in chunks:
+            target._index(chunk)
+            parts.append(chunk)
+        target.text = "".join(parts)
+        return target
+
+    def _index(self, text):
+        """Index text that follows everything indexed so far"""
+        offset = self.length
+        self.codepoints.frombytes(text.encode("utf-32-le"))
+        self.line_starts.extend(offset + m.end() for m in re.finditer("\n", text))
+        for match in _WORD.finditer(text):
+            self.word_starts.append(offset + match.start())
+            self.word_ends.append(offset + match.end())
+        self.length += len(text)
+
+    def __len__(self):
+        return self.length
+
+    def char_at(self, index):
+        return self.text[index]
+
+    def expected_keysyms(self, index):
+        """Keysyms that type position ``index``, or () if ``event.char`` does"""
+        return KEYSYMS.get(self.codepoints[index], ())
+
+    def matches(self, index, char, keysym):
+        """Whether a key press (Tk ``event.char``/``event.keysym``) types ``index``"""
+        if index >= self.length:
+            return False
+        codepoint = self.codepoints[index]
+        keysyms = KEYSYMS.get(codepoint)
+        if keysyms is not None:
+            return keysym in keysyms
+        return len(char) == 1 and ord(char) == codepoint
+
+    def is_complete(self, index):
+        return index >= self.length
+
+    @property
+    def line_count(self):
+        return len(self.line_starts)
+
+    def line_col(self, index):
+        """(line, column) of ``index``, both from 0"""
+        line = bisect_right(self.line_starts, index) - 1
+        return line, index - self.line_starts[line]
+
+    def offset(self, line, column=0):
+        """Inverse of ``line_col``"""
+        return self.line_starts[line] + column
+
+    def line_span(self, line):
+        """[start, end) of a line, without its newline"""
+        start = self.line_starts[line]
+        if line + 1 < len(self.line_starts):
+            return start, self.line_starts[line + 1] - 1
+        return start, self.length
+
+    @property
+    def word_count(self):
+        return len(self.word_starts)
+
+    def word_index(self, index):
+        """Number of the word at or before ``index``, -1 before the first"""
+        return bisect_right(self.word_starts, index) - 1
+
+    def word_span(self, word):
+        return self.word_starts[word], self.word_ends[word]
+
+    def words_completed(self, index):
+        """Words fully typed once the cursor is at ``index``"""
+        word = self.word_index(index)
+        if word >= 0 and self.word_ends[word] <= index:
+            return word + 1
+        return max(word, 0)
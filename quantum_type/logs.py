@@ -0,0 +1,113 @@
+"""Logging for the game, the network layer and the server.
+
+Every subsystem logs through ``get_logger(name)``, a child of the
+``quantum_type`` logger. Call sites pass %-style arguments rather than
+f-strings, so a message below the active level costs a single level check;
+per-frame messages are logged at DEBUG.
+
+``setup_logging`` puts a QueueHandler on the ``quantum_type`` logger and a
+QueueListener thread behind it that does the writing, so neither the I/O
+loop nor the Tk thread ever waits on the terminal. Repeated messages from
+one call site can be rate limited with ``RateLimitFilter``.
+
+The level defaults to INFO; set ``QUANTUM_TYPE_LOG=DEBUG`` to see every
+frame sent and received.
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+ROOT_LOGGER = "quantum_type"
+LEVEL_ENV = "QUANTUM_TYPE_LOG"
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+DEFAULT_RATE_LIMIT = (1.0, 10)  # (interval in seconds, messages per interval)
+
+_listener = None
+
+
+def get_logger(subsystem):
+    """Logger for one subsystem, e.g. ``get_logger("network")``"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{subsystem}")
+
+
+class RateLimitFilter(logging.Filter):
+    """Let each call site through at most ``burst`` times per ``interval``.
+
+    Records are told apart by where they were logged, not by their
+    arguments, so "Error sending to %s" counts as one message whatever the
+    address. The next record let through says how many were suppressed.
+    """
+
+    def __init__(self, interval=1.0, burst=10):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self._windows = {}  # call site -> [window start, passed, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        site = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(site)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                self._windows[site] = [now, 1, 0]
+                if suppressed:
+                    record.msg = f"{record.msg} [{suppressed} similar suppressed]"
+                return True
+            if window[1] < self.burst:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+
+def _parse_level(level):
+    if level is None:
+        level = os.environ.get(LEVEL_ENV, "INFO")
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+    return level if isinstance(level, int) else logging.INFO
+
+
+def setup_logging(level=None, rate_limit=None, stream=None):
+    """Route every ``quantum_type`` logger through a background listener.
+
+    ``level`` is a level name or number (default: ``$QUANTUM_TYPE_LOG`` or
+    INFO), ``rate_limit`` an ``(interval, burst)`` pair or None. Calling it
+    again replaces the previous setup.
+    """
+    global _listener
+    shutdown_logging()
+    log_queue = queue.SimpleQueue()
+    handler = logging.handlers.QueueHandler(log_queue)
+    if rate_limit:
+        # Filters run in the caller's thread: suppressed records never queue
+        handler.addFilter(RateLimitFilter(*rate_limit))
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.handlers = [handler]
+    logger.setLevel(_parse_level(level))
+    logger.propagate = False
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    """Write out whatever is still queued and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,26 @@
+import os
+
+from .network_handler import NetworkHandler
+from .async_handler import AsyncNetworkHandler
+
+TRANSPORTS = {
+    "selector": NetworkHandler,
+    "asyncio": AsyncNetworkHandler,
+}
+
+
+def create_network_handler(is_host, ip, port, transport=None):
+    """Build a handler for the chosen transport.
+
+    The backend defaults to the QUANTUM_TYPE_TRANSPORT environment variable
+    ("selector" or "asyncio"), falling back to the selector loop.
+    """
+    name = transport or os.environ.get("QUANTUM_TYPE_TRANSPORT", "selector")
+    try:
+        handler_class = TRANSPORTS[name]
+    except KeyError:
+        raise ValueError(f"Unknown transport: {name}") from None
+    return handler_class(is_host, ip, port)
+
+
+__all__ = ['NetworkHandler', 'AsyncNetworkHandler', 'create_network_handler']
@@ -0,0 +1,256 @@
+import asyncio
+import socket
+import threading
+import time
+
+from quantum_type.logs import get_logger
+from quantum_type.network.base_handler import BaseNetworkHandler
+from quantum_type.network.codec import JSON_CODEC
+from quantum_type.network.framing import HEADER_SIZE, MAX_FRAME_SIZE
+from quantum_type.network.send_queue import SendQueue
+
+log = get_logger("network")
+
+
+class StreamConnection:
+    """A peer reached through an asyncio StreamReader/StreamWriter pair"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.addr = writer.get_extra_info("peername")
+        self.player_id = None
+        self.codec = JSON_CODEC
+        self.features = set()
+        self.transfer = None
+        self.joined = False  # Host side: set by the peer's first message
+        self.last_seen = time.monotonic()
+        self.queue = SendQueue()
+        self.ready = asyncio.Event()  # Set when the queue has frames (or on close)
+        self.closed = False
+
+
+class AsyncNetworkHandler(BaseNetworkHandler):
+    """asyncio transport with the same interface as NetworkHandler.
+
+    The event loop runs on its own daemon thread. Calls coming from the UI
+    thread only hand work to the loop with ``call_soon_threadsafe``, so they
+    never block on the network; received messages travel back through the
+    game's thread-safe ``state.queue`` as before. One loop serves every
+    connection, there is no thread per socket.
+    """
+
+    CONNECT_TIMEOUT = 5.0
+
+    def __init__(self, is_host, ip, port):
+        super().__init__(is_host, ip, port)
+        self.loop = None
+        self.server = None
+        self._loop_thread = None
+        self._tasks = set()
+
+    def _ensure_loop(self):
+        if self.loop is None:
+            self.loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(
+                target=self.loop.run_forever, daemon=True
+            )
+            self._loop_thread.start()
+
+    def _run(self, coro, timeout=None):
+        """Run a coroutine on the loop thread and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def start(self):
+        if not self.running:
+            # connect() failed, there is nothing to drive
+            return
+        self._ensure_loop()
+        if self.is_host:
+            try:
+                self.server = self._run(self._serve(self.port))
+            except OSError:
+                self.port = self.port + 1
+                self.server = self._run(self._serve(self.port))
+                self._report_info("Port Changed", f"Using port {self.port} instead")
+            # Port 0 asks the OS for a free port; report the one we got
+            self.port = self.server.sockets[0].getsockname()[1]
+        elif self.connection:
+            # The write loop already runs: connect() started it
+            self.loop.call_soon_threadsafe(self._spawn, self._read_loop(self.connection))
+        self.loop.call_soon_threadsafe(self._spawn, self._tick_loop())
+
+    def _spawn(self, coro):
+        # Keep a strong reference so running tasks are not garbage collected
+        task = self.loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _serve(self, port):
+        return await asyncio.start_server(
+            self._on_client, self.ip, port, backlog=socket.SOMAXCONN
+        )
+
+    async def _tick_loop(self):
+        while self.running:
+            await asyncio.sleep(self.tick_interval)
+            self._on_tick()
+
+    async def _on_client(self, reader, writer):
+        conn = StreamConnection(reader, writer)
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._spawn(self._write_loop(conn))
+        # The peer joins (or resumes its session) with its first message
+        await self._read_loop(conn)
+
+    async def _read_loop(self, conn):
+        try:
+            while self.running:
+                header = await conn.reader.readexactly(HEADER_SIZE)
+                msg_len = int.from_bytes(header, byteorder="big")
+                if msg_len > MAX_FRAME_SIZE:
+                    log.warning("Dropping connection %s: frame of %d bytes", conn.addr, msg_len)
+                    break
+                payload = await conn.reader.readexactly(msg_len)
+                self._handle_frame(conn, payload)
+        except (asyncio.IncompleteReadError, ConnectionError, OSError) as e:
+            if self.running:
+                log.warning(
+                    "%s receive error: %s", "Host" if self.is_host else "Client", e
+                )
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            # Only the peer that sent it pays for a bad frame
+            log.error("Dropping connection %s after bad frame: %r", conn.addr, e)
+        finally:
+            self._drop_connection(conn)
+
+    async def _write_loop(self, conn):
+        """Drain conn's send queue, waiting for the transport to catch up.
+
+        Awaiting ``drain()`` keeps at most one batch in the transport buffer,
+        so a slow reader backs up in the SendQueue where stale frames can be
+        replaced and saturation is measured.
+        """
+        try:
+            while not conn.closed:
+                conn.ready.clear()
+                data = conn.queue.take()
+                if not data:
+                    await conn.ready.wait()
+                    continue
+                conn.writer.write(data)
+                await conn.writer.drain()
+        except (ConnectionError, OSError, RuntimeError) as e:
+            if self.running:
+                log.warning("Error sending to %s: %s", conn.addr, e)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._drop_connection(conn)
+
+    def _enqueue(self, conn, frame, key=None):
+        if conn.closed or self.loop is None:
+            return
+        conn.queue.push(frame, key)
+        if threading.current_thread() is self._loop_thread:
+            conn.ready.set()
+        else:
+            self.loop.call_soon_threadsafe(conn.ready.set)
+
+    def _call_on_io_thread(self, callback):
+        thread = self._loop_thread
+        if self.loop is None or not self.loop.is_running() or threading.current_thread() is thread:
+            callback()
+        else:
+            self.loop.call_soon_threadsafe(callback)
+
+    def _drop_connection(self, conn):
+        if conn.closed:
+            return
+        conn.closed = True
+        conn.ready.set()  # Let the write loop finish
+        conn.writer.close()
+        self._connection_lost(conn)
+
+    def connect(self, host_ip):
+        self.ip = host_ip  # Reconnects go back to the same host
+        self._ensure_loop()
+        for attempt in range(2):
+            try:
+                log.info("Attempting to connect to host at %s:%s", host_ip, self.port)
+                reader, writer = self._run(
+                    asyncio.wait_for(
+                        asyncio.open_connection(host_ip, self.port),
+                        self.CONNECT_TIMEOUT,
+                    )
+                )
+                sock = writer.get_extra_info("socket")
+                if sock is not None:
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                self.connection = StreamConnection(reader, writer)
+                self.loop.call_soon_threadsafe(
+                    self._spawn, self._write_loop(self.connection)
+                )
+                log.info("Connected to host at %s:%s", host_ip, self.port)
+                return
+            except ConnectionRefusedError:
+                if attempt == 0:
+                    log.info("Connection refused at port %s, trying next port", self.port)
+                    self.port += 1
+                    continue
+                log.error("Failed to connect with second port")
+                self._report_error("Connection Error", "Could not connect to host")
+            except Exception as e:
+                log.error("Connection error: %s", e)
+                self._report_error(
+                    "Connection Error", f"Could not connect to host: {str(e)}"
+                )
+            self.running = False
+            return
+
+    def _open_connection(self):
+        try:
+            reader, writer = self._run(
+                asyncio.wait_for(
+                    asyncio.open_connection(self.ip, self.port), self.CONNECT_TIMEOUT
+                )
+            )
+        except Exception as e:
+            log.warning("Connection error: %s", e)
+            return False
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn = StreamConnection(reader, writer)
+        self.connection = conn
+        self.loop.call_soon_threadsafe(self._spawn, self._write_loop(conn))
+        self.loop.call_soon_threadsafe(self._spawn, self._read_loop(conn))
+        return True
+
+    def stop(self):
+        if self.running:
+            self.running = False
+            if self.loop is None:
+                return
+            try:
+                self._run(self._shutdown(), timeout=2.0)
+            except Exception as e:
+                log.error("Error while stopping network loop: %s", e)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+    async def _shutdown(self):
+        for task in list(self._tasks):
+            if task is not asyncio.current_task():
+                task.cancel()
+        if self.server is not None:
+            self.server.close()
+        for conn in self.clients[:]:
+            self._drop_connection(conn)
+        if self.connection:
+            self._drop_connection(self.connection)
+        if self.server is not None:
+            await self.server.wait_closed()
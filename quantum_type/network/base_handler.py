@@ -0,0 +1,749 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from quantum_type.logs import get_logger
+
+from quantum_type.network.codec import (
+    JSON_CODEC,
+    SUPPORTED_CODECS,
+    choose_codec,
+    decode_payload,
+    encode_payload,
+)
+from quantum_type.network.clock import ClockSync, pong_message
+from quantum_type.network.coalescer import ProgressCoalescer
+from quantum_type.network.framing import encode_frame
+from quantum_type.network.protocol import check_message, text_messages
+from quantum_type.network.scoreboard import SCOREBOARD_INTERVAL, Scoreboard
+from quantum_type.network.session import (
+    HEARTBEAT_INTERVAL,
+    HEARTBEAT_TIMEOUT,
+    SESSION_FEATURE,
+    SessionTable,
+    backoff_delays,
+    snapshot_message,
+)
+from quantum_type.network.text_transfer import (
+    MAX_TEXT_RETRIES,
+    TEXT_FEATURE,
+    ChunkAssembler,
+    ChunkedTransfer,
+    OutgoingTransfer,
+    TextBlob,
+    TextCache,
+    check_offer,
+    text_digest,
+)
+
+log = get_logger("network")
+
+# What this client supports beyond the original protocol
+CLIENT_FEATURES = [TEXT_FEATURE, SESSION_FEATURE]
+
+
+class BaseNetworkHandler(ABC):
+    """Message handling shared by every transport backend.
+
+    Subclasses own the sockets and implement ``start``, ``connect``, ``stop``,
+    ``_enqueue``, ``_drop_connection``, ``_open_connection`` and
+    ``_call_on_io_thread``; everything
+    that decides *what* goes over the wire lives here so GameLogic sees the
+    same behaviour whichever backend is in use.
+    """
+
+    def __init__(self, is_host, ip, port):
+        self.is_host = is_host
+        self.ip = ip
+        self.port = port
+        self.clients = []
+        self.connection = None  # Client side: the link to the host
+        self.running = True
+        self.game = None
+
+        # The host assigns player ids (its own is 0) and owns the scoreboard
+        self.player_id = 0 if is_host else None
+        self.scoreboard = Scoreboard()
+        self.scoreboard_interval = SCOREBOARD_INTERVAL
+        self._next_player_id = 1
+        if is_host:
+            self.scoreboard.add_player(0, "Host")
+
+        # Outbound PROGRESS is coalesced to one frame per tick. The counters
+        # compare keystrokes against frames actually put on the wire.
+        self.coalescer = ProgressCoalescer()
+        self.progress_updates = 0
+        self.scoreboard_frames = 0
+        # Connections dropped because they could not keep up with their queue
+        self.evicted = 0
+
+        # The host's monotonic clock is the match timeline; clients estimate
+        # their offset to it, and the host keeps what each client reported
+        self.clock = ClockSync(resync_interval=HEARTBEAT_INTERVAL)
+        self.clock_reports = {}
+
+        # Sessions let a dropped client resume its seat (see network.session)
+        self.sessions = SessionTable()
+        self.session = None  # Client: our token, once the host issued one
+        self.auto_reconnect = True
+        self.match = None  # Host: start_at/duration of the running match
+        self.text_digest = None  # Client: digest of the text we have loaded
+        self.room_code = None  # Client: room on a dedicated server, if any
+        self._reconnect_thread = None
+
+        # Texts travel by digest; clients keep a local cache of past texts
+        self.text_cache = TextCache()
+        self.current_blob = None  # Host: the text offered most recently
+        self.incoming_text = None  # Client: transfer in progress
+        self.chunk_assembler = None  # Client: chunked text from older hosts
+
+        log.info(
+            "NetworkHandler initialized as %s with IP %s and port %s",
+            "host" if is_host else "client", ip, port,
+        )
+
+    def set_game(self, game):
+        self.game = game
+
+    @abstractmethod
+    def start(self):
+        """Start serving (host) or reading from the host (client)."""
+        pass
+
+    @abstractmethod
+    def connect(self, host_ip):
+        """Open the client connection to the host."""
+        pass
+
+    @abstractmethod
+    def stop(self):
+        """Close every connection and stop the I/O thread."""
+        pass
+
+    @abstractmethod
+    def _enqueue(self, conn, frame, key=None):
+        """Queue an encoded frame on conn's SendQueue without blocking.
+
+        A frame with a ``key`` replaces an unsent frame with the same key.
+        """
+        pass
+
+    @abstractmethod
+    def _drop_connection(self, conn):
+        """Close conn and report it through ``_connection_lost``."""
+        pass
+
+    @abstractmethod
+    def _open_connection(self):
+        """Client: open a fresh link to the host; returns True on success."""
+        pass
+
+    @abstractmethod
+    def _call_on_io_thread(self, callback):
+        """Run callback on the I/O thread, in call order, without waiting.
+
+        Runs it right away when called from that thread or before it starts.
+        """
+        pass
+
+    def _client_joined(self, conn):
+        conn.joined = True
+        conn.player_id = self._next_player_id
+        self._next_player_id += 1
+        self.clients.append(conn)
+        self.scoreboard.add_player(conn.player_id, f"Client {conn.player_id}")
+
+        msg = {
+            "type": "CLIENT_JOINED",
+            "player_id": conn.player_id,
+            "session": self.sessions.open(conn.player_id),
+        }
+        self._send_raw_message_to_client(msg, conn)
+        self._send_raw_message_to_client(self.scoreboard.full_update(), conn)
+        self._broadcast_players()
+
+        # Also notify the host that a client has joined
+        self._deliver(msg)
+
+    def _connection_lost(self, conn):
+        if self.is_host:
+            try:
+                self.clients.remove(conn)
+            except ValueError:
+                pass
+            log.info("Client %s disconnected", conn.addr)
+            if not getattr(conn, "joined", False) or conn.player_id is None:
+                return
+            if SESSION_FEATURE in conn.features and self.running:
+                # Keep the seat; the client is expected to RESUME
+                self.sessions.suspend(conn.player_id)
+                return
+            self._remove_player(conn.player_id)
+        else:
+            log.warning("Connection to host lost")
+            self._suspend_text_transfer()
+            if self.running and self.session and self.auto_reconnect:
+                self._start_reconnect()
+            else:
+                self.running = False
+
+    def _remove_player(self, player_id):
+        self.sessions.close(player_id)
+        self.scoreboard.remove_player(player_id)
+        self.clock_reports.pop(player_id, None)
+        self._broadcast_players()
+
+    def _client_resumed(self, conn, msg):
+        """Host: rebind conn to the player id of a RESUME's session"""
+        player_id = self.sessions.resume(msg.get("session"))
+        if player_id is None or player_id not in self.scoreboard.names:
+            return False
+        for old in self.clients[:]:
+            if old.player_id == player_id:
+                # The old link is half-open; forget it without freeing the seat
+                self.clients.remove(old)
+                old.player_id = None
+                self._drop_connection(old)
+        conn.joined = True
+        conn.player_id = player_id
+        self.clients.append(conn)
+        log.info("Client %s resumed as player %s", conn.addr, player_id)
+        self._negotiate_codec(conn, msg.get("codecs"))
+        conn.features = set(msg.get("features") or ())
+        self._send_raw_message_to_client(self._snapshot(player_id), conn)
+        blob = self.current_blob
+        if blob is not None and msg.get("digest") != blob.digest:
+            self._offer_text(conn, blob)
+        return True
+
+    def _snapshot(self, player_id):
+        match = self.match or {}
+        blob = self.current_blob
+        return snapshot_message(
+            self.scoreboard,
+            player_id,
+            self.sessions.token_of(player_id),
+            blob.digest if blob else None,
+            match.get("start_at"),
+            match.get("duration"),
+            time.monotonic(),
+        )
+
+    def _start_reconnect(self):
+        if self._reconnect_thread and self._reconnect_thread.is_alive():
+            return
+        self._reconnect_thread = threading.Thread(target=self._reconnect, daemon=True)
+        self._reconnect_thread.start()
+
+    def _reconnect(self):
+        """Client: retry the host with exponential backoff, then RESUME"""
+        for attempt, delay in enumerate(backoff_delays(), 1):
+            self._deliver(
+                {"type": "CONNECTION", "state": "reconnecting", "attempt": attempt}
+            )
+            time.sleep(delay)
+            if not self.running:
+                return
+            log.info("Reconnect attempt %d to %s:%s", attempt, self.ip, self.port)
+            if self._open_connection():
+                self.clock.forget_pending()
+                self._send_raw_message(
+                    {
+                        "type": "RESUME",
+                        "session": self.session,
+                        "digest": self.text_digest,
+                        "room": self.room_code,
+                        "codecs": SUPPORTED_CODECS,
+                        "features": CLIENT_FEATURES,
+                    }
+                )
+                self._deliver({"type": "CONNECTION", "state": "connected"})
+                return
+        log.error("Giving up reconnecting to host")
+        self.running = False
+        self._deliver({"type": "CONNECTION", "state": "lost"})
+
+    def _broadcast_players(self):
+        msg = self.scoreboard.players_message()
+        self._send_raw_message(msg)
+        self._deliver(msg)
+
+    def _deliver(self, msg):
+        """Hand a message to the local game through its thread-safe queue"""
+        if self.game and hasattr(self.game.state, "queue"):
+            self.game.state.queue.put(msg)
+
+    @property
+    def tick_interval(self):
+        if self.is_host:
+            return self.scoreboard_interval
+        return self.coalescer.interval
+
+    def _on_tick(self):
+        """Called by the transport once per tick_interval"""
+        if self.is_host:
+            self._flush_scoreboard()
+            self._check_clients()
+            for conn in self.clients[:]:
+                if isinstance(conn.transfer, ChunkedTransfer):
+                    self._pump_chunked_text(conn)
+        else:
+            self._flush_progress()
+            conn = self.connection
+            if conn is None or conn.closed:
+                return
+            if self.clock.ping_due():
+                self._send_raw_message(self.clock.ping_message())
+            if self.session and time.monotonic() - conn.last_seen > HEARTBEAT_TIMEOUT:
+                log.warning("No heartbeat from host, reconnecting")
+                self._drop_connection(conn)
+            elif conn.queue.should_evict():
+                log.warning("Host is not reading, reconnecting")
+                self._evict(conn)
+
+    def _check_clients(self):
+        """Host: drop silent clients and free seats nobody came back for"""
+        now = time.monotonic()
+        for conn in self.clients[:]:
+            silent = now - conn.last_seen > HEARTBEAT_TIMEOUT
+            if silent and SESSION_FEATURE in conn.features:
+                log.warning("No heartbeat from %s, dropping connection", conn.addr)
+                self._drop_connection(conn)
+            elif conn.queue.should_evict(now):
+                log.warning("Client %s is not keeping up, dropping connection", conn.addr)
+                self._evict(conn)
+        for player_id in self.sessions.expired(now):
+            log.info("Player %s did not reconnect", player_id)
+            self._remove_player(player_id)
+
+    def _evict(self, conn):
+        """Drop a slow consumer; a session client can come back with RESUME"""
+        self.evicted += 1
+        self._drop_connection(conn)
+
+    def queue_stats(self):
+        """Send queue depth of every connection, keyed by player id"""
+        conns = self.clients[:] if self.is_host else [self.connection]
+        return {
+            "evicted": self.evicted,
+            "queues": {
+                str(conn.player_id): conn.queue.stats()
+                for conn in conns
+                if conn is not None and not conn.closed
+            },
+        }
+
+    def host_time(self):
+        """Now, on the host's monotonic timeline"""
+        if self.is_host:
+            return time.monotonic()
+        return self.clock.host_time()
+
+    def local_time(self, host_time):
+        """Local monotonic time of an instant on the host's timeline"""
+        if self.is_host:
+            return host_time
+        return self.clock.local_time(host_time)
+
+    @property
+    def clock_synced(self):
+        return self.is_host or self.clock.synced
+
+    def _flush_scoreboard(self):
+        """Send the progress collected since the last tick as one message.
+
+        A client that has not been sent the previous tick's delta yet gets
+        the full table in its place, so it catches up with one frame instead
+        of working through a backlog.
+        """
+        if not (self.is_host and self.scoreboard.has_changes()):
+            return
+        delta = self.scoreboard.take_changes()
+        full = None
+        frames = {}
+        for conn in self.clients[:]:
+            if conn.queue.has("SCOREBOARD"):
+                if full is None:
+                    full = self.scoreboard.full_update()
+                msg, cache_key = full, ("full", conn.codec)
+            else:
+                msg, cache_key = delta, ("delta", conn.codec)
+            frame = frames.get(cache_key)
+            if frame is None:
+                payload = encode_payload(msg, conn.codec)
+                frame = frames[cache_key] = encode_frame(payload)
+            self.scoreboard_frames += 1
+            self._enqueue(conn, frame, "SCOREBOARD")
+
+    def _flush_progress(self):
+        for msg in self.coalescer.take():
+            # PROGRESS is absolute, so an unsent older one can be dropped
+            self._send_raw_message(msg, ("PROGRESS", msg.get("player")))
+
+    def frame_stats(self):
+        """Progress updates made versus frames sent for them"""
+        if self.is_host:
+            return {
+                "keystrokes": self.progress_updates,
+                "frames_sent": self.scoreboard_frames,
+            }
+        return self.coalescer.stats()
+
+    def _handle_frame(self, conn, payload):
+        conn.last_seen = time.monotonic()
+        try:
+            msg = decode_payload(payload)
+            check_message(msg)
+        except ValueError as e:
+            log.warning("Decode error: %s, data length: %d", e, len(payload))
+            return
+        self._handle_message(conn, msg)
+
+    def _handle_message(self, conn, msg):
+        if self.is_host:
+            if not conn.joined:
+                if msg["type"] == "RESUME" and self._client_resumed(conn, msg):
+                    return
+                self._client_joined(conn)
+                if msg["type"] == "RESUME":
+                    # Session unknown or expired: carry on as a new player
+                    self._negotiate_codec(conn, msg.get("codecs"))
+                    conn.features = set(msg.get("features") or ())
+                    self._offer_current_text(conn)
+                    return
+            if msg["type"] == "PING":
+                # Answered right here so queueing in the game adds no error
+                self._send_raw_message_to_client(
+                    pong_message(msg, time.monotonic()), conn
+                )
+                return
+            log.debug("Host received message: %s", msg["type"])
+            if msg["type"] == "PROGRESS":
+                # The connection, not the payload, decides who is progressing.
+                # Other clients learn about it from the next SCOREBOARD tick.
+                msg["player"] = conn.player_id
+                self.progress_updates += 1
+                self.scoreboard.update(conn.player_id, msg["index"], msg["score"])
+            elif msg["type"] == "CLIENT_CONNECTED":
+                self._negotiate_codec(conn, msg.get("codecs"))
+                conn.features = set(msg.get("features") or ())
+            elif msg["type"] == "CLOCK":
+                msg["player"] = conn.player_id
+                self.clock_reports[conn.player_id] = (msg["offset"], msg["rtt"])
+            elif msg["type"] in ("TEXT_REQUEST", "TEXT_ACK", "TEXT_HAVE"):
+                self._handle_text_reply(conn, msg)
+                return
+            self._deliver(msg)
+        else:
+            if msg["type"] == "PONG":
+                self._handle_pong(msg)
+                return
+            log.debug("Client received message: %s", msg["type"])
+            if msg["type"] == "CODEC":
+                # Host accepted one of the codecs we offered
+                self.connection.codec = msg["codec"]
+                return
+            if msg["type"] == "TEXT_OFFER":
+                self._handle_text_offer(msg)
+                return
+            if msg["type"] == "TEXT_DATA":
+                self._handle_text_data(msg)
+                return
+            if msg["type"] in ("TEXT_CHUNKS", "TEXT_CHUNK", "TEXT_COMPLETE"):
+                self._handle_text_chunks(msg)
+                return
+            if msg["type"] == "CLIENT_JOINED" and "player_id" in msg:
+                self.player_id = msg["player_id"]
+                self.session = msg.get("session")
+                self.room_code = msg.get("room", self.room_code)
+            elif msg["type"] == "SNAPSHOT":
+                self.player_id = msg["player_id"]
+                self.session = msg.get("session") or self.session
+            elif msg["type"] == "LOAD_TEXT":
+                self.text_digest = text_digest(msg["text"])
+            self._deliver(msg)
+
+    def _handle_pong(self, msg):
+        """Client: fold one PING/PONG sample into the clock estimate"""
+        changed = self.clock.add_sample(msg["t0"], msg["t1"], msg["t2"])
+        if changed and self.clock.synced:
+            report = {
+                "type": "CLOCK",
+                "player": self.player_id,
+                "offset": self.clock.offset,
+                "rtt": self.clock.rtt,
+            }
+            self._send_raw_message(report)
+            self._deliver(report)
+
+    def _negotiate_codec(self, conn, offered):
+        """Pick a codec for conn; peers that offer nothing stay on JSON"""
+        codec = choose_codec(offered)
+        if codec != JSON_CODEC:
+            # Announce in JSON, everything after it uses the new codec
+            self._send_raw_message_to_client({"type": "CODEC", "codec": codec}, conn)
+            conn.codec = codec
+
+    def _send_text(self, text):
+        """Host: offer text by digest to capable clients, chunk it for the rest"""
+        blob = self.current_blob
+        if blob is None or blob.text != text:
+            blob = self.current_blob = TextBlob(text)
+        log.info(
+            "Offering text %s: %d bytes, %d compressed",
+            blob.digest[:12], blob.size, len(blob.data),
+        )
+        for conn in self.clients[:]:
+            self._offer_text(conn, blob)
+
+    def _offer_current_text(self, conn):
+        if self.current_blob is not None:
+            self._offer_text(conn, self.current_blob)
+
+    def _offer_text(self, conn, blob):
+        conn.transfer = None
+        if TEXT_FEATURE in conn.features:
+            self._send_raw_message_to_client(blob.offer_message(), conn)
+        else:
+            # All at once would overflow the send queue of a long text and
+            # get the client evicted; the I/O thread sends it paced instead
+            conn.transfer = ChunkedTransfer(text_messages(blob.text))
+            self._call_on_io_thread(lambda: self._pump_chunked_text(conn))
+
+    def _pump_chunked_text(self, conn):
+        """Host, on the I/O thread: send chunks while the window has room"""
+        transfer = conn.transfer
+        if not isinstance(transfer, ChunkedTransfer) or conn.closed:
+            return
+        while True:
+            messages = transfer.next_messages(conn.queue.bytes)
+            if not messages:
+                break
+            for msg in messages:
+                self._send_raw_message_to_client(msg, conn)
+        if transfer.done:
+            conn.transfer = None
+
+    def _handle_text_reply(self, conn, msg):
+        """Host: drive the TEXT_DATA window from the client's requests and acks"""
+        blob = self.current_blob
+        if blob is None or msg.get("digest") != blob.digest:
+            return
+        if msg["type"] == "TEXT_REQUEST":
+            conn.transfer = OutgoingTransfer(blob, msg.get("missing"))
+        elif msg["type"] == "TEXT_ACK" and conn.transfer is not None:
+            conn.transfer.on_ack(msg["acked"])
+        else:
+            # TEXT_HAVE: served from the client's cache, or finished
+            conn.transfer = None
+            return
+        for data_msg in conn.transfer.next_messages():
+            self._send_raw_message_to_client(data_msg, conn)
+
+    def _handle_text_offer(self, msg):
+        try:
+            check_offer(msg)
+        except ValueError as e:
+            log.warning("Refusing text offer: %s", e)
+            self.incoming_text = None
+            self._report_error("錯誤", "接收文本失敗，請重新載入")
+            return
+        text = self.text_cache.get(msg["digest"])
+        if text is not None:
+            log.info("Text %s found in local cache", msg["digest"][:12])
+            self.incoming_text = None
+            self.text_digest = msg["digest"]
+            self._send_raw_message({"type": "TEXT_HAVE", "digest": msg["digest"]})
+            self._deliver({"type": "LOAD_TEXT", "text": text})
+            return
+        transfer = self.incoming_text
+        if transfer is None or not transfer.matches(msg):
+            # Picks up chunks saved before a disconnect, if any
+            transfer = self.incoming_text = self.text_cache.resume(msg)
+        if transfer.received:
+            log.info(
+                "Resuming text %s at %d/%d chunks",
+                transfer.digest[:12], transfer.received, transfer.chunk_count,
+            )
+        self._request_missing_text(transfer)
+
+    def _request_missing_text(self, transfer):
+        if transfer.complete:
+            self._finish_text(transfer)
+            return
+        self._send_raw_message(transfer.request_message())
+
+    def _handle_text_data(self, msg):
+        transfer = self.incoming_text
+        if transfer is None or msg["tag"] != transfer.tag:
+            return  # Left over from a text the host has replaced since
+        transfer.add(msg["seq"], msg["data"], msg["crc"])
+        self._send_raw_message(
+            {"type": "TEXT_ACK", "digest": transfer.digest, "acked": transfer.processed}
+        )
+        self._deliver_text_progress(transfer.received, transfer.chunk_count)
+        if not transfer.round_finished:
+            return
+        if not transfer.complete:
+            # Some chunks were corrupt: ask again for just those
+            transfer.retries += 1
+            if transfer.retries > MAX_TEXT_RETRIES:
+                self._fail_text(transfer, "too many corrupt chunks")
+                return
+        self._request_missing_text(transfer)
+
+    def _finish_text(self, transfer):
+        try:
+            text = transfer.text()
+        except Exception as e:
+            # A bad chunk got past its checksum, and there is no telling which
+            transfer.retries += 1
+            if transfer.retries > MAX_TEXT_RETRIES:
+                self._fail_text(transfer, str(e))
+                return
+            log.warning("Text %s did not verify (%s), fetching it again", transfer.digest[:12], e)
+            self.text_cache.discard_partial(transfer)
+            transfer.reset()
+            self._send_raw_message(transfer.request_message())
+            return
+        self.incoming_text = None
+        self.text_cache.discard_partial(transfer)
+        self.text_digest = self.text_cache.put(text)
+        self._send_raw_message({"type": "TEXT_HAVE", "digest": transfer.digest})
+        self._deliver({"type": "LOAD_TEXT", "text": text})
+
+    def _fail_text(self, transfer, reason):
+        log.warning("Text transfer failed: %s", reason)
+        self.incoming_text = None
+        self.text_cache.discard_partial(transfer)
+        self._report_error("錯誤", "接收文本失敗，請重新載入")
+
+    def _deliver_text_progress(self, received, total):
+        self._deliver({"type": "TEXT_TRANSFER", "received": received, "total": total})
+
+    def _suspend_text_transfer(self):
+        """Client: keep the chunks received so far for a resume"""
+        if self.incoming_text is not None and self.incoming_text.received:
+            self.text_cache.save_partial(self.incoming_text)
+
+    def _handle_text_chunks(self, msg):
+        """Client: TEXT_CHUNKS / TEXT_CHUNK / TEXT_COMPLETE from older hosts"""
+        if msg["type"] == "TEXT_CHUNKS":
+            self.chunk_assembler = ChunkAssembler(msg["count"], msg.get("digest"))
+            log.debug("Expecting %d text chunks", msg["count"])
+            self._deliver_text_progress(0, msg["count"])
+            return
+        assembler = self.chunk_assembler
+        if assembler is None:
+            log.warning("Ignoring %s without TEXT_CHUNKS", msg["type"])
+            return
+        if msg["type"] == "TEXT_CHUNK":
+            if assembler.add(msg["index"], msg["chunk"], msg.get("crc")):
+                self._deliver_text_progress(assembler.received, assembler.count)
+            return
+        self.chunk_assembler = None
+        try:
+            text = assembler.text()
+        except ValueError as e:
+            log.warning("Text transfer failed: %s", e)
+            self._report_error("錯誤", "接收文本不完整，請重新載入")
+            return
+        log.info("Text complete, total size: %d", len(text))
+        self.text_digest = text_digest(text)
+        self._deliver({"type": "LOAD_TEXT", "text": text})
+
+    def _send_raw_message_to_client(self, msg, client):
+        """Send a message to a specific client using the length header protocol"""
+        try:
+            msg_bytes = encode_payload(msg, client.codec)
+            log.debug(
+                "Sending direct message: %s, size: %d bytes", msg["type"], len(msg_bytes)
+            )
+            self._enqueue(client, encode_frame(msg_bytes))
+        except Exception as e:
+            log.error("Error in _send_raw_message_to_client: %s", e)
+
+    def send_message(self, msg):
+        try:
+            # Texts go out by digest, or in chunks to clients without support
+            if msg["type"] == "LOAD_TEXT" and self.is_host:
+                self._send_text(msg["text"])
+                return
+
+            if self.is_host and msg["type"] in ("COUNTDOWN_START", "START"):
+                # Remembered for the SNAPSHOT of clients that resume
+                self.match = {
+                    "start_at": msg.get("start_at"),
+                    "duration": msg.get("duration"),
+                }
+            elif self.is_host and msg["type"] == "END":
+                self.match = None
+
+            if msg["type"] == "PROGRESS":
+                if self.is_host:
+                    # The host's own progress rides on the next scoreboard tick
+                    self.progress_updates += 1
+                    self.scoreboard.update(self.player_id, msg["index"], msg["score"])
+                elif self.coalescer.add(msg):
+                    # Too far behind to wait for the tick. Only the I/O
+                    # thread takes from the coalescer, so the slot for this
+                    # player can never get an older index than it has
+                    self._call_on_io_thread(self._flush_progress)
+                return
+
+            if self.is_host:
+                # Anything else (END in particular) must not overtake progress
+                self._flush_scoreboard()
+                self._send_raw_message(msg)
+                return
+
+            if msg["type"] == "CLIENT_CONNECTED":
+                # Offer the compact codec and digest-based text delivery;
+                # old hosts simply ignore these fields
+                msg = dict(msg, codecs=SUPPORTED_CODECS, features=CLIENT_FEATURES)
+            self._call_on_io_thread(lambda: self._send_after_progress(msg))
+        except Exception as e:
+            log.error("Error in send_message: %s", e)
+            pass
+
+    def _send_after_progress(self, msg):
+        """Client, on the I/O thread: send msg behind any pending progress"""
+        try:
+            self._flush_progress()
+            self._send_raw_message(msg)
+        except Exception as e:
+            log.error("Error in send_message: %s", e)
+
+    def _send_raw_message(self, msg, key=None):
+        try:
+            if self.is_host:
+                targets = self.clients[:]  # Use a copy of the list
+            elif self.connection:
+                targets = [self.connection]
+            else:
+                return
+
+            # Encode once per codec in use, not once per client
+            frames = {}
+            for conn in targets:
+                frame = frames.get(conn.codec)
+                if frame is None:
+                    msg_bytes = encode_payload(msg, conn.codec)
+                    # Add message length header (4 bytes) for complete message delivery
+                    frame = frames[conn.codec] = encode_frame(msg_bytes)
+                    log.debug(
+                        "Sending message: %s (%s), size: %d bytes",
+                        msg["type"], conn.codec, len(msg_bytes),
+                    )
+                self._enqueue(conn, frame, key)
+        except Exception as e:
+            log.error("Error in _send_raw_message: %s", e)
+            pass
+
+    # Called from the I/O thread too: the game shows these on the UI thread
+
+    def _report_error(self, title, message):
+        self._deliver({"type": "NOTICE", "level": "error", "title": title, "message": message})
+
+    def _report_info(self, title, message):
+        self._deliver({"type": "NOTICE", "level": "info", "title": title, "message": message})
@@ -0,0 +1,98 @@
+"""NTP-style estimate of the host's monotonic clock.
+
+The host's ``time.monotonic()`` is the match timeline: COUNTDOWN_START and
+START say *when* on that timeline the game begins, and every player converts
+it to its own monotonic clock. Clients learn the conversion by sending PING
+(t0, local clock), which the host answers with PONG carrying its receive and
+send times (t1, t2); the reply arrives at t3. For each sample
+
+    offset = ((t1 - t0) + (t2 - t3)) / 2    host clock minus local clock
+    rtt    = (t3 - t0) - (t2 - t1)
+
+and the sample with the smallest RTT among the most recent ones is used,
+since queueing delay only ever makes a sample worse.
+"""
+import time
+
+SYNC_SAMPLES = 8  # PINGs in the initial burst, and samples kept
+MIN_SAMPLES = 3  # Samples needed before the estimate is trusted
+RESYNC_INTERVAL = 5.0  # Seconds between PINGs once synchronised
+
+
+class ClockSync:
+    """Offset between the local and the host's monotonic clock"""
+
+    def __init__(self, samples=SYNC_SAMPLES, min_samples=MIN_SAMPLES,
+                 resync_interval=RESYNC_INTERVAL):
+        self.max_samples = samples
+        self.min_samples = min_samples
+        self.resync_interval = resync_interval
+        self.samples = []  # (rtt, offset), newest last
+        self.offset = 0.0
+        self.rtt = None
+        self._next_seq = 0
+        self._last_ping = None
+        self._outstanding = False
+
+    @property
+    def synced(self):
+        return len(self.samples) >= self.min_samples
+
+    def ping_due(self, now=None):
+        """Whether it is time for the next PING"""
+        now = time.monotonic() if now is None else now
+        if self._last_ping is None:
+            return True
+        if self._next_seq < self.max_samples:
+            # Initial burst: one PING per tick, never more than one in flight
+            return not self._outstanding
+        return now - self._last_ping >= self.resync_interval
+
+    def ping_message(self):
+        self._next_seq += 1
+        self._last_ping = time.monotonic()
+        self._outstanding = True
+        return {"type": "PING", "seq": self._next_seq, "t0": self._last_ping}
+
+    def forget_pending(self):
+        """The connection was replaced; a PONG in flight will never arrive"""
+        self._outstanding = False
+
+    def add_sample(self, t0, t1, t2, t3=None):
+        """Record one PING/PONG exchange.
+
+        Returns True if the estimate changed, or has just become trusted.
+        """
+        t3 = time.monotonic() if t3 is None else t3
+        self._outstanding = False
+        rtt = (t3 - t0) - (t2 - t1)
+        offset = ((t1 - t0) + (t2 - t3)) / 2
+        self.samples.append((max(rtt, 0.0), offset))
+        del self.samples[: -self.max_samples]
+        best_rtt, best_offset = min(self.samples)
+        changed = best_rtt != self.rtt or best_offset != self.offset
+        self.rtt, self.offset = best_rtt, best_offset
+        return changed or len(self.samples) == self.min_samples
+
+    def host_time(self, local=None):
+        """The host's monotonic clock, estimated from the local one"""
+        local = time.monotonic() if local is None else local
+        return local + self.offset
+
+    def local_time(self, host):
+        """Local monotonic time corresponding to a host timestamp"""
+        return host - self.offset
+
+    def report(self):
+        return {"offset": self.offset, "rtt": self.rtt, "samples": len(self.samples)}
+
+
+def pong_message(ping, received):
+    """Answer a PING; ``received`` is the host clock when it arrived"""
+    return {
+        "type": "PONG",
+        "seq": ping.get("seq"),
+        "t0": ping["t0"],
+        "t1": received,
+        "t2": time.monotonic(),
+    }
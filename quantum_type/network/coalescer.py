@@ -0,0 +1,51 @@
+import threading
+
+PROGRESS_INTERVAL = 0.05  # Seconds between coalesced PROGRESS flushes
+PROGRESS_MAX_GAP = 20  # Characters of unsent progress that force a flush
+
+
+class ProgressCoalescer:
+    """Keep only the latest PROGRESS per player until the next tick.
+
+    Every keystroke calls ``add``; the network thread calls ``take`` once per
+    tick and sends whatever survived, so a burst of keystrokes costs one frame.
+    ``add`` returns True when the unsent gap is large enough that the caller
+    should flush right away instead of waiting for the tick.
+    """
+
+    def __init__(self, interval=PROGRESS_INTERVAL, max_gap=PROGRESS_MAX_GAP):
+        self.interval = interval
+        self.max_gap = max_gap
+        self.keystrokes = 0
+        self.frames_sent = 0
+        self._pending = {}
+        self._last_sent = {}
+        self._lock = threading.Lock()
+
+    def add(self, msg):
+        player = msg.get("player")
+        with self._lock:
+            self.keystrokes += 1
+            self._pending[player] = msg
+            last_index = self._last_sent.get(player, 0)
+            return msg.get("index", 0) - last_index >= self.max_gap
+
+    def has_pending(self):
+        return bool(self._pending)
+
+    def take(self):
+        """The latest pending PROGRESS of every player, oldest state dropped"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            for player, msg in pending.items():
+                self._last_sent[player] = msg.get("index", 0)
+            self.frames_sent += len(pending)
+        return list(pending.values())
+
+    def reset(self):
+        with self._lock:
+            self._pending = {}
+            self._last_sent = {}
+
+    def stats(self):
+        return {"keystrokes": self.keystrokes, "frames_sent": self.frames_sent}
@@ -0,0 +1,158 @@
+"""Payload codecs for the length-prefixed frames.
+
+JSON stays the default and handles every message. Peers that agree on
+``BINARY_CODEC`` during the CLIENT_CONNECTED handshake send the hot message
+types (PROGRESS and SCOREBOARD) as a type byte followed by varints instead.
+Binary type bytes are >= 0x80, which can never start a JSON payload, so the
+receiver tells the two apart without any extra framing. TEXT_DATA carries raw
+bytes and only exists in binary form; it is only sent to peers that asked
+for a text transfer.
+"""
+import json
+import struct
+
+JSON_CODEC = "json"
+BINARY_CODEC = "bin1"
+SUPPORTED_CODECS = [BINARY_CODEC, JSON_CODEC]  # In order of preference
+
+MSG_PROGRESS = 0x81
+MSG_SCOREBOARD = 0x82
+MSG_TEXT_DATA = 0x83
+
+BINARY_ONLY = {"TEXT_DATA"}
+
+_BYTE = struct.Struct("B")
+_CRC = struct.Struct(">I")
+_TAG = struct.Struct(">I")  # TEXT_DATA: which text the chunk belongs to
+
+
+def encode_varint(value, out):
+    """Append value (unsigned) to the bytearray out as a LEB128 varint"""
+    if not isinstance(value, int) or value < 0:
+        raise ValueError(f"Varints are unsigned integers, got {value!r}")
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varint(data, pos):
+    """Read a varint from data at pos, return (value, next position)"""
+    byte = data[pos]
+    if byte < 0x80:
+        # Single-byte fast path: ids, and scores below 128
+        return byte, pos + 1
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _encode_player(player_id, out):
+    # 0 means "not assigned yet", real ids are shifted up by one
+    encode_varint(0 if player_id is None else player_id + 1, out)
+
+
+def _decode_player(data, pos):
+    value, pos = decode_varint(data, pos)
+    return (None if value == 0 else value - 1), pos
+
+
+def encode_binary(msg):
+    """Binary payload for a hot message type, or None if it has no binary form"""
+    msg_type = msg["type"]
+    if msg_type == "PROGRESS":
+        out = bytearray(_BYTE.pack(MSG_PROGRESS))
+        _encode_player(msg.get("player"), out)
+        encode_varint(msg["index"], out)
+        encode_varint(msg["score"], out)
+        return bytes(out)
+    if msg_type == "SCOREBOARD":
+        rows = msg["players"]
+        out = bytearray(_BYTE.pack(MSG_SCOREBOARD))
+        encode_varint(len(rows), out)
+        for player_id, index, score in rows:
+            _encode_player(player_id, out)
+            encode_varint(index, out)
+            encode_varint(score, out)
+        return bytes(out)
+    if msg_type == "TEXT_DATA":
+        out = bytearray(_BYTE.pack(MSG_TEXT_DATA))
+        out += _TAG.pack(msg["tag"])
+        encode_varint(msg["seq"], out)
+        out += _CRC.pack(msg["crc"])
+        out += msg["data"]
+        return bytes(out)
+    return None
+
+
+def decode_binary(payload):
+    msg_type = payload[0]
+    if msg_type == MSG_PROGRESS:
+        player_id, pos = _decode_player(payload, 1)
+        index, pos = decode_varint(payload, pos)
+        score, pos = decode_varint(payload, pos)
+        return {"type": "PROGRESS", "player": player_id, "index": index, "score": score}
+    if msg_type == MSG_SCOREBOARD:
+        count, pos = decode_varint(payload, 1)
+        rows = []
+        for _ in range(count):
+            player_id, pos = _decode_player(payload, pos)
+            index, pos = decode_varint(payload, pos)
+            score, pos = decode_varint(payload, pos)
+            rows.append([player_id, index, score])
+        return {"type": "SCOREBOARD", "players": rows}
+    if msg_type == MSG_TEXT_DATA:
+        if len(payload) < 1 + _TAG.size:
+            raise IndexError("TEXT_DATA without tag")
+        (tag,) = _TAG.unpack_from(payload, 1)
+        seq, pos = decode_varint(payload, 1 + _TAG.size)
+        if len(payload) < pos + _CRC.size:
+            raise IndexError("TEXT_DATA without checksum")
+        (crc,) = _CRC.unpack_from(payload, pos)
+        pos += _CRC.size
+        return {
+            "type": "TEXT_DATA", "tag": tag, "seq": seq, "crc": crc,
+            "data": bytes(payload[pos:]),
+        }
+    raise ValueError(f"Unknown binary message type 0x{msg_type:02x}")
+
+
+def encode_payload(msg, codec=JSON_CODEC):
+    if msg["type"] in BINARY_ONLY:
+        return encode_binary(msg)
+    if codec == BINARY_CODEC:
+        try:
+            payload = encode_binary(msg)
+        except ValueError:
+            # A negative or non-integer field: JSON can still carry it
+            payload = None
+        if payload is not None:
+            return payload
+    return json.dumps(msg).encode()
+
+
+def decode_payload(payload):
+    """Decode either codec; raises ValueError on malformed data"""
+    if payload and payload[0] >= 0x80:
+        try:
+            return decode_binary(payload)
+        except IndexError:
+            raise ValueError("Truncated binary message") from None
+    msg = json.loads(payload.decode())
+    if not isinstance(msg, dict) or not isinstance(msg.get("type"), str):
+        raise ValueError("Message is not an object with a type")
+    return msg
+
+
+def choose_codec(offered):
+    """The best codec both sides support, given the peer's offer list"""
+    for codec in SUPPORTED_CODECS:
+        if codec in (offered or ()):
+            return codec
+    return JSON_CODEC
@@ -0,0 +1,45 @@
+HEADER_SIZE = 4
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+
+def encode_frame(payload):
+    """Prefix a payload with the 4-byte big-endian length header"""
+    return len(payload).to_bytes(HEADER_SIZE, byteorder="big") + payload
+
+
+class FrameReader:
+    """Incrementally split a byte stream into length-prefixed frames.
+
+    Bytes are fed in whatever pieces ``recv`` hands back; complete frames are
+    returned as soon as their last byte arrives, partial ones stay buffered.
+    """
+
+    def __init__(self, max_frame_size=MAX_FRAME_SIZE):
+        self.max_frame_size = max_frame_size
+        self._buffer = bytearray()
+        self._expected = None
+
+    def feed(self, data):
+        self._buffer += data
+        frames = []
+        while True:
+            if self._expected is None:
+                if len(self._buffer) < HEADER_SIZE:
+                    break
+                self._expected = int.from_bytes(
+                    self._buffer[:HEADER_SIZE], byteorder="big"
+                )
+                del self._buffer[:HEADER_SIZE]
+                if self._expected > self.max_frame_size:
+                    raise ValueError(f"Frame of {self._expected} bytes is too large")
+            if len(self._buffer) < self._expected:
+                break
+            frames.append(bytes(self._buffer[: self._expected]))
+            del self._buffer[: self._expected]
+            self._expected = None
+        return frames
+
+    @property
+    def pending(self):
+        """Number of buffered bytes that do not yet form a complete frame"""
+        return len(self._buffer)
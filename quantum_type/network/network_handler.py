@@ -0,0 +1,330 @@
+import socket
+import selectors
+import threading
+import time
+from collections import deque
+
+from quantum_type.logs import get_logger
+from quantum_type.network.base_handler import BaseNetworkHandler
+from quantum_type.network.codec import JSON_CODEC
+from quantum_type.network.framing import FrameReader
+from quantum_type.network.send_queue import WRITE_BATCH_BYTES, SendQueue
+
+log = get_logger("network")
+
+
+class Connection:
+    """A peer socket with its own read buffer and bounded send queue.
+
+    ``queue`` holds frames nobody has committed to the socket yet; ``outbox``
+    is what the I/O thread took from it and is part-way through sending.
+    """
+
+    def __init__(self, sock, addr=None):
+        self.sock = sock
+        self.addr = addr
+        self.player_id = None
+        self.codec = JSON_CODEC
+        self.features = set()
+        self.transfer = None
+        self.joined = False  # Host side: set by the peer's first message
+        self.last_seen = time.monotonic()
+        self.reader = FrameReader()
+        self.queue = SendQueue()
+        self.outbox = bytearray()
+        self.closed = False
+
+    def fileno(self):
+        return self.sock.fileno()
+
+
+class NetworkHandler(BaseNetworkHandler):
+    def __init__(self, is_host, ip, port):
+        super().__init__(is_host, ip, port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+        # Set additional socket options for better reliability
+        if hasattr(socket, "SO_KEEPALIVE"):
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+        # Set socket timeout to prevent blocking indefinitely
+        self.sock.settimeout(5.0)  # 5 second timeout
+
+        # One selector (epoll on Linux) drives every socket from a single thread.
+        # Other threads only push to send queues and poke the wakeup pipe.
+        self.selector = selectors.DefaultSelector()
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._wakeup_send.setblocking(False)
+        self._lock = threading.Lock()
+        self._dirty = set()
+        self._calls = deque()  # Callbacks other threads left for the I/O thread
+        self._io_thread = None
+
+    def start(self):
+        if self.is_host:
+            try:
+                self.sock.bind((self.ip, self.port))
+                self.sock.listen(socket.SOMAXCONN)
+            except OSError as e:
+                self.port = self.port + 1
+                self.sock.close()
+                self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                self.sock.bind((self.ip, self.port))
+                self.sock.listen(socket.SOMAXCONN)
+                self._report_info("Port Changed", f"Using port {self.port} instead")
+            # Port 0 asks the OS for a free port; report the one we got
+            self.port = self.sock.getsockname()[1]
+            self.sock.setblocking(False)
+            self.selector.register(self.sock, selectors.EVENT_READ, data=None)
+        elif self.running:
+            self.sock.setblocking(False)
+            self.connection = Connection(self.sock, (self.ip, self.port))
+            self.selector.register(
+                self.sock, selectors.EVENT_READ, data=self.connection
+            )
+        else:
+            # connect() failed, there is nothing to drive
+            return
+
+        self.selector.register(self._wakeup_recv, selectors.EVENT_READ, data=self)
+        self._io_thread = threading.Thread(target=self.run_io_loop, daemon=True)
+        self._io_thread.start()
+
+    def run_io_loop(self):
+        """Serve accept, read and write readiness for all sockets until stopped"""
+        next_tick = time.monotonic() + self.tick_interval
+        try:
+            while self.running:
+                # Wake up at least once per tick to flush coalesced progress
+                timeout = max(0.0, next_tick - time.monotonic())
+                for key, mask in self.selector.select(timeout=timeout):
+                    if key.data is None:
+                        self.accept_clients()
+                    elif key.data is self:
+                        self._drain_wakeup()
+                    else:
+                        conn = key.data
+                        if mask & selectors.EVENT_READ:
+                            self._read_from(conn)
+                        if mask & selectors.EVENT_WRITE and not conn.closed:
+                            self._write_to(conn)
+                self._run_calls()
+                if time.monotonic() >= next_tick:
+                    self._on_tick()
+                    next_tick = time.monotonic() + self.tick_interval
+                self._flush_dirty()
+        finally:
+            self._shutdown()
+
+    def accept_clients(self):
+        # Accept everything queued on the listening socket in one go
+        while True:
+            try:
+                conn_sock, addr = self.sock.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                log.error("Error in accept_clients: %s", e)
+                return
+            conn_sock.setblocking(False)
+            conn_sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            conn = Connection(conn_sock, addr)
+            # The peer joins (or resumes its session) with its first message
+            self.selector.register(conn_sock, selectors.EVENT_READ, data=conn)
+
+    def _read_from(self, conn):
+        try:
+            data = conn.sock.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            log.warning("%s receive error: %s", "Host" if self.is_host else "Client", e)
+            self._drop_connection(conn)
+            return
+        if not data:
+            self._drop_connection(conn)
+            return
+
+        try:
+            frames = conn.reader.feed(data)
+        except ValueError as e:
+            log.warning("Dropping connection %s: %s", conn.addr, e)
+            self._drop_connection(conn)
+            return
+
+        for payload in frames:
+            try:
+                self._handle_frame(conn, payload)
+            except Exception as e:
+                # Only the peer that sent it pays for a bad frame
+                log.error("Dropping connection %s after bad frame: %r", conn.addr, e)
+                self._drop_connection(conn)
+                return
+
+    def _write_to(self, conn):
+        """Move queued frames into the outbox and send as much as the socket takes"""
+        while True:
+            if len(conn.outbox) < WRITE_BATCH_BYTES:
+                conn.outbox += conn.queue.take()
+            if not conn.outbox:
+                break
+            try:
+                sent = conn.sock.send(conn.outbox)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError as e:
+                log.warning("Error sending to %s: %s", conn.addr, e)
+                self._drop_connection(conn)
+                return
+            del conn.outbox[:sent]
+            if conn.outbox:
+                # The kernel buffer is full; wait for write readiness
+                break
+        self._set_write_interest(conn, bool(conn.outbox) or bool(conn.queue))
+
+    def _set_write_interest(self, conn, wanted):
+        if conn.closed:
+            return
+        events = selectors.EVENT_READ
+        if wanted:
+            events |= selectors.EVENT_WRITE
+        try:
+            if self.selector.get_key(conn.sock).events != events:
+                self.selector.modify(conn.sock, events, data=conn)
+        except (KeyError, ValueError):
+            pass
+
+    def _flush_dirty(self):
+        """Try to push out data queued by other threads since the last pass"""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        for conn in dirty:
+            if not conn.closed:
+                self._write_to(conn)
+
+    def _call_on_io_thread(self, callback):
+        thread = self._io_thread
+        if thread is None or not thread.is_alive() or threading.current_thread() is thread:
+            callback()
+            return
+        self._calls.append(callback)
+        self._wakeup()
+
+    def _run_calls(self):
+        while self._calls:
+            self._calls.popleft()()
+
+    def _drain_wakeup(self):
+        try:
+            while self._wakeup_recv.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def _wakeup(self):
+        try:
+            self._wakeup_send.send(b"\0")
+        except (BlockingIOError, InterruptedError):
+            # Pipe already full, the loop is going to wake up anyway
+            pass
+        except OSError:
+            pass
+
+    def _enqueue(self, conn, frame, key=None):
+        """Queue an encoded frame for conn; the I/O thread does the actual send"""
+        if conn.closed:
+            return
+        conn.queue.push(frame, key)
+        with self._lock:
+            self._dirty.add(conn)
+        if threading.current_thread() is not self._io_thread:
+            self._wakeup()
+
+    def _drop_connection(self, conn):
+        if conn.closed:
+            return
+        conn.closed = True
+        try:
+            self.selector.unregister(conn.sock)
+        except (KeyError, ValueError):
+            pass
+        try:
+            conn.sock.close()
+        except OSError:
+            pass
+        self._connection_lost(conn)
+
+    def connect(self, host_ip):
+        self.ip = host_ip  # Reconnects go back to the same host
+        try:
+            log.info("Attempting to connect to host at %s:%s", host_ip, self.port)
+            self.sock.settimeout(5.0)  # Set 5 second timeout for connection
+            self.sock.connect((host_ip, self.port))
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            log.info("Connected to host at %s:%s", host_ip, self.port)
+        except ConnectionRefusedError:
+            log.info("Connection refused at port %s, trying next port", self.port)
+            self.port += 1
+            self.sock.close()
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                log.info("Attempting to connect to host at %s:%s", host_ip, self.port)
+                self.sock.connect((host_ip, self.port))
+                self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                log.info("Connected to host at %s:%s", host_ip, self.port)
+            except Exception as e:
+                log.error("Failed to connect with second port: %s", e)
+                self._report_error("Connection Error", "Could not connect to host")
+                self.running = False
+        except Exception as e:
+            log.error("Connection error: %s", e)
+            self._report_error(
+                "Connection Error", f"Could not connect to host: {str(e)}"
+            )
+            self.running = False
+
+    def _open_connection(self):
+        try:
+            sock = socket.create_connection((self.ip, self.port), timeout=5.0)
+        except OSError as e:
+            log.warning("Connection error: %s", e)
+            return False
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setblocking(False)
+        conn = Connection(sock, (self.ip, self.port))
+        with self._lock:
+            self.sock = sock
+            self.connection = conn
+            self.selector.register(sock, selectors.EVENT_READ, data=conn)
+        self._wakeup()
+        return True
+
+    def stop(self):
+        if self.running:
+            self.running = False
+            if self._io_thread and self._io_thread.is_alive():
+                # The I/O thread closes the sockets on its way out
+                self._wakeup()
+                if threading.current_thread() is not self._io_thread:
+                    self._io_thread.join(timeout=1.0)
+            else:
+                self._shutdown()
+
+    def _shutdown(self):
+        for conn in self.clients[:]:
+            self._drop_connection(conn)
+        if self.connection:
+            self.connection.closed = True
+        for sock in (self.sock, self._wakeup_recv, self._wakeup_send):
+            try:
+                sock.close()
+            except OSError:
+                pass
+        try:
+            self.selector.close()
+        except Exception:
+            pass
@@ -0,0 +1,66 @@
+from quantum_type.network.codec import JSON_CODEC, encode_payload
+from quantum_type.network.framing import encode_frame
+from quantum_type.network.text_transfer import chunk_checksum, text_digest
+
+TEXT_CHUNK_SIZE = 4000
+
+# Keys a received message must carry before anything reads them
+REQUIRED_FIELDS = {
+    "PROGRESS": ("index", "score"),
+    "SCOREBOARD": ("players",),
+    "PLAYERS": ("players",),
+    "CLOCK": ("offset", "rtt"),
+    "PONG": ("t0", "t1", "t2"),
+    "CODEC": ("codec",),
+    "START": ("start_time",),
+    "COUNTDOWN_START": ("start_at",),
+    "END": ("winner",),
+    "LOAD_TEXT": ("text",),
+    "SNAPSHOT": (
+        "player_id", "names", "players", "progress", "digest", "phase", "start_at",
+        "duration", "remaining",
+    ),
+    "TEXT_OFFER": ("digest", "compression", "chunks", "chunk_size", "compressed_size"),
+    "TEXT_DATA": ("tag", "seq", "crc", "data"),
+    "TEXT_ACK": ("acked",),
+    "TEXT_CHUNKS": ("count",),
+    "TEXT_CHUNK": ("index", "chunk"),
+}
+
+
+def check_message(msg):
+    """Raise ValueError if msg lacks a field its type needs"""
+    missing = [key for key in REQUIRED_FIELDS.get(msg["type"], ()) if key not in msg]
+    if missing:
+        raise ValueError(f"{msg['type']} without {', '.join(missing)}")
+
+
+def text_chunk_messages(text, chunk_size=TEXT_CHUNK_SIZE):
+    """Messages that deliver text as TEXT_CHUNKS, TEXT_CHUNK... TEXT_COMPLETE"""
+    chunks = [text[i : i + chunk_size] for i in range(0, len(text), chunk_size)]
+    messages = [
+        {"type": "TEXT_CHUNKS", "count": len(chunks), "digest": text_digest(text)}
+    ]
+    for i, chunk in enumerate(chunks):
+        messages.append(
+            {
+                "type": "TEXT_CHUNK",
+                "index": i,
+                "chunk": chunk,
+                "crc": chunk_checksum(chunk.encode("utf-8")),
+            }
+        )
+    messages.append({"type": "TEXT_COMPLETE"})
+    return messages
+
+
+def text_messages(text, chunk_size=TEXT_CHUNK_SIZE):
+    """A single LOAD_TEXT for short texts, the chunked sequence otherwise"""
+    if len(text) > chunk_size:
+        return text_chunk_messages(text, chunk_size)
+    return [{"type": "LOAD_TEXT", "text": text}]
+
+
+def encode_message(msg, codec=JSON_CODEC):
+    """Encode msg into a complete length-prefixed frame"""
+    return encode_frame(encode_payload(msg, codec))
@@ -0,0 +1,108 @@
+import threading
+
+SCOREBOARD_INTERVAL = 0.05  # Seconds between batched SCOREBOARD updates
+TIE = "平手"
+
+
+def rank_players(players):
+    """Rank {player_id: {"name", "score", ...}} by score, ties share a rank"""
+    ordered = sorted(
+        players.items(), key=lambda item: (-item[1].get("score", 0), item[0])
+    )
+    ranking = []
+    for position, (player_id, info) in enumerate(ordered):
+        score = info.get("score", 0)
+        if ranking and ranking[-1]["score"] == score:
+            rank = ranking[-1]["rank"]
+        else:
+            rank = position + 1
+        ranking.append(
+            {
+                "player": player_id,
+                "name": info.get("name", f"Player {player_id}"),
+                "score": score,
+                "rank": rank,
+            }
+        )
+    return ranking
+
+
+def winner_of(ranking):
+    """Name of the single top scorer, or TIE when several share first place"""
+    leaders = [entry for entry in ranking if entry["rank"] == 1]
+    if len(leaders) != 1:
+        return TIE
+    return leaders[0]["name"]
+
+
+class Scoreboard:
+    """Latest progress and score of every player in a match.
+
+    PROGRESS messages only update the table; whoever owns the board sends one
+    SCOREBOARD message per tick with the entries that changed, so the number
+    of frames per match grows linearly with the number of players.
+    """
+
+    def __init__(self):
+        self.names = {}
+        self.entries = {}
+        self._changed = set()
+        self._lock = threading.Lock()
+
+    def add_player(self, player_id, name):
+        with self._lock:
+            self.names[player_id] = name
+            self.entries.setdefault(player_id, (0, 0))
+            self._changed.add(player_id)
+
+    def remove_player(self, player_id):
+        with self._lock:
+            self.names.pop(player_id, None)
+            self.entries.pop(player_id, None)
+            self._changed.discard(player_id)
+
+    def update(self, player_id, index, score):
+        with self._lock:
+            if player_id not in self.names:
+                return
+            self.entries[player_id] = (index, score)
+            self._changed.add(player_id)
+
+    def entry(self, player_id):
+        """(index, score) of one player"""
+        with self._lock:
+            return self.entries.get(player_id, (0, 0))
+
+    def reset(self):
+        with self._lock:
+            for player_id in self.entries:
+                self.entries[player_id] = (0, 0)
+            self._changed = set(self.entries)
+
+    def has_changes(self):
+        return bool(self._changed)
+
+    def take_changes(self):
+        """SCOREBOARD message with the entries changed since the last call"""
+        with self._lock:
+            changed, self._changed = self._changed, set()
+            rows = [[pid, *self.entries[pid]] for pid in sorted(changed)]
+        return {"type": "SCOREBOARD", "players": rows}
+
+    def full_update(self):
+        with self._lock:
+            rows = [[pid, *entry] for pid, entry in sorted(self.entries.items())]
+        return {"type": "SCOREBOARD", "players": rows}
+
+    def players_message(self):
+        with self._lock:
+            players = [[pid, name] for pid, name in sorted(self.names.items())]
+        return {"type": "PLAYERS", "players": players}
+
+    def ranking(self):
+        with self._lock:
+            players = {
+                pid: {"name": self.names[pid], "score": entry[1]}
+                for pid, entry in self.entries.items()
+            }
+        return rank_players(players)
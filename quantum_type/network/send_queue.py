@@ -0,0 +1,118 @@
+"""Bounded per-connection outbound queues.
+
+Senders only ever append to a connection's SendQueue; the transport's I/O
+loop drains it into the socket. A frame pushed with a ``key`` replaces a
+queued frame with the same key that has not been written yet, so a slow
+client receives the latest PROGRESS or SCOREBOARD instead of a backlog of
+stale ones.
+
+A queue above its high-water mark is *saturated*. The handler evicts a
+connection that stays saturated for ``SATURATION_TIMEOUT`` seconds, or that
+overflows the hard limit, rather than letting it hold up everyone else.
+"""
+import threading
+import time
+from collections import deque
+
+HIGH_WATER_FRAMES = 256
+HIGH_WATER_BYTES = 2 * 1024 * 1024
+MAX_QUEUE_FRAMES = 4 * HIGH_WATER_FRAMES
+MAX_QUEUE_BYTES = 4 * HIGH_WATER_BYTES
+SATURATION_TIMEOUT = 5.0
+WRITE_BATCH_BYTES = 64 * 1024  # Handed to the socket in one go
+
+
+class SendQueue:
+    """Frames waiting for the socket, oldest first"""
+
+    def __init__(self, high_water_frames=HIGH_WATER_FRAMES,
+                 high_water_bytes=HIGH_WATER_BYTES, max_frames=MAX_QUEUE_FRAMES,
+                 max_bytes=MAX_QUEUE_BYTES):
+        self.high_water_frames = high_water_frames
+        self.high_water_bytes = high_water_bytes
+        self.max_frames = max_frames
+        self.max_bytes = max_bytes
+        self._entries = deque()  # [key, frame]
+        self._keyed = {}  # key -> entry still in the queue
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.peak_frames = 0
+        self.peak_bytes = 0
+        self.replaced = 0
+        self.overflowed = False
+        self.saturated_since = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def has(self, key):
+        return key in self._keyed
+
+    def push(self, frame, key=None):
+        """Queue frame; returns False if the hard limit was hit and it was dropped"""
+        with self._lock:
+            entry = self._keyed.get(key) if key is not None else None
+            if entry is not None:
+                # Same key still unsent: the newer frame supersedes it
+                self.bytes += len(frame) - len(entry[1])
+                entry[1] = frame
+                self.replaced += 1
+                return True
+            full = len(self._entries) >= self.max_frames
+            if full or self.bytes + len(frame) > self.max_bytes:
+                self.overflowed = True
+                return False
+            entry = [key, frame]
+            self._entries.append(entry)
+            if key is not None:
+                self._keyed[key] = entry
+            self.bytes += len(frame)
+            self.peak_frames = max(self.peak_frames, len(self._entries))
+            self.peak_bytes = max(self.peak_bytes, self.bytes)
+            if self.saturated_since is None and self._above_high_water():
+                self.saturated_since = time.monotonic()
+            return True
+
+    def take(self, limit=WRITE_BATCH_BYTES):
+        """Remove and return up to ``limit`` bytes of whole frames"""
+        with self._lock:
+            chunks = []
+            size = 0
+            while self._entries:
+                if chunks and size + len(self._entries[0][1]) > limit:
+                    break
+                key, frame = self._entries.popleft()
+                if key is not None:
+                    del self._keyed[key]
+                chunks.append(frame)
+                size += len(frame)
+            self.bytes -= size
+            if self.saturated_since is not None and not self._above_high_water():
+                self.saturated_since = None
+        return b"".join(chunks)
+
+    def _above_high_water(self):
+        return (
+            len(self._entries) >= self.high_water_frames
+            or self.bytes >= self.high_water_bytes
+        )
+
+    def saturated_for(self, now=None):
+        """Seconds the queue has been above its high-water mark, 0 if it is not"""
+        if self.saturated_since is None:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        return now - self.saturated_since
+
+    def should_evict(self, now=None):
+        return self.overflowed or self.saturated_for(now) >= SATURATION_TIMEOUT
+
+    def stats(self):
+        return {
+            "frames": len(self._entries),
+            "bytes": self.bytes,
+            "peak_frames": self.peak_frames,
+            "peak_bytes": self.peak_bytes,
+            "replaced": self.replaced,
+            "saturated_s": round(self.saturated_for(), 3),
+        }
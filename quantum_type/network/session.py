@@ -0,0 +1,129 @@
+"""Sessions, heartbeats and reconnects.
+
+The host hands every client a session token in CLIENT_JOINED. A client that
+loses its connection reconnects with exponential backoff and sends RESUME
+with that token as its first message; the host rebinds the new connection to
+the old player id and answers with one SNAPSHOT, so the client can carry on
+without replaying the match. Disconnected players keep their place for
+``SESSION_GRACE`` seconds.
+
+Connections are considered dead after ``HEARTBEAT_TIMEOUT`` seconds without
+a frame. Clients that advertise ``SESSION_FEATURE`` send a PING at least
+every ``HEARTBEAT_INTERVAL`` (the clock sync PINGs double as heartbeats) and
+the host answers each one, so both sides notice a dead link long before TCP
+keepalive would.
+"""
+import random
+import secrets
+import threading
+import time
+
+SESSION_FEATURE = "session"
+HEARTBEAT_INTERVAL = 2.0
+HEARTBEAT_TIMEOUT = 6.0
+SESSION_GRACE = 30.0
+RECONNECT_INITIAL_DELAY = 0.5
+RECONNECT_MAX_DELAY = 8.0
+RECONNECT_ATTEMPTS = 8
+
+
+def new_session_token():
+    return secrets.token_hex(16)
+
+
+def backoff_delays(initial=RECONNECT_INITIAL_DELAY, maximum=RECONNECT_MAX_DELAY,
+                   attempts=RECONNECT_ATTEMPTS):
+    """Delays before each reconnect attempt: doubling, capped, with jitter"""
+    delay = initial
+    for _ in range(attempts):
+        # Jitter keeps a room full of clients from reconnecting in lockstep
+        yield delay * random.uniform(0.8, 1.2)
+        delay = min(delay * 2, maximum)
+
+
+def snapshot_message(scoreboard, player_id, session, digest, start_at, duration,
+                     now, **extra):
+    """Everything a resuming client needs, in one message.
+
+    ``start_at`` and ``now`` are on the host's monotonic timeline; a match
+    that has not started yet reports phase "countdown", one that is over (or
+    never started) reports "waiting".
+    """
+    full = scoreboard.full_update()["players"]
+    index, score = scoreboard.entry(player_id)
+    if start_at is None:
+        phase, remaining = "waiting", None
+    elif now < start_at:
+        phase, remaining = "countdown", duration
+    else:
+        remaining = start_at + duration - now
+        phase = "playing" if remaining > 0 else "waiting"
+    msg = {
+        "type": "SNAPSHOT",
+        "player_id": player_id,
+        "session": session,
+        "digest": digest,
+        "progress": [index, score],
+        "players": full,
+        "names": scoreboard.players_message()["players"],
+        "phase": phase,
+        "start_at": start_at,
+        "duration": duration,
+        "remaining": remaining,
+    }
+    msg.update(extra)
+    return msg
+
+
+class SessionTable:
+    """Host side: session tokens and the players waiting to resume them"""
+
+    def __init__(self, grace=SESSION_GRACE):
+        self.grace = grace
+        self._players = {}  # token -> player_id
+        self._tokens = {}  # player_id -> token
+        self._suspended = {}  # player_id -> deadline
+        self._lock = threading.Lock()
+
+    def open(self, player_id):
+        token = new_session_token()
+        with self._lock:
+            self._players[token] = player_id
+            self._tokens[player_id] = token
+        return token
+
+    def token_of(self, player_id):
+        return self._tokens.get(player_id)
+
+    def suspend(self, player_id, now=None):
+        """The player's connection dropped; keep the seat for ``grace`` seconds"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if player_id in self._tokens:
+                self._suspended[player_id] = now + self.grace
+
+    def resume(self, token):
+        """Player id for a valid token, or None if unknown or expired"""
+        with self._lock:
+            player_id = self._players.get(token)
+            if player_id is not None:
+                self._suspended.pop(player_id, None)
+            return player_id
+
+    def expired(self, now=None):
+        """Remove and return the players whose grace period ran out"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            gone = [pid for pid, deadline in self._suspended.items() if deadline <= now]
+            for player_id in gone:
+                self._close_locked(player_id)
+        return gone
+
+    def close(self, player_id):
+        with self._lock:
+            self._close_locked(player_id)
+
+    def _close_locked(self, player_id):
+        self._suspended.pop(player_id, None)
+        token = self._tokens.pop(player_id, None)
+        self._players.pop(token, None)
@@ -0,0 +1,421 @@
+"""Content-addressed delivery of practice texts.
+
+The sender announces a text by its SHA-256 digest (TEXT_OFFER). A receiver
+that already has the text in its TextCache answers TEXT_HAVE and is done;
+otherwise it sends TEXT_REQUEST and the sender streams the compressed text
+as binary TEXT_DATA chunks, keeping at most ``window`` chunks unacknowledged
+instead of sleeping between them.
+
+Every chunk carries a CRC-32 and the tag of its text (``transfer_tag``), so
+chunks of a text the host has since replaced are dropped instead of being
+written into the new one. The receiver reassembles into a preallocated
+buffer, keeps a bitmap of the chunks it holds and asks again for just the
+missing ranges, so a corrupt chunk or a dropped connection costs only the
+chunks that did not make it. Partial transfers are saved next to the cache
+and resumed when the same text is offered again.
+
+Offers come from the network, so their sizes are checked against
+``MAX_TEXT_BYTES`` before any buffer is allocated, decompression stops at
+that size, and only well-formed digests and known compressions ever make
+it into a cache path.
+"""
+import hashlib
+import lzma
+import os
+import re
+import zlib
+
+from quantum_type.logs import get_logger
+
+log = get_logger("network.text")
+
+TEXT_FEATURE = "text-digest"
+DATA_CHUNK_SIZE = 16 * 1024
+SEND_WINDOW = 8
+DEFAULT_COMPRESSION = "zlib"
+MAX_TEXT_RETRIES = 3  # Re-requests of missing chunks before giving up
+MAX_TEXT_BYTES = 32 * 1024 * 1024  # Largest text accepted, compressed or not
+COMPRESSIONS = ("zlib", "lzma", "none")
+
+_DIGEST = re.compile(r"[0-9a-f]{64}")
+
+
+def text_digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def is_digest(digest):
+    return isinstance(digest, str) and _DIGEST.fullmatch(digest) is not None
+
+
+def transfer_tag(digest):
+    """32-bit tag naming a text in its TEXT_DATA chunks"""
+    return int(digest[:8], 16)
+
+
+def chunk_checksum(data):
+    return zlib.crc32(data) & 0xFFFFFFFF
+
+
+def to_ranges(seqs):
+    """Sorted sequence numbers as [[start, end), ...] runs"""
+    ranges = []
+    for seq in seqs:
+        if ranges and ranges[-1][1] == seq:
+            ranges[-1][1] = seq + 1
+        else:
+            ranges.append([seq, seq + 1])
+    return ranges
+
+
+def from_ranges(ranges, limit):
+    """Expand [[start, end), ...] runs, clipped to range(limit)"""
+    seqs = []
+    for start, end in ranges:
+        seqs.extend(range(max(0, start), min(end, limit)))
+    return seqs
+
+
+def compress(data, compression):
+    if compression == "zlib":
+        return zlib.compress(data, 6)
+    if compression == "lzma":
+        return lzma.compress(data)
+    if compression == "none":
+        return data
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+def decompress(data, compression, max_length=MAX_TEXT_BYTES):
+    """data decompressed; raises ValueError past max_length bytes"""
+    if compression == "none":
+        raw = bytes(data)
+    elif compression == "zlib":
+        decompressor = zlib.decompressobj()
+        raw = decompressor.decompress(data, max_length + 1)
+        if not decompressor.eof and not decompressor.unconsumed_tail:
+            raise ValueError("Truncated zlib data")
+    elif compression == "lzma":
+        decompressor = lzma.LZMADecompressor()
+        raw = decompressor.decompress(data, max_length + 1)
+        if not decompressor.eof and decompressor.needs_input:
+            raise ValueError("Truncated lzma data")
+    else:
+        raise ValueError(f"Unknown compression: {compression}")
+    if len(raw) > max_length:
+        raise ValueError(f"Text larger than {max_length} bytes")
+    return raw
+
+
+def check_offer(offer):
+    """Raise ValueError unless a TEXT_OFFER describes a text we would accept"""
+    if not is_digest(offer["digest"]):
+        raise ValueError("Bad text digest")
+    if offer["compression"] not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression: {offer['compression']}")
+    sizes = (offer["compressed_size"], offer["chunk_size"], offer["chunks"])
+    if not all(type(n) is int for n in sizes):
+        raise ValueError("Text offer sizes are not integers")
+    compressed_size, chunk_size, chunks = sizes
+    if not 0 <= compressed_size <= MAX_TEXT_BYTES or chunk_size <= 0:
+        raise ValueError(f"Text offer of {compressed_size} bytes is out of range")
+    if chunks != max(1, -(-compressed_size // chunk_size)):
+        raise ValueError("Text offer chunk count does not match its size")
+
+
+class TextBlob:
+    """A text prepared once for sending: digest, compressed bytes, chunks"""
+
+    def __init__(self, text, compression=DEFAULT_COMPRESSION, chunk_size=DATA_CHUNK_SIZE):
+        raw = text.encode("utf-8")
+        self.text = text
+        self.digest = hashlib.sha256(raw).hexdigest()
+        self.tag = transfer_tag(self.digest)
+        self.size = len(raw)
+        self.compression = compression
+        self.chunk_size = chunk_size
+        self.data = compress(raw, compression)
+        self.chunk_count = max(1, -(-len(self.data) // chunk_size))
+
+    def chunk(self, seq):
+        start = seq * self.chunk_size
+        return self.data[start : start + self.chunk_size]
+
+    def data_message(self, seq):
+        data = self.chunk(seq)
+        return {
+            "type": "TEXT_DATA", "tag": self.tag, "seq": seq, "crc": chunk_checksum(data),
+            "data": data,
+        }
+
+    def offer_message(self):
+        return {
+            "type": "TEXT_OFFER",
+            "digest": self.digest,
+            "size": self.size,
+            "compression": self.compression,
+            "compressed_size": len(self.data),
+            "chunk_size": self.chunk_size,
+            "chunks": self.chunk_count,
+        }
+
+
+class OutgoingTransfer:
+    """Sender side of one TEXT_REQUEST with window-based flow control.
+
+    The request names the chunks to send (all of them by default). Each
+    TEXT_ACK reports how many chunks of this request the receiver has
+    processed, which frees that much room in the window.
+    """
+
+    def __init__(self, blob, ranges=None, window=SEND_WINDOW):
+        self.blob = blob
+        self.window = window
+        if ranges is None:
+            self.seqs = list(range(blob.chunk_count))
+        else:
+            self.seqs = from_ranges(ranges, blob.chunk_count)
+        self.sent = 0
+        self.acked = 0
+
+    @property
+    def done(self):
+        return self.acked >= len(self.seqs)
+
+    def on_ack(self, acked):
+        """Receiver has processed ``acked`` chunks of this request"""
+        self.acked = max(self.acked, min(acked, self.sent))
+
+    def next_messages(self):
+        """TEXT_DATA messages that fit in the window right now"""
+        messages = []
+        limit = min(self.acked + self.window, len(self.seqs))
+        while self.sent < limit:
+            messages.append(self.blob.data_message(self.seqs[self.sent]))
+            self.sent += 1
+        return messages
+
+
+class ChunkedTransfer:
+    """Sender side for clients that do not take texts by digest.
+
+    They get the TEXT_CHUNKS sequence and never acknowledge it, so instead
+    of a chunk window the sender releases messages while less than
+    ``window_bytes`` of this connection's send queue is still unsent.
+    """
+
+    def __init__(self, messages, window_bytes=SEND_WINDOW * DATA_CHUNK_SIZE):
+        self.messages = messages
+        self.window_bytes = window_bytes
+        self.sent = 0
+
+    @property
+    def done(self):
+        return self.sent >= len(self.messages)
+
+    def next_messages(self, unsent_bytes):
+        """The next message if the window has room for it, as a list"""
+        if self.done or unsent_bytes >= self.window_bytes:
+            return []
+        self.sent += 1
+        return [self.messages[self.sent - 1]]
+
+
+class IncomingTransfer:
+    """Receiver side: reassemble chunks, then verify and decompress the text"""
+
+    def __init__(self, offer):
+        check_offer(offer)
+        self.digest = offer["digest"]
+        self.tag = transfer_tag(self.digest)
+        self.compression = offer["compression"]
+        self.chunk_count = offer["chunks"]
+        self.chunk_size = offer["chunk_size"]
+        self.compressed_size = offer["compressed_size"]
+        self.buffer = bytearray(self.compressed_size)
+        self.bitmap = bytearray((self.chunk_count + 7) // 8)
+        self.received = 0
+        self.requested = 0  # Chunks asked for in the current request
+        self.processed = 0  # ... and how many of them have arrived so far
+        self.retries = 0
+
+    def matches(self, offer):
+        return (
+            offer["digest"] == self.digest
+            and offer["compression"] == self.compression
+            and offer["chunk_size"] == self.chunk_size
+            and offer["compressed_size"] == self.compressed_size
+        )
+
+    @property
+    def complete(self):
+        return self.received >= self.chunk_count
+
+    def has(self, seq):
+        return self.bitmap[seq >> 3] & (1 << (seq & 7))
+
+    def missing(self):
+        return [seq for seq in range(self.chunk_count) if not self.has(seq)]
+
+    def reset(self):
+        """Forget every chunk, to fetch the whole text again"""
+        self.bitmap[:] = bytes(len(self.bitmap))
+        self.received = 0
+
+    def request_message(self):
+        """TEXT_REQUEST for every chunk not received yet"""
+        ranges = to_ranges(self.missing())
+        self.requested = sum(end - start for start, end in ranges)
+        self.processed = 0
+        return {"type": "TEXT_REQUEST", "digest": self.digest, "missing": ranges}
+
+    def _expected_length(self, seq):
+        start = seq * self.chunk_size
+        return min(self.chunk_size, self.compressed_size - start)
+
+    def add(self, seq, data, crc):
+        """Store a chunk if it is new and intact; returns True if it was stored"""
+        self.processed += 1
+        if not 0 <= seq < self.chunk_count or self.has(seq):
+            return False
+        if len(data) != self._expected_length(seq) or chunk_checksum(data) != crc:
+            log.warning("Discarding corrupt text chunk %d", seq)
+            return False
+        start = seq * self.chunk_size
+        self.buffer[start : start + len(data)] = data
+        self.bitmap[seq >> 3] |= 1 << (seq & 7)
+        self.received += 1
+        return True
+
+    @property
+    def round_finished(self):
+        """Every chunk of the current request has been processed"""
+        return self.processed >= self.requested
+
+    def text(self):
+        """The decompressed text; raises ValueError if the digest does not match"""
+        raw = decompress(self.buffer, self.compression)
+        if hashlib.sha256(raw).hexdigest() != self.digest:
+            raise ValueError(f"Digest mismatch for text {self.digest[:12]}")
+        return raw.decode("utf-8")
+
+
+class ChunkAssembler:
+    """Receiver for the TEXT_CHUNKS / TEXT_CHUNK / TEXT_COMPLETE sequence.
+
+    That sequence comes from hosts that do not offer texts by digest, so
+    nothing can be re-requested; duplicates are ignored, chunks with a bad
+    ``crc`` are dropped, and the text is only produced once every chunk has
+    arrived.
+    """
+
+    def __init__(self, count, digest=None):
+        self.count = count
+        self.digest = digest
+        self.chunks = [None] * count
+        self.received = 0
+
+    @property
+    def complete(self):
+        return self.received >= self.count
+
+    def add(self, index, chunk, crc=None):
+        if not 0 <= index < self.count or self.chunks[index] is not None:
+            return False
+        if crc is not None and chunk_checksum(chunk.encode("utf-8")) != crc:
+            log.warning("Discarding corrupt text chunk %d", index)
+            return False
+        self.chunks[index] = chunk
+        self.received += 1
+        return True
+
+    def text(self):
+        """The whole text; raises ValueError if chunks are missing or corrupt"""
+        if not self.complete:
+            missing = self.count - self.received
+            raise ValueError(f"Missing {missing} of {self.count} text chunks")
+        text = "".join(self.chunks)
+        if self.digest is not None and text_digest(text) != self.digest:
+            raise ValueError(f"Digest mismatch for text {self.digest[:12]}")
+        return text
+
+
+class TextCache:
+    """Texts stored on disk by digest so re-used texts load without transfer"""
+
+    def __init__(self, directory=None):
+        self.directory = directory or os.path.join(
+            os.path.expanduser("~"), ".quantum_type", "texts"
+        )
+
+    def _path(self, digest):
+        if not is_digest(digest):
+            raise ValueError("Bad text digest")
+        return os.path.join(self.directory, f"{digest}.txt")
+
+    def get(self, digest):
+        if not is_digest(digest):
+            return None
+        try:
+            with open(self._path(digest), "rb") as file:
+                raw = file.read()
+        except OSError:
+            return None
+        # A damaged cache entry is treated as a miss
+        if hashlib.sha256(raw).hexdigest() != digest:
+            return None
+        return raw.decode("utf-8")
+
+    def _partial_path(self, transfer):
+        if not is_digest(transfer.digest) or transfer.compression not in COMPRESSIONS:
+            raise ValueError("Bad text digest or compression")
+        return os.path.join(
+            self.directory,
+            f"{transfer.digest}.{transfer.compression}.{transfer.chunk_size}.part",
+        )
+
+    def save_partial(self, transfer):
+        """Keep the chunks of an unfinished transfer for a later resume"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._partial_path(transfer), "wb") as file:
+                file.write(transfer.buffer)
+                file.write(transfer.bitmap)
+        except OSError as e:
+            log.warning("Could not save partial text %s: %s", transfer.digest[:12], e)
+
+    def resume(self, offer):
+        """IncomingTransfer for offer, seeded with any chunks saved earlier"""
+        transfer = IncomingTransfer(offer)
+        path = self._partial_path(transfer)
+        try:
+            with open(path, "rb") as file:
+                saved = file.read()
+        except OSError:
+            return transfer
+        if len(saved) != len(transfer.buffer) + len(transfer.bitmap):
+            return transfer
+        transfer.buffer[:] = saved[: len(transfer.buffer)]
+        transfer.bitmap[:] = saved[len(transfer.buffer) :]
+        transfer.received = sum(
+            1 for seq in range(transfer.chunk_count) if transfer.has(seq)
+        )
+        return transfer
+
+    def discard_partial(self, transfer):
+        try:
+            os.remove(self._partial_path(transfer))
+        except OSError:
+            pass
+
+    def put(self, text):
+        digest = text_digest(text)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self._path(digest) + ".tmp"
+            with open(tmp_path, "wb") as file:
+                file.write(text.encode("utf-8"))
+            os.replace(tmp_path, self._path(digest))
+        except OSError as e:
+            log.warning("Could not cache text %s: %s", digest[:12], e)
+        return digest
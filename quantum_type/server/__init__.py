@@ -0,0 +1,4 @@
+from .room import Room
+from .game_server import GameServer
+
+__all__ = ['Room', 'GameServer']
@@ -0,0 +1,54 @@
+"""Headless multi-room server.
+
+Run from the repository root (or with the package installed):
+
+    python -m quantum_type.server --port 12345 --texts texts/ --players 2
+
+One process runs every room on a single event loop. To use more cores,
+start one process per core on its own port and spread room codes across
+them.
+"""
+import argparse
+import asyncio
+
+from quantum_type.logs import DEFAULT_RATE_LIMIT, setup_logging
+from quantum_type.server.game_server import GameServer, TextLibrary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless multi-room typing server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=12345)
+    parser.add_argument(
+        "--texts", nargs="*", default=[], help="text files or directories of .txt files"
+    )
+    parser.add_argument(
+        "--players", type=int, default=2, help="players needed before a match starts"
+    )
+    parser.add_argument(
+        "--rematch-delay", type=float, default=10, help="seconds between matches"
+    )
+    parser.add_argument(
+        "--log-level", default=None, help="DEBUG, INFO, WARNING... (default: INFO)"
+    )
+    parser.add_argument(
+        "--no-rate-limit", action="store_true", help="log every repeated message"
+    )
+    args = parser.parse_args()
+    setup_logging(args.log_level, None if args.no_rate_limit else DEFAULT_RATE_LIMIT)
+
+    server = GameServer(
+        host=args.host,
+        port=args.port,
+        library=TextLibrary(args.texts),
+        players_per_room=args.players,
+        rematch_delay=args.rematch_delay,
+    )
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+import asyncio
+import os
+import random
+import socket
+import time
+
+from quantum_type.core.ingest import read_text
+from quantum_type.logs import get_logger
+from quantum_type.network.clock import pong_message
+from quantum_type.network.codec import JSON_CODEC, choose_codec, decode_payload
+from quantum_type.network.framing import HEADER_SIZE, MAX_FRAME_SIZE
+from quantum_type.network.protocol import check_message, encode_message
+from quantum_type.network.send_queue import HIGH_WATER_BYTES, MAX_QUEUE_BYTES, SATURATION_TIMEOUT
+from quantum_type.network.session import (
+    HEARTBEAT_TIMEOUT,
+    SESSION_FEATURE,
+    SESSION_GRACE,
+    new_session_token,
+)
+from quantum_type.server.room import Room, new_room_code
+
+DEFAULT_TEXT = "The quick brown fox jumps over the lazy dog."
+
+log = get_logger("server")
+
+
+class TextLibrary:
+    """Practice texts the server hands out to rooms that did not bring one"""
+
+    def __init__(self, paths=()):
+        self.texts = []
+        for path in paths:
+            if os.path.isdir(path):
+                for name in sorted(os.listdir(path)):
+                    if name.endswith(".txt"):
+                        self._load(os.path.join(path, name))
+            else:
+                self._load(path)
+        if not self.texts:
+            self.texts.append(DEFAULT_TEXT)
+
+    def _load(self, path):
+        text = read_text(path)
+        if text:
+            self.texts.append(text)
+
+    def pick(self):
+        return random.choice(self.texts)
+
+
+class Player:
+    """A connected client and the room it joined"""
+
+    def __init__(self, writer, name):
+        self.writer = writer
+        self.name = name
+        self.player_id = None
+        self.codec = JSON_CODEC
+        self.features = set()
+        self.transfer = None  # Outgoing text transfer, if one is running
+        self.offset = None  # Clock offset and RTT the client last reported
+        self.rtt = None
+        self.session = None
+        self.expiry = None  # Timer that frees the seat after a disconnect
+        self.room = None
+        self.closed = False
+        self.peak_backlog = 0
+        self.saturated_since = None
+
+    def send(self, msg):
+        self.send_frame(encode_message(msg, self.codec))
+
+    def send_frame(self, frame):
+        if not self.closed:
+            self.writer.write(frame)
+            self._check_backlog()
+
+    def backlog(self):
+        """Bytes written to the transport that the client has not taken yet"""
+        return self.writer.transport.get_write_buffer_size()
+
+    def _check_backlog(self):
+        """Abort a client that stays above the high-water mark for too long.
+
+        The transport buffer is this connection's send queue; the read loop
+        sees the abort and handles it like any other disconnect, so a
+        session client can still RESUME.
+        """
+        size = self.backlog()
+        self.peak_backlog = max(self.peak_backlog, size)
+        if size < HIGH_WATER_BYTES:
+            self.saturated_since = None
+            return
+        now = time.monotonic()
+        if self.saturated_since is None:
+            self.saturated_since = now
+        too_long = now - self.saturated_since >= SATURATION_TIMEOUT
+        if self.writer.transport.is_closing():
+            return
+        if size > MAX_QUEUE_BYTES or too_long:
+            log.warning("%s is not keeping up, dropping connection", self.name)
+            self.writer.transport.abort()
+
+
+class GameServer:
+    """Headless host for many independent rooms on one asyncio event loop.
+
+    Clients send ``{"type": "JOIN", "room": code}`` first; an empty code opens
+    a fresh room whose code comes back in CLIENT_JOINED. After that the usual
+    PROGRESS / COUNTDOWN_START / START / END traffic flows per room. A client
+    that comes back with RESUME and its session token gets its seat back.
+    """
+
+    def __init__(self, host="0.0.0.0", port=12345, library=None,
+                 players_per_room=2, rematch_delay=10):
+        self.host = host
+        self.port = port
+        self.library = library or TextLibrary()
+        self.players_per_room = players_per_room
+        self.rematch_delay = rematch_delay
+        self.rooms = {}
+        self.sessions = {}  # token -> Player
+        self.player_count = 0
+        self._next_player = 1
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(
+            self._on_client, self.host, self.port,
+            backlog=socket.SOMAXCONN, reuse_address=True,
+        )
+        self.port = self.server.sockets[0].getsockname()[1]
+        log.info("Server listening on %s:%s", self.host, self.port)
+
+    async def serve_forever(self, stats_interval=30):
+        await self.start()
+        async with self.server:
+            while True:
+                await asyncio.sleep(stats_interval)
+                log.info(
+                    "%d rooms, %d players%s%s", len(self.rooms), self.player_count,
+                    self._rtt_summary(), self._backlog_summary(),
+                )
+
+    def _rtt_summary(self):
+        rtts = [
+            player.rtt
+            for room in self.rooms.values()
+            for player in room.players
+            if player.rtt is not None
+        ]
+        if not rtts:
+            return ""
+        average = sum(rtts) / len(rtts)
+        return f", RTT avg {average * 1000:.1f} ms, max {max(rtts) * 1000:.1f} ms"
+
+    def _backlog_summary(self):
+        backlogs = [
+            player.backlog()
+            for room in self.rooms.values()
+            for player in room.players
+            if not player.closed
+        ]
+        if not backlogs:
+            return ""
+        return f", send backlog max {max(backlogs)} bytes"
+
+    async def _on_client(self, reader, writer):
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        player = Player(writer, f"Player {self._next_player}")
+        self._next_player += 1
+        self.player_count += 1
+        try:
+            while True:
+                # Clients that send heartbeats are dropped when they go quiet
+                timeout = HEARTBEAT_TIMEOUT if SESSION_FEATURE in player.features else None
+                header = await asyncio.wait_for(reader.readexactly(HEADER_SIZE), timeout)
+                msg_len = int.from_bytes(header, byteorder="big")
+                if msg_len > MAX_FRAME_SIZE:
+                    break
+                payload = await reader.readexactly(msg_len)
+                try:
+                    msg = decode_payload(payload)
+                    check_message(msg)
+                except ValueError as e:
+                    log.warning("%s sent a bad message: %s", player.name, e)
+                    continue
+                # RESUME can hand this connection to an earlier Player
+                player = self._dispatch(player, msg)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError,
+                ConnectionError, OSError):
+            pass
+        finally:
+            self.player_count -= 1
+            if player.writer is writer:
+                self._disconnected(player)
+            writer.close()
+
+    def _disconnected(self, player):
+        player.closed = True
+        if player.session and SESSION_FEATURE in player.features and player.room:
+            # Keep the seat for a while in case the client resumes
+            loop = asyncio.get_running_loop()
+            player.expiry = loop.call_later(SESSION_GRACE, self._expire, player)
+        else:
+            self._forget(player)
+
+    def _expire(self, player):
+        if player.closed:
+            self._forget(player)
+
+    def _forget(self, player):
+        if player.expiry is not None:
+            player.expiry.cancel()
+            player.expiry = None
+        self.sessions.pop(player.session, None)
+        self._leave_room(player)
+
+    def _negotiate(self, player, msg):
+        codec = choose_codec(msg.get("codecs"))
+        if codec != JSON_CODEC:
+            # Announce in JSON, everything after it uses the new codec
+            player.send({"type": "CODEC", "codec": codec})
+            player.codec = codec
+        player.features = set(msg.get("features") or ())
+
+    def _resume(self, player, msg):
+        """Move this connection onto the Player its session belongs to"""
+        old = self.sessions.get(msg.get("session"))
+        if old is None or old is player or old.room is None:
+            # Unknown or expired session: join again as a new player
+            self._negotiate(player, msg)
+            self._join_room(player, str(msg.get("room") or "").upper())
+            return player
+        if not old.closed:
+            # The previous link is half-open; its reader will notice
+            old.writer.close()
+        if old.expiry is not None:
+            old.expiry.cancel()
+            old.expiry = None
+        old.writer = player.writer
+        old.codec = JSON_CODEC
+        old.closed = False
+        self._negotiate(old, msg)
+        old.room.resume_player(old, msg.get("digest"))
+        return old
+
+    def _dispatch(self, player, msg):
+        """Handle one message; returns the Player the connection belongs to"""
+        if msg.get("type") == "PING":
+            # The server's monotonic clock is the timeline for every room
+            player.send(pong_message(msg, time.monotonic()))
+            return player
+        if msg.get("type") == "CLOCK":
+            player.offset, player.rtt = msg.get("offset"), msg.get("rtt")
+            return player
+        if msg.get("type") == "RESUME":
+            return self._resume(player, msg)
+        if msg.get("type") == "CLIENT_CONNECTED":
+            self._negotiate(player, msg)
+        if msg.get("type") == "JOIN":
+            self._leave_room(player)
+            if msg.get("name"):
+                player.name = str(msg["name"])
+            self._join_room(player, str(msg.get("room") or "").upper())
+        elif player.room is not None:
+            player.room.handle_message(player, msg)
+        return player
+
+    def _join_room(self, player, code):
+        if player.session is None:
+            player.session = new_session_token()
+            self.sessions[player.session] = player
+        if not code:
+            code = new_room_code(self.rooms)
+        room = self.rooms.get(code)
+        if room is None:
+            room = Room(
+                code,
+                asyncio.get_running_loop(),
+                self.library,
+                min_players=self.players_per_room,
+                rematch_delay=self.rematch_delay,
+            )
+            self.rooms[code] = room
+        player.room = room
+        room.add_player(player)
+
+    def _leave_room(self, player):
+        room = player.room
+        if room is None:
+            return
+        player.room = None
+        room.remove_player(player)
+        if room.is_empty():
+            self.rooms.pop(room.code, None)
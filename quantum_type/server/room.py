@@ -0,0 +1,216 @@
+import random
+import string
+import time
+
+from quantum_type.core.typing_target import normalize_text
+from quantum_type.network.protocol import encode_message, text_messages
+from quantum_type.network.scoreboard import SCOREBOARD_INTERVAL, Scoreboard, winner_of
+from quantum_type.network.session import snapshot_message
+from quantum_type.network.text_transfer import TEXT_FEATURE, OutgoingTransfer, TextBlob
+
+GAME_DURATION = 60
+COUNTDOWN_SECONDS = 3
+ROOM_CODE_LENGTH = 6
+
+
+def new_room_code(existing):
+    alphabet = string.ascii_uppercase + string.digits
+    while True:
+        code = "".join(random.choices(alphabet, k=ROOM_CODE_LENGTH))
+        if code not in existing:
+            return code
+
+
+class Room:
+    """One independent match: its own text, countdown, timer and scoreboard.
+
+    Rooms never block; timers are scheduled on the server's event loop, so a
+    single process can run as many rooms as it has players for.
+    """
+
+    WAITING = "waiting"
+    COUNTDOWN = "countdown"
+    PLAYING = "playing"
+
+    def __init__(self, code, loop, library, min_players=2, rematch_delay=10):
+        self.code = code
+        self.loop = loop
+        self.library = library
+        self.min_players = min_players
+        self.rematch_delay = rematch_delay
+        self.players = []
+        self.scoreboard = Scoreboard()
+        self._next_player_id = 1
+        self.text = ""
+        self.blob = None
+        self.custom_text = None
+        self.phase = self.WAITING
+        self.start_time = 0
+        self.start_at = None  # Match start on the server's monotonic clock
+        self._timers = []
+
+    def add_player(self, player):
+        player.player_id = self._next_player_id
+        self._next_player_id += 1
+        self.players.append(player)
+        self.scoreboard.add_player(player.player_id, player.name)
+        player.send(
+            {
+                "type": "CLIENT_JOINED",
+                "room": self.code,
+                "name": player.name,
+                "player_id": player.player_id,
+                "session": player.session,
+            }
+        )
+        player.send(self.scoreboard.full_update())
+        self.broadcast(self.scoreboard.players_message())
+        if self.phase != self.WAITING and self.text:
+            # Late joiners can watch the running match with the same text
+            self._send_text(player)
+        self._maybe_start()
+
+    def resume_player(self, player, digest):
+        """A player came back on a new connection: one SNAPSHOT catches it up"""
+        start_at = self.start_at if self.phase != self.WAITING else None
+        player.send(
+            snapshot_message(
+                self.scoreboard,
+                player.player_id,
+                player.session,
+                self.blob.digest if self.blob else None,
+                start_at,
+                GAME_DURATION,
+                time.monotonic(),
+                room=self.code,
+            )
+        )
+        if self.blob is not None and digest != self.blob.digest:
+            self._send_text(player)
+
+    def remove_player(self, player):
+        if player in self.players:
+            self.players.remove(player)
+            self.scoreboard.remove_player(player.player_id)
+        if not self.players:
+            self.close()
+        else:
+            self.broadcast(self.scoreboard.players_message())
+
+    def is_empty(self):
+        return not self.players
+
+    def close(self):
+        for timer in self._timers:
+            timer.cancel()
+        self._timers = []
+        self.phase = self.WAITING
+
+    def handle_message(self, player, msg):
+        msg_type = msg.get("type")
+        if msg_type == "PROGRESS":
+            if self.phase != self.PLAYING:
+                return
+            # Folded into the next SCOREBOARD tick instead of relayed
+            self.scoreboard.update(player.player_id, msg["index"], msg["score"])
+        elif msg_type == "LOAD_TEXT":
+            # The first player in the room may pick the text for the next match
+            if player is self.players[0] and self.phase == self.WAITING:
+                self.custom_text = normalize_text(msg.get("text") or "") or None
+        elif msg_type == "CLIENT_CONNECTED":
+            self._maybe_start()
+        elif msg_type in ("TEXT_REQUEST", "TEXT_ACK", "TEXT_HAVE"):
+            self._handle_text_reply(player, msg)
+
+    def _send_text(self, player):
+        """Offer the match text by digest, or chunk it for older clients"""
+        player.transfer = None
+        if TEXT_FEATURE in player.features:
+            player.send(self.blob.offer_message())
+        else:
+            for msg in text_messages(self.text):
+                player.send(msg)
+
+    def _handle_text_reply(self, player, msg):
+        if self.blob is None or msg.get("digest") != self.blob.digest:
+            return
+        if msg["type"] == "TEXT_REQUEST":
+            player.transfer = OutgoingTransfer(self.blob, msg.get("missing"))
+        elif msg["type"] == "TEXT_ACK" and player.transfer is not None:
+            player.transfer.on_ack(msg["acked"])
+        else:
+            player.transfer = None
+            return
+        for data_msg in player.transfer.next_messages():
+            player.send(data_msg)
+
+    def broadcast(self, msg):
+        # Encode once per codec in use, not once per player
+        frames = {}
+        for player in self.players:
+            frame = frames.get(player.codec)
+            if frame is None:
+                frame = frames[player.codec] = encode_message(msg, player.codec)
+            player.send_frame(frame)
+
+    def _later(self, delay, callback):
+        now = self.loop.time()
+        self._timers = [timer for timer in self._timers if timer.when() > now]
+        self._timers.append(self.loop.call_later(delay, callback))
+
+    def _maybe_start(self):
+        if self.phase == self.WAITING and len(self.players) >= self.min_players:
+            self._begin_countdown()
+
+    def _begin_countdown(self):
+        self._timers = []
+        self.phase = self.COUNTDOWN
+        self.text = self.custom_text or self.library.pick()
+        if self.blob is None or self.blob.text != self.text:
+            self.blob = TextBlob(self.text)
+        self.scoreboard.reset()
+        self.broadcast(self.scoreboard.take_changes())
+        for player in self.players:
+            self._send_text(player)
+        self.start_at = time.monotonic() + COUNTDOWN_SECONDS
+        self.broadcast(
+            {
+                "type": "COUNTDOWN_START",
+                "time": time.time(),
+                "start_at": self.start_at,
+                "duration": GAME_DURATION,
+            }
+        )
+        self._later(COUNTDOWN_SECONDS, self._start_match)
+
+    def _start_match(self):
+        self.phase = self.PLAYING
+        self.start_time = time.time()
+        self.broadcast(
+            {
+                "type": "START",
+                "start_time": self.start_time,
+                "start_at": self.start_at,
+                "duration": GAME_DURATION,
+            }
+        )
+        self._later(GAME_DURATION, self._end_match)
+        self._later(SCOREBOARD_INTERVAL, self._tick)
+
+    def _tick(self):
+        """Send one batched scoreboard update per tick while a match runs"""
+        if self.phase != self.PLAYING:
+            return
+        self._flush_scoreboard()
+        self._later(SCOREBOARD_INTERVAL, self._tick)
+
+    def _flush_scoreboard(self):
+        if self.scoreboard.has_changes():
+            self.broadcast(self.scoreboard.take_changes())
+
+    def _end_match(self):
+        self.phase = self.WAITING
+        self._flush_scoreboard()
+        ranking = self.scoreboard.ranking()
+        self.broadcast({"type": "END", "winner": winner_of(ranking), "ranking": ranking})
+        self._later(self.rematch_delay, self._maybe_start)
@@ -0,0 +1,103 @@
+import pytest
+
+from quantum_type.core import analytics
+from quantum_type.core.analytics import LiveStats
+from quantum_type.core.keystrokes import KeystrokeLog
+
+
+def make_log(keys):
+    """keys: (time, expected, typed); positions advance on correct keys"""
+    log = KeystrokeLog()
+    position = 0
+    for time, expected, typed in keys:
+        correct = expected == typed
+        log.append(time, position, ord(expected), ord(typed) if typed else 0, correct)
+        position += correct
+    return log
+
+
+def test_wpm():
+    assert analytics.wpm(50, 60) == 10
+    assert analytics.wpm(10, 0) == 0.0
+
+
+def test_summary():
+    log = make_log([(0.0, "a", "a"), (1.0, "b", "x"), (2.0, "b", "b"), (3.0, "c", "c")])
+    numbers = analytics.summary(log)
+    assert numbers["keystrokes"] == 4
+    assert numbers["errors"] == 1
+    assert numbers["accuracy"] == 0.75
+    assert numbers["seconds"] == 3.0
+    assert numbers["gross_wpm"] == pytest.approx(16)
+    assert numbers["net_wpm"] == pytest.approx(12)
+    assert analytics.summary(log, duration=60)["net_wpm"] == pytest.approx(0.6)
+
+
+def test_summary_of_nothing():
+    numbers = analytics.summary(KeystrokeLog())
+    assert numbers["accuracy"] == 1.0
+    assert numbers["net_wpm"] == 0.0
+
+
+def test_rolling_wpm():
+    log = make_log([(t * 0.5, "a", "a") for t in range(21)])  # 2 keys a second
+    points = analytics.rolling_wpm(log, window=5.0, step=1.0)
+    assert [t for t, _ in points] == [float(t) for t in range(1, 11)]
+    assert points[-1][1] == pytest.approx(24)  # 10 keys in 5 s
+
+
+def test_latencies():
+    log = make_log([(0.0, "a", "a"), (0.2, "b", "b"), (0.5, "a", "x"), (0.6, "a", "a"),
+                    (5.0, "b", "b")])
+    assert analytics.char_latency(log) == {
+        "b": [1, pytest.approx(0.2)], "a": [1, pytest.approx(0.1)],
+    }
+    # The key after a mistake is not part of a bigram, and 5 s is a pause
+    assert analytics.bigram_latency(log) == {("a", "b"): [1, pytest.approx(0.2)]}
+
+
+def test_errors():
+    log = make_log([(0.0, "a", "s"), (0.1, "a", "a"), (0.2, "b", ""), (0.3, "b", "b")])
+    assert analytics.error_heatmap(log) == {"a": [1, 2], "b": [1, 2]}
+    assert analytics.confusions(log) == {("a", "s"): 1, ("b", ""): 1}
+    assert analytics.error_positions(log) == {0: 1, 1: 1}
+
+
+def test_analyse_sessions_merges():
+    first = make_log([(0.0, "a", "a"), (1.0, "b", "b")])
+    second = make_log([(0.0, "a", "a"), (0.5, "b", "x"), (1.0, "b", "b")])
+    report = analytics.analyse_sessions([first, second])
+    assert report["sessions"] == 2
+    assert report["keystrokes"] == 5
+    assert report["correct"] == 4
+    assert report["seconds"] == 2.0
+    assert report["error_heatmap"] == {"a": [0, 2], "b": [1, 3]}
+    assert report["char_latency"]["b"] == [2, pytest.approx(1.5)]
+
+
+def test_mean_latency_slowest_first():
+    means = analytics.mean_latency({"a": [2, 0.2], "b": [1, 0.5], "c": [0, 0]})
+    assert list(means) == ["b", "a"]
+    assert means["a"] == pytest.approx(100)
+
+
+def test_live_stats_match_summary():
+    keys = [(0.0, "a", "a"), (0.4, "b", "x"), (0.8, "b", "b"), (1.2, "c", "c")]
+    stats = LiveStats()
+    for time, expected, typed in keys:
+        stats.add(time, expected == typed)
+    snapshot = stats.snapshot()
+    numbers = analytics.summary(make_log(keys))
+    for key in ("keystrokes", "errors", "accuracy", "gross_wpm", "net_wpm"):
+        assert snapshot[key] == pytest.approx(numbers[key])
+
+
+def test_live_stats_rolling_window():
+    stats = LiveStats(window=2.0)
+    stats.reset(start=0.0)
+    for i in range(10):
+        stats.add(i * 1.0, True)
+    # Keys at 7, 8 and 9 are inside the last two seconds
+    assert stats.snapshot()["rolling_wpm"] == pytest.approx(analytics.wpm(3, 2.0))
+    stats.reset()
+    assert stats.snapshot()["keystrokes"] == 0
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from quantum_type.network.codec import (
+    BINARY_CODEC,
+    JSON_CODEC,
+    choose_codec,
+    decode_payload,
+    decode_varint,
+    encode_payload,
+    encode_varint,
+)
+
+
+@pytest.mark.parametrize("value", [0, 1, 127, 128, 300, 16383, 16384, 2**32, 2**63 + 5])
+def test_varint_round_trip(value):
+    out = bytearray(b"x")
+    encode_varint(value, out)
+    assert decode_varint(out, 1) == (value, len(out))
+
+
+def test_varint_sizes():
+    for value, size in [(0, 1), (127, 1), (128, 2), (16383, 2), (16384, 3)]:
+        out = bytearray()
+        encode_varint(value, out)
+        assert len(out) == size
+
+
+@pytest.mark.parametrize("value", [-1, -(2**70), 1.5, "3"])
+def test_varint_rejects_negative_and_non_integers(value):
+    with pytest.raises(ValueError):
+        encode_varint(value, bytearray())
+
+
+def test_progress_round_trip():
+    msg = {"type": "PROGRESS", "player": 3, "index": 1234, "score": 56}
+    payload = encode_payload(msg, BINARY_CODEC)
+    assert payload[0] >= 0x80
+    assert decode_payload(payload) == msg
+
+
+def test_progress_without_player():
+    msg = {"type": "PROGRESS", "player": None, "index": 0, "score": 0}
+    assert decode_payload(encode_payload(msg, BINARY_CODEC)) == msg
+
+
+def test_scoreboard_round_trip():
+    msg = {"type": "SCOREBOARD", "players": [[0, 10, 2], [1, 200000, 150], [None, 0, 0]]}
+    assert decode_payload(encode_payload(msg, BINARY_CODEC)) == msg
+
+
+def test_negative_fields_fall_back_to_json():
+    msg = {"type": "PROGRESS", "player": 1, "index": -3, "score": 2}
+    payload = encode_payload(msg, BINARY_CODEC)
+    assert json.loads(payload) == msg
+    assert decode_payload(payload) == msg
+
+
+def test_text_data_round_trip_keeps_tag():
+    msg = {
+        "type": "TEXT_DATA", "tag": 0xDEADBEEF, "seq": 300, "crc": 12345,
+        "data": b"\x00\xffabc",
+    }
+    # TEXT_DATA only exists in binary form, whatever the codec
+    for codec in (JSON_CODEC, BINARY_CODEC):
+        assert decode_payload(encode_payload(msg, codec)) == msg
+
+
+@pytest.mark.parametrize("cut", [1, 3, 5, 8])
+def test_truncated_text_data_is_rejected(cut):
+    msg = {"type": "TEXT_DATA", "tag": 1, "seq": 1, "crc": 1, "data": b""}
+    payload = encode_payload(msg, BINARY_CODEC)
+    with pytest.raises(ValueError):
+        decode_payload(payload[:cut])
+
+
+def test_json_is_the_default():
+    msg = {"type": "PROGRESS", "player": 1, "index": 5, "score": 1}
+    assert json.loads(encode_payload(msg)) == msg
+
+
+@pytest.mark.parametrize("payload", [b"[1, 2]", b'"text"', b'{"index": 1}', b'{"type": 5}'])
+def test_messages_must_be_objects_with_a_type(payload):
+    with pytest.raises(ValueError):
+        decode_payload(payload)
+
+
+def test_unknown_binary_type_is_rejected():
+    with pytest.raises(ValueError):
+        decode_payload(bytes([0xFE, 0x00]))
+
+
+def test_choose_codec():
+    assert choose_codec([JSON_CODEC, BINARY_CODEC]) == BINARY_CODEC
+    assert choose_codec(["future"]) == JSON_CODEC
+    assert choose_codec(None) == JSON_CODEC
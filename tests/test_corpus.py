@@ -0,0 +1,127 @@
+import os
+
+import pytest
+
+from quantum_type.core import corpus as corpus_module
+from quantum_type.core.corpus import INDEX_NAME, Corpus, difficulty, open_corpus
+
+EASY = "the cat sat on the mat. the dog ran to the cat.\n"
+HARD = "Dr. X-17 (aka \"Zed\") paid $4,250.99 @ 3:15PM!\n"
+
+
+@pytest.fixture
+def texts(tmp_path):
+    (tmp_path / "a.txt").write_text(
+        "One two three. Four five\nsix seven.\n\n  Second paragraph here.\n"
+    )
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "b.txt").write_text("中文句子。第二句！\n\nLast one? Yes.")
+    (tmp_path / "notes.md").write_text("Not a text file.")
+    return tmp_path
+
+
+def test_difficulty_ranks_symbols_above_plain_words():
+    def score(text):
+        return difficulty(
+            len(text), sum(c.isupper() for c in text), sum(c.isdigit() for c in text),
+            sum(not c.isalnum() and not c.isspace() for c in text), 0, len(text.split()),
+        )
+
+    assert score(HARD) > score(EASY)
+    assert difficulty(0, 0, 0, 0, 0, 0) == 0.0
+
+
+def test_build_indexes_paragraphs_and_sentences(texts):
+    corpus = Corpus.build(str(texts))
+    assert [entry["path"] for entry in corpus.files] == ["a.txt", os.path.join("sub", "b.txt")]
+    assert len(corpus) == 4
+    assert len(corpus.sentences["start"]) == 7
+    assert list(corpus.paragraphs["chars"]) == [35, 22, 9, 14]
+    assert list(corpus.paragraphs["non_ascii"]) == [0, 0, 9, 0]
+    assert list(corpus.sentences["chars"][-4:]) == [5, 4, 9, 4]
+
+
+def test_passages_are_whole_sentences_with_wrapped_lines_joined(texts):
+    corpus = Corpus.build(str(texts), seed=1)
+    file_id, first, last = 0, 0, 1
+    assert corpus.read(file_id, first, last) == "One two three. Four five six seven."
+    assert corpus.read(0, 0, 2) == "One two three. Four five six seven.\nSecond paragraph here."
+    # Long enough passages run on into later sentences of the same file
+    for _ in range(20):
+        text = corpus.passage(length=30)
+        assert text in (
+            "One two three. Four five six seven.",
+            "One two three. Four five six seven.\nSecond paragraph here.",
+            "Four five six seven.\nSecond paragraph here.",
+            "中文句子。第二句！\nLast one? Yes.",
+            "第二句！\nLast one? Yes.",
+        )
+    corpus.close()
+
+
+def test_pick_paragraph_by_difficulty(tmp_path):
+    (tmp_path / "mixed.txt").write_text((EASY + "\n" + HARD + "\n") * 5)
+    corpus = Corpus.build(str(tmp_path), seed=2)
+    scores = corpus.paragraphs["difficulty"]
+    easy, hard = min(scores), max(scores)
+    for _ in range(10):
+        assert scores[corpus.pick_paragraph(easy, tolerance=1.0)] == easy
+        assert scores[corpus.pick_paragraph(hard, tolerance=1.0)] == hard
+    # Outside every band: the nearest paragraph
+    assert scores[corpus.pick_paragraph(hard + 1000, tolerance=1.0)] == hard
+
+
+def test_empty_corpus(tmp_path):
+    corpus = Corpus.build(str(tmp_path))
+    assert len(corpus) == 0
+    with pytest.raises(ValueError):
+        corpus.passage()
+
+
+def test_save_and_load_round_trip(texts):
+    corpus = Corpus.build(str(texts))
+    path = str(texts / INDEX_NAME)
+    corpus.save(path)
+    loaded = Corpus.load(str(texts), path)
+    assert loaded.files == corpus.files
+    assert list(loaded.order) == list(corpus.order)
+    for name in corpus.paragraphs:
+        assert list(loaded.paragraphs[name]) == list(corpus.paragraphs[name])
+    for name in corpus.sentences:
+        assert list(loaded.sentences[name]) == list(corpus.sentences[name])
+
+
+def test_truncated_index_is_rejected_and_rebuilt(texts):
+    path = str(texts / INDEX_NAME)
+    Corpus.build(str(texts)).save(path)
+    with open(path, "rb") as file:
+        data = file.read()
+    with open(path, "wb") as file:
+        file.write(data[:-3])
+    with pytest.raises(ValueError):
+        Corpus.load(str(texts), path)
+    assert len(Corpus.open(str(texts))) == 4
+
+
+def test_open_only_rescans_changed_files(texts, monkeypatch):
+    scanned = []
+    scan = corpus_module._scan
+
+    def counting_scan(data, paragraphs, sentences):
+        scanned.append(len(data))
+        scan(data, paragraphs, sentences)
+
+    monkeypatch.setattr(corpus_module, "_scan", counting_scan)
+    first = Corpus.open(str(texts))
+    assert len(scanned) == 2
+    assert len(Corpus.open(str(texts))) == len(first)
+    assert len(scanned) == 2  # Nothing changed: the saved index is used
+    (texts / "sub" / "b.txt").write_text("Replaced. Entirely.")
+    corpus = Corpus.open(str(texts))
+    assert len(scanned) == 3
+    assert len(corpus) == 3
+    assert corpus.read(1, 3, 4) == "Replaced. Entirely."
+
+
+def test_open_corpus_without_a_directory(tmp_path):
+    assert open_corpus(str(tmp_path / "missing")) is None
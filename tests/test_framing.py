@@ -0,0 +1,40 @@
+import pytest
+
+from quantum_type.network.framing import HEADER_SIZE, FrameReader, encode_frame
+
+
+def test_encode_frame_prefixes_length():
+    assert encode_frame(b"abc") == b"\x00\x00\x00\x03abc"
+
+
+def test_whole_frames():
+    reader = FrameReader()
+    assert reader.feed(encode_frame(b"one") + encode_frame(b"two")) == [b"one", b"two"]
+    assert reader.pending == 0
+
+
+def test_one_byte_at_a_time():
+    reader = FrameReader()
+    stream = encode_frame(b"hello") + encode_frame(b"") + encode_frame(b"world")
+    frames = []
+    for i in range(len(stream)):
+        frames += reader.feed(stream[i : i + 1])
+    assert frames == [b"hello", b"", b"world"]
+    assert reader.pending == 0
+
+
+def test_partial_header_and_body_stay_buffered():
+    reader = FrameReader()
+    frame = encode_frame(b"payload")
+    assert reader.feed(frame[:2]) == []
+    assert reader.pending == 2
+    assert reader.feed(frame[2 : HEADER_SIZE + 3]) == []
+    assert reader.pending == 3
+    assert reader.feed(frame[HEADER_SIZE + 3 :] + frame[:1]) == [b"payload"]
+    assert reader.pending == 1
+
+
+def test_oversized_frame_is_rejected():
+    reader = FrameReader(max_frame_size=10)
+    with pytest.raises(ValueError):
+        reader.feed(encode_frame(b"x" * 11))
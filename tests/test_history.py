@@ -0,0 +1,100 @@
+import threading
+import time
+
+import pytest
+
+from quantum_type.core.history import MatchHistory, match_record
+
+DIGEST = "a" * 64
+
+
+def result(player, score, me=False, rank=None, net_wpm=None):
+    return {"player": player, "score": score, "me": me, "rank": rank, "net_wpm": net_wpm}
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = MatchHistory(str(tmp_path / "history.db"), player_name="me")
+    yield history
+    history.close()
+
+
+def test_record_and_query(history):
+    history.record_match(match_record(DIGEST, "host", 60, [
+        result("me", 30, me=True, rank=1, net_wpm=70.0), result("bob", 20, rank=2),
+    ], winner="me", played_at=100.0))
+    history.record_match(match_record(DIGEST, "single", 60, [
+        result("me", 25, me=True, rank=1, net_wpm=60.0),
+    ], played_at=200.0))
+    history.flush()
+    assert [row["score"] for row in history.player_history()] == [25, 30]
+    assert [row["score"] for row in history.player_history("bob")] == [20]
+    assert history.personal_best(DIGEST)["score"] == 30
+    # Opponents are stored with the match but get no personal best
+    assert history.personal_best(DIGEST, "bob") is None
+    stats = history.player_stats()
+    assert stats["matches"] == 2
+    assert stats["wins"] == 2
+    assert stats["best_net_wpm"] == 70.0
+    assert history.player_stats(since=150.0)["matches"] == 1
+
+
+def test_personal_best_keeps_the_higher_score(history):
+    for played_at, score in [(1.0, 10), (2.0, 30), (3.0, 20), (4.0, 30)]:
+        history.record_match(match_record(DIGEST, "single", 60, [result("me", score, me=True)],
+                                          played_at=played_at))
+    history.flush()
+    best = history.personal_best(DIGEST)
+    assert best["score"] == 30
+    assert best["played_at"] == 2.0  # A tie keeps the earlier match
+    assert [row["player"] for row in history.leaderboard(DIGEST)] == ["me"]
+
+
+def test_matches_queued_together_are_written_in_one_batch(history, monkeypatch):
+    batches = []
+    gate = threading.Event()
+    insert = MatchHistory._insert
+
+    def counting_insert(self, conn, matches):
+        batches.append(len(matches))
+        gate.wait(5)
+        insert(self, conn, matches)
+
+    monkeypatch.setattr(MatchHistory, "_insert", counting_insert)
+    history.record_match(match_record(DIGEST, "single", 60, [result("me", 1, me=True)]))
+    deadline = time.monotonic() + 5
+    while not batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # The writer is busy with the first match; these pile up meanwhile
+    for score in range(10):
+        history.record_match(match_record(DIGEST, "single", 60, [result("me", score, me=True)]))
+    gate.set()
+    history.flush()
+    assert batches == [1, 10]
+    assert len(history.player_history()) == 11
+
+
+def test_a_bad_match_only_loses_itself(history):
+    history.record_match(match_record(DIGEST, "single", 60, [result("me", 1, me=True)]))
+    history.record_match(match_record(DIGEST, "single", 60, [{"player": "me"}]))  # No score
+    history.record_match(match_record(DIGEST, "single", 60, [result("me", 3, me=True)]))
+    history.flush()
+    assert sorted(row["score"] for row in history.player_history()) == [1, 3]
+
+
+def test_cache_is_invalidated_by_writes(history):
+    history.record_match(match_record(DIGEST, "single", 60, [result("me", 5, me=True)]))
+    history.flush()
+    first = history.leaderboard(DIGEST)
+    assert history.leaderboard(DIGEST) is first  # Served from the cache
+    generation = history.generation
+    history.record_match(match_record(DIGEST, "single", 60, [result("me", 9, me=True)]))
+    history.flush()
+    assert history.generation > generation
+    assert history.leaderboard(DIGEST)[0]["score"] == 9
+
+
+def test_open_returns_none_when_the_database_cannot_be_created(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    assert MatchHistory.open(str(blocker / "history.db")) is None
@@ -0,0 +1,104 @@
+import codecs
+
+import pytest
+
+from quantum_type.core import ingest
+from quantum_type.core.ingest import LoadCancelled, TextLoader, detect_encoding, read_text
+
+TRADITIONAL = "我們在這個大國的時候，他說你也來了。" * 20
+SIMPLIFIED = "我们在这个大国的时候，他说你也来了。" * 20
+
+
+@pytest.mark.parametrize("encoding, bom", [
+    ("utf-8", codecs.BOM_UTF8),
+    ("utf-16-le", codecs.BOM_UTF16_LE),
+    ("utf-16-be", codecs.BOM_UTF16_BE),
+    ("utf-32-le", codecs.BOM_UTF32_LE),
+    ("utf-32-be", codecs.BOM_UTF32_BE),
+])
+def test_detect_by_bom(encoding, bom):
+    assert detect_encoding(bom + "hi".encode(encoding)) == (encoding, len(bom))
+
+
+@pytest.mark.parametrize("text, encoding, expected", [
+    ("plain ascii", "utf-8", "utf-8"),
+    ("café 中文", "utf-8", "utf-8"),
+    ("hello world, no BOM here", "utf-16-le", "utf-16-le"),
+    ("hello world, no BOM here", "utf-16-be", "utf-16-be"),
+    ("café crème", "cp1252", "cp1252"),
+])
+def test_detect_without_bom(text, encoding, expected):
+    assert detect_encoding(text.encode(encoding)) == (expected, 0)
+
+
+@pytest.mark.parametrize("text, encoding", [(TRADITIONAL, "big5"), (SIMPLIFIED, "gb18030")])
+def test_detect_chinese_encodings(text, encoding):
+    assert detect_encoding(text.encode(encoding)) == (encoding, 0)
+
+
+def test_undecodable_bytes_fall_back_to_latin_1():
+    assert detect_encoding(b"\x81\x8d\x8f\x90\x9d") == ("latin-1", 0)
+
+
+def test_read_text_normalises(tmp_path):
+    path = tmp_path / "text.txt"
+    path.write_bytes(codecs.BOM_UTF8 + "“Quoted”\r\n\tline — two\r\n".encode("utf-8"))
+    assert read_text(str(path)) == '"Quoted"\n    line - two\n'
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64])
+def test_chunks_never_split_words_or_crlf(tmp_path, chunk_size, monkeypatch):
+    monkeypatch.setattr(ingest, "SAMPLE_SIZE", 4)
+    text = "alpha beta\r\ngamma 中文 delta\r\n\r\nend"
+    path = tmp_path / "text.txt"
+    path.write_bytes(text.encode("utf-8"))
+    loader = TextLoader(str(path), chunk_size=chunk_size)
+    chunks = list(loader.chunks())
+    assert "".join(chunks) == "alpha beta\ngamma 中文 delta\n\nend"
+    for chunk in chunks[:-1]:
+        assert chunk[-1] in " \n"
+    assert loader.progress == 1.0
+
+
+def test_loader_builds_the_target(tmp_path):
+    path = tmp_path / "text.txt"
+    path.write_bytes(("word " * 50000).encode("utf-16"))
+    loader = TextLoader(str(path), chunk_size=4096).start()
+    target = loader.wait(10)
+    assert loader.encoding == "utf-16-le"
+    assert len(target) == 250000
+    assert target.word_count == 50000
+    assert loader.error is None
+
+
+def test_loader_reports_missing_files(tmp_path):
+    loader = TextLoader(str(tmp_path / "missing.txt")).start()
+    with pytest.raises(OSError):
+        loader.wait(10)
+    assert loader.target is None
+
+
+def test_loader_reports_unexpected_errors(tmp_path, monkeypatch):
+    path = tmp_path / "text.txt"
+    path.write_text("some text")
+
+    def broken(cls, chunks):
+        raise RuntimeError("broken")
+
+    monkeypatch.setattr(ingest.TypingTarget, "from_chunks", classmethod(broken))
+    loader = TextLoader(str(path)).start()
+    with pytest.raises(RuntimeError):
+        loader.wait(10)
+    assert loader.done.is_set()
+    assert loader.target is None
+
+
+def test_cancel(tmp_path):
+    path = tmp_path / "text.txt"
+    path.write_text("word " * 10000)
+    loader = TextLoader(str(path), chunk_size=16)
+    chunks = loader.chunks()
+    next(chunks)
+    loader.cancel()
+    with pytest.raises(LoadCancelled):
+        list(chunks)
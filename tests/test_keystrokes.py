@@ -0,0 +1,56 @@
+import pytest
+
+from quantum_type.core.keystrokes import KeystrokeLog
+
+
+def fill(log, count):
+    for i in range(count):
+        log.append(i * 0.1, i, ord("a") + i % 26, ord("a") + i % 26, i % 3 != 0)
+
+
+def test_records_in_order():
+    log = KeystrokeLog(capacity=10)
+    fill(log, 4)
+    assert len(log) == 4
+    assert log.dropped == 0
+    assert [record[1] for record in log.records()] == [0, 1, 2, 3]
+
+
+def test_wraparound_keeps_the_newest():
+    log = KeystrokeLog(capacity=5)
+    fill(log, 12)
+    assert len(log) == 5
+    assert log.total == 12
+    assert log.dropped == 7
+    columns = log.columns()
+    assert list(columns.positions) == [7, 8, 9, 10, 11]
+    assert list(columns.times) == pytest.approx([0.7, 0.8, 0.9, 1.0, 1.1])
+    assert list(columns.correct) == [1, 1, 0, 1, 1]
+
+
+def test_clear():
+    log = KeystrokeLog(capacity=3)
+    fill(log, 5)
+    log.clear()
+    assert len(log) == 0
+    assert log.total == 0
+    fill(log, 2)
+    assert [record[1] for record in log.records()] == [0, 1]
+
+
+@pytest.mark.parametrize("count", [0, 1, 5, 13])
+def test_bytes_round_trip(count):
+    log = KeystrokeLog(capacity=5)
+    fill(log, count)
+    copy = KeystrokeLog.from_bytes(log.to_bytes())
+    assert list(copy.records()) == list(log.records())
+
+
+def test_from_bytes_rejects_bad_data():
+    data = KeystrokeLog().to_bytes()
+    with pytest.raises(ValueError):
+        KeystrokeLog.from_bytes(b"XXXX" + data[4:])
+    log = KeystrokeLog()
+    fill(log, 3)
+    with pytest.raises(ValueError):
+        KeystrokeLog.from_bytes(log.to_bytes()[:-1])
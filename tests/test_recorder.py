@@ -0,0 +1,74 @@
+import pytest
+
+from quantum_type.core.recorder import (
+    REC_END, REC_KEY, REC_MESSAGE, MatchRecorder, Recording,
+)
+
+TEXT = "héllo wörld"
+
+
+def record(tmp_path, close=True):
+    recorder = MatchRecorder.create(str(tmp_path), 100.0, {"mode": "single"}, TEXT)
+    recorder.snapshot(100.0, {"position": 0})
+    recorder.key(101.0, 0, "h", "h", True)
+    recorder.key(101.5, 1, "é", "eacute", True)
+    recorder.message(102.0, {"type": "PROGRESS", "player": 2, "index": 3, "score": 2})
+    recorder.snapshot(105.0, {"position": 2})
+    recorder.key(106.0, 2, "x", "x", False)
+    if close:
+        recorder.close(107.0)
+    else:
+        recorder.file.flush()
+    return recorder.path
+
+
+def test_round_trip(tmp_path):
+    recording = Recording.load(record(tmp_path))
+    assert recording.complete
+    assert recording.text == TEXT
+    assert recording.info["mode"] == "single"
+    assert recording.info["origin"] == 100.0
+    assert [kind for _, kind, _ in recording.events] == [
+        REC_KEY, REC_KEY, REC_MESSAGE, REC_KEY, REC_END,
+    ]
+    assert recording.events[1] == (1.5, REC_KEY, (1, "é", "eacute", True))
+    assert recording.events[2][2]["index"] == 3
+    assert recording.duration == 7.0
+
+
+def test_snapshot_before(tmp_path):
+    recording = Recording.load(record(tmp_path))
+    assert recording.snapshot_before(0.0) == (0.0, 0, {"position": 0})
+    assert recording.snapshot_before(4.9)[2] == {"position": 0}
+    assert recording.snapshot_before(5.0) == (5.0, 3, {"position": 2})
+    assert recording.snapshot_before(99.0)[1] == 3
+
+
+def test_cut_off_recording(tmp_path):
+    with open(record(tmp_path, close=False), "rb") as file:
+        data = file.read()
+    recording = Recording.from_bytes(data[:-3])
+    assert not recording.complete
+    assert len(recording.events) == 3  # The last key press was cut off
+    assert len(recording.snapshots) == 2
+
+
+def test_rejects_other_files(tmp_path):
+    with pytest.raises(ValueError):
+        Recording.from_bytes(b"not a recording")
+    with open(record(tmp_path), "rb") as file:
+        data = file.read()
+    with pytest.raises(ValueError):
+        Recording.from_bytes(data[:20])
+    with pytest.raises(ValueError):
+        Recording.from_bytes(data.replace("wörld".encode(), "world!".encode()))
+
+
+def test_snapshot_schedule(tmp_path):
+    recorder = MatchRecorder.create(str(tmp_path), 0.0, {}, TEXT)
+    assert recorder.snapshot_due(0.0)
+    recorder.snapshot(0.0, {})
+    assert not recorder.snapshot_due(4.9)
+    assert recorder.snapshot_due(5.0)
+    recorder.close(6.0)
+    recorder.close(7.0)  # Closing twice is harmless
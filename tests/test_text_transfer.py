@@ -0,0 +1,140 @@
+import zlib
+
+import pytest
+
+from quantum_type.network.text_transfer import (
+    ChunkedTransfer, IncomingTransfer, OutgoingTransfer, TextBlob, TextCache, check_offer,
+    compress, decompress, from_ranges, to_ranges,
+)
+
+TEXT = "The quick brown fox 跳过了 the lazy dog.\n" * 500
+
+
+def transfer_all(blob, transfer):
+    for seq in range(blob.chunk_count):
+        message = blob.data_message(seq)
+        assert transfer.add(seq, message["data"], message["crc"])
+
+
+@pytest.mark.parametrize("compression", ["zlib", "lzma", "none"])
+def test_round_trip(compression):
+    blob = TextBlob(TEXT, compression, chunk_size=512)
+    transfer = IncomingTransfer(blob.offer_message())
+    transfer_all(blob, transfer)
+    assert transfer.complete
+    assert transfer.text() == TEXT
+
+
+def test_ranges():
+    assert to_ranges([0, 1, 2, 5, 7, 8]) == [[0, 3], [5, 6], [7, 9]]
+    assert from_ranges([[0, 3], [5, 6], [7, 99]], 9) == [0, 1, 2, 5, 7, 8]
+
+
+def test_decompress_limits():
+    raw = b"a" * 10_000
+    assert decompress(compress(raw, "zlib"), "zlib") == raw
+    with pytest.raises(ValueError):
+        decompress(compress(raw, "zlib"), "zlib", max_length=1000)
+    with pytest.raises(ValueError):
+        decompress(compress(raw, "lzma"), "lzma", max_length=1000)
+    with pytest.raises(ValueError):
+        decompress(zlib.compress(raw)[:-8], "zlib")
+    with pytest.raises(ValueError):
+        decompress(raw, "bz2")
+
+
+@pytest.mark.parametrize("change", [
+    {"digest": "../../etc/passwd"},
+    {"digest": "A" * 64},
+    {"compression": "bz2"},
+    {"compressed_size": -1},
+    {"compressed_size": 1 << 40},
+    {"chunk_size": 0},
+    {"chunks": 1000},
+    {"chunks": "3"},
+])
+def test_bad_offers(change):
+    offer = dict(TextBlob(TEXT, chunk_size=512).offer_message(), **change)
+    with pytest.raises(ValueError):
+        check_offer(offer)
+    with pytest.raises(ValueError):
+        IncomingTransfer(offer)
+
+
+def test_corrupt_and_duplicate_chunks():
+    blob = TextBlob(TEXT, "none", chunk_size=512)
+    transfer = IncomingTransfer(blob.offer_message())
+    message = blob.data_message(0)
+    assert not transfer.add(0, message["data"][:-1], message["crc"])
+    assert not transfer.add(0, message["data"], message["crc"] ^ 1)
+    assert not transfer.add(blob.chunk_count, message["data"], message["crc"])
+    assert transfer.add(0, message["data"], message["crc"])
+    assert not transfer.add(0, message["data"], message["crc"])
+    assert transfer.missing() == list(range(1, blob.chunk_count))
+    assert transfer.request_message()["missing"] == [[1, blob.chunk_count]]
+
+
+def test_digest_mismatch():
+    blob = TextBlob(TEXT, "none", chunk_size=512)
+    transfer = IncomingTransfer(dict(blob.offer_message(), digest="0" * 64))
+    transfer_all(blob, transfer)
+    with pytest.raises(ValueError):
+        transfer.text()
+
+
+def test_outgoing_window():
+    blob = TextBlob(TEXT, "none", chunk_size=512)
+    outgoing = OutgoingTransfer(blob, window=4)
+    assert [m["seq"] for m in outgoing.next_messages()] == [0, 1, 2, 3]
+    assert outgoing.next_messages() == []
+    outgoing.on_ack(2)
+    assert [m["seq"] for m in outgoing.next_messages()] == [4, 5]
+    outgoing.on_ack(99)  # Never past what was sent
+    assert outgoing.acked == 6
+    assert not outgoing.done
+
+    outgoing = OutgoingTransfer(blob, ranges=[[3, 5]])
+    assert [m["seq"] for m in outgoing.next_messages()] == [3, 4]
+    outgoing.on_ack(2)
+    assert outgoing.done
+
+
+def test_chunked_transfer_paces_by_unsent_bytes():
+    chunked = ChunkedTransfer(["a", "b", "c"], window_bytes=100)
+    assert chunked.next_messages(0) == ["a"]
+    assert chunked.next_messages(100) == []
+    assert chunked.next_messages(99) == ["b"]
+    assert chunked.next_messages(0) == ["c"]
+    assert chunked.done
+    assert chunked.next_messages(0) == []
+
+
+def test_cache(tmp_path):
+    cache = TextCache(str(tmp_path))
+    blob = TextBlob(TEXT)
+    assert cache.get(blob.digest) is None
+    cache.put(TEXT)
+    assert cache.get(blob.digest) == TEXT
+    assert cache.get("../" + blob.digest[3:]) is None
+    (tmp_path / f"{blob.digest}.txt").write_bytes(b"damaged")
+    assert cache.get(blob.digest) is None
+
+
+def test_cache_resumes_partial_transfer(tmp_path):
+    cache = TextCache(str(tmp_path))
+    blob = TextBlob(TEXT, "none", chunk_size=512)
+    transfer = cache.resume(blob.offer_message())
+    for seq in (0, 2):
+        message = blob.data_message(seq)
+        transfer.add(seq, message["data"], message["crc"])
+    cache.save_partial(transfer)
+
+    resumed = cache.resume(blob.offer_message())
+    assert resumed.received == 2
+    assert resumed.missing() == [1] + list(range(3, blob.chunk_count))
+    for seq in resumed.missing():
+        message = blob.data_message(seq)
+        resumed.add(seq, message["data"], message["crc"])
+    assert resumed.text() == TEXT
+    cache.discard_partial(resumed)
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,77 @@
+import pytest
+
+from quantum_type.core.typing_target import TypingTarget, normalize_text
+
+
+def test_normalize_text():
+    text = "“Hi”—it’s\r\na\tb​\rc…"
+    assert normalize_text(text) == '"Hi"-it\'s\na    b\nc...'
+
+
+def test_matches_plain_characters():
+    target = TypingTarget("ab 中")
+    assert target.matches(0, "a", "a")
+    assert not target.matches(0, "b", "b")
+    assert target.matches(3, "中", "")
+    assert not target.matches(4, "x", "x")  # Past the end
+    assert not target.matches(0, "", "Shift_L")
+
+
+def test_matches_newline_by_keysym():
+    target = TypingTarget("a\nb")
+    assert target.matches(1, "\r", "Return")
+    assert target.matches(1, "", "KP_Enter")
+    assert not target.matches(1, "\n", "n")
+    assert target.expected_keysyms(1) == ("Return", "KP_Enter")
+    assert target.expected_keysyms(0) == ()
+
+
+def test_line_col_and_offset():
+    target = TypingTarget("ab\ncde\n\nf")
+    assert target.line_count == 4
+    expected = [(0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (1, 2), (1, 3), (2, 0), (3, 0), (3, 1)]
+    for index, line_col in enumerate(expected):
+        assert target.line_col(index) == line_col
+        assert target.offset(*line_col) == index
+    assert target.line_span(1) == (3, 6)
+    assert target.line_span(2) == (7, 7)
+    assert target.line_span(3) == (8, 9)
+
+
+def test_words_completed():
+    target = TypingTarget("one two  three")
+    assert target.word_count == 3
+    assert target.words_completed(0) == 0
+    assert target.words_completed(2) == 0
+    assert target.words_completed(3) == 1
+    assert target.words_completed(4) == 1
+    assert target.words_completed(9) == 2
+    assert target.words_completed(len(target)) == 3
+
+
+def test_cjk_characters_are_words():
+    target = TypingTarget("中文 ok")
+    assert [target.word_span(w) for w in range(target.word_count)] == [(0, 1), (1, 2), (3, 5)]
+
+
+@pytest.mark.parametrize("sizes", [[1], [3, 5], [4, 4, 4, 1]])
+def test_from_chunks_matches_whole_text(sizes):
+    text = "alpha beta\ngamma delta epsilon\nzeta"
+    chunks, start = [], 0
+    for word_count in sizes:
+        # Cut after word_count words so no word is split
+        end = start
+        for _ in range(word_count):
+            end = text.find(" ", end + 1)
+            if end == -1:
+                end = len(text)
+                break
+        chunks.append(text[start:end])
+        start = end
+    chunks.append(text[start:])
+    whole, chunked = TypingTarget(text), TypingTarget.from_chunks(chunks)
+    assert chunked.text == whole.text
+    assert list(chunked.codepoints) == list(whole.codepoints)
+    assert list(chunked.line_starts) == list(whole.line_starts)
+    assert list(chunked.word_starts) == list(whole.word_starts)
+    assert list(chunked.word_ends) == list(whole.word_ends)
@@ -1,3 +1,3 @@
-from .abstract_ui import AbstractUI
+from quantum_type.abstract_ui import AbstractUI
 
 __all__ = ["AbstractUI"]
@@ -1,3 +0,0 @@
-from .network_handler import NetworkHandler
-
-__all__ = ['NetworkHandler']
\ No newline at end of file
@@ -1,9 +1,12 @@
 import tkinter as tk
-from tkinter import filedialog, messagebox
-from abstract_ui import AbstractUI
+from tkinter import filedialog, messagebox, ttk
+from quantum_type.abstract_ui import AbstractUI
+from ui.viewport import TextViewport
 
+STATS_TEXT = "速度: {:.0f} WPM  準確率: {:.0f}%"
 
-class GameUI:
+
+class GameUI(AbstractUI):
     def __init__(self):
         self.game_logic = None
         self.root = tk.Tk()
@@ -22,6 +25,12 @@ class GameUI:
     def set_game_logic(self, game_logic):
         self.game_logic = game_logic
 
+    def after(self, delay, callback):
+        return self.root.after(delay, callback)
+
+    def after_cancel(self, job):
+        self.root.after_cancel(job)
+
     def setup_ui(self):
         self.mode_frame = tk.Frame(self.root)
         self.mode_frame.pack(side=tk.TOP, pady=20)
@@ -42,7 +51,7 @@ class GameUI:
 
         # IP frames for client and host
         self.ip_frame = tk.Frame(self.root)
-        self.ip_label = tk.Label(self.ip_frame, text="輸入主機IP:")
+        self.ip_label = tk.Label(self.ip_frame, text="輸入主機IP (或 IP/房間碼):")
         self.ip_label.pack(side=tk.LEFT)
         self.ip_entry = tk.Entry(self.ip_frame)
         self.ip_entry.pack(side=tk.LEFT, padx=5)
@@ -98,6 +107,11 @@ class GameUI:
         )
         self.opponent_text.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
 
+        # 每個文字框只顯示游標附近的文本；長文本以滑動視窗呈現
+        self.viewports = {
+            widget: TextViewport(widget) for widget in (self.my_text, self.opponent_text)
+        }
+
         self.score_frame = tk.Frame(self.root)
         self.score_frame.pack(pady=5)
         self.my_score_label = tk.Label(self.score_frame, text="我的分數: 0")
@@ -106,6 +120,13 @@ class GameUI:
         self.opponent_score_label.pack(side=tk.LEFT, padx=20)
         self.timer_label = tk.Label(self.score_frame, text="剩餘時間: 60")
         self.timer_label.pack(side=tk.LEFT, padx=20)
+        self.stats_label = tk.Label(self.score_frame, text=STATS_TEXT.format(0, 100))
+        self.stats_label.pack(side=tk.LEFT, padx=20)
+
+        # 每位對手一列: 名稱、分數與進度條
+        self.players_frame = tk.Frame(self.root)
+        self.players_frame.pack(pady=5)
+        self.player_panes = {}
         self.countdown_label = tk.Label(
             self.root, text="", font=("Arial", 48, "bold"), fg="red"
         )
@@ -114,10 +135,47 @@ class GameUI:
             self.root, text="加載文本", command=self.game_logic.load_text
         )
         self.load_button.pack(pady=5)
+        if self.game_logic.corpus is not None:
+            self.passage_button = tk.Button(
+                self.root, text="隨機文章", command=self.game_logic.load_passage
+            )
+            self.passage_button.pack(pady=5)
 
-        self.root.bind("<KeyPress>", self.game_logic.on_key_press)
+        self.bind_key_press(self.game_logic.on_key_press)
         self.game_logic.process_queue()
 
+    def bind_key_press(self, callback):
+        self.root.focus_set()
+        self.root.bind("<KeyPress>", callback)
+
+    def unbind_key_press(self):
+        self.root.unbind("<KeyPress>")
+
+    def choose_text_file(self):
+        file_path = self.filedialog.askopenfilename(filetypes=[("Text files", "*.txt")])
+        return file_path or None
+
+    def get_host_address(self):
+        return self.ip_entry.get()
+
+    def set_start_enabled(self, enabled):
+        self.start_button.config(state=tk.NORMAL if enabled else tk.DISABLED)
+
+    def set_back_enabled(self, enabled):
+        self.back_button.config(state=tk.NORMAL if enabled else tk.DISABLED)
+
+    def set_status(self, text, color=None):
+        if color is None:
+            self.host_status_label.config(text=text)
+        else:
+            self.host_status_label.config(text=text, fg=color)
+
+    def show_info(self, title, message):
+        self.messagebox.showinfo(title, message)
+
+    def show_error(self, title, message):
+        self.messagebox.showerror(title, message)
+
     def show_client_ip_entry(self):
         """Show the IP entry frame for client mode"""
         self.back_button.config(state=tk.NORMAL)
@@ -128,50 +186,85 @@ class GameUI:
 
     def display_host_info(self, host_ip):
         """Display host information"""
+        self.mode_frame.pack_forget()
         self.ip_frame.pack_forget()  # Hide client frame if visible
         self.host_frame.pack(pady=20)
         self.host_ip_label.config(text=f"房間IP地址: {host_ip}")
         self.host_status_label.config(text="等待客戶端連接...")
+        self.show_players_frame()
+
+    def show_players_frame(self):
+        if not self.players_frame.winfo_ismapped():
+            self.players_frame.pack(pady=5, after=self.score_frame)
+
+    def set_text_content(self, target, opponent=True):
+        """Show a TypingTarget in my text area, and the opponent's if asked"""
+        self.viewports[self.my_text].set_target(target)
+        if opponent:
+            self.viewports[self.opponent_text].set_target(target)
+
+    def clear_text_content(self):
+        for viewport in self.viewports.values():
+            viewport.clear()
 
     def update_progress(self, text_widget, index):
-        text_widget.tag_remove("current", 1.0, tk.END)
-        if index < len(self.game_logic.text_content):
-            text_widget.tag_add(
-                "current", f"1.0 + {index} chars", f"1.0 + {index + 1} chars"
-            )
-            text_widget.tag_config("current", background="yellow")
+        self.viewports[text_widget].show_cursor(index)
 
     def update_my_progress(self, progress):
-        self.my_text.tag_remove("current", 1.0, tk.END)
-        if progress < len(self.game_logic.text_content):
-            self.my_text.tag_add(
-                "current", f"1.0 + {progress} chars", f"1.0 + {progress + 1} chars"
-            )
-            self.my_text.tag_config("current", background="yellow")
+        self.update_progress(self.my_text, progress)
 
     def update_opponent_progress(self, progress):
-        self.opponent_text.tag_remove("current", 1.0, tk.END)
-        if progress < len(self.game_logic.text_content):
-            self.opponent_text.tag_add(
-                "current", f"1.0 + {progress} chars", f"1.0 + {progress + 1} chars"
-            )
-            self.opponent_text.tag_config("current", background="yellow")
+        self.update_progress(self.opponent_text, progress)
 
-    def show_error_highlight(self, text_widget, index):
-        text_widget.tag_add("error", f"1.0 + {index} chars", f"1.0 + {index + 1} chars")
-        text_widget.tag_config("error", background="red")
-        self.root.after(500, lambda: text_widget.tag_remove("error", 1.0, tk.END))
+    def show_error_highlight(self, index):
+        self.viewports[self.my_text].flash_error(index)
 
     def update_timer_display(self, remaining):
         self.timer_label.config(text=f"剩餘時間: {int(remaining)}")
 
+    def update_stats(self, stats):
+        self.stats_label.config(
+            text=STATS_TEXT.format(stats["net_wpm"], stats["accuracy"] * 100)
+        )
+
     def update_score_display(self, my_score, opponent_score=None):
         self.my_score_label.config(text=f"我的分數: {my_score}")
         if opponent_score is not None:
             self.opponent_score_label.config(text=f"對手分數: {opponent_score}")
 
-    def show_result(self, winner, my_score=None, opponent_score=None):
-        if my_score is not None and opponent_score is not None:
+    def update_players(self, players):
+        """Show one pane per opponent: {player_id: {"name", "progress", "score"}}"""
+        for player_id in list(self.player_panes):
+            if player_id not in players:
+                frame, _, _ = self.player_panes.pop(player_id)
+                frame.destroy()
+
+        text_length = max(1, len(self.game_logic.text_content))
+        for player_id, info in sorted(players.items()):
+            if player_id not in self.player_panes:
+                frame = tk.Frame(self.players_frame)
+                frame.pack(side=tk.TOP, fill=tk.X)
+                label = tk.Label(frame, width=20, anchor="w")
+                label.pack(side=tk.LEFT)
+                bar = ttk.Progressbar(frame, length=300, mode="determinate")
+                bar.pack(side=tk.LEFT, padx=5)
+                self.player_panes[player_id] = (frame, label, bar)
+            _, label, bar = self.player_panes[player_id]
+            text = f"{info['name']}: {info['score']}"
+            if info.get("rtt") is not None:
+                text += f" ({info['rtt'] * 1000:.0f} ms)"
+            label.config(text=text)
+            bar.config(maximum=text_length, value=min(info["progress"], text_length))
+
+    def show_result(self, winner, my_score=None, opponent_score=None, ranking=None):
+        if ranking:
+            lines = [f"勝者: {winner}"]
+            for entry in ranking:
+                lines.append(f"第{entry['rank']}名 {entry['name']}: {entry['score']}")
+            if my_score is not None:
+                lines.append(f"我的分數: {my_score}")
+            messagebox.showinfo("遊戲結束", "\n".join(lines))
+        elif my_score is not None and opponent_score is not None:
             messagebox.showinfo(
                 "遊戲結束",
                 f"勝者: {winner}\n我的分數: {my_score}\n對手分數: {opponent_score}",
@@ -179,12 +272,19 @@ class GameUI:
         else:
             messagebox.showinfo("遊戲結束", f"勝者: {winner}")
 
+    def show_multiplayer_elements(self):
+        if not self.opponent_text.winfo_ismapped():
+            self.opponent_text.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+        if not self.opponent_score_label.winfo_ismapped():
+            self.opponent_score_label.pack(side=tk.LEFT, padx=20)
+
     def hide_multiplayer_elements(self):
         self.mode_frame.pack_forget()
         self.ip_frame.pack_forget()
         self.host_frame.pack_forget()
         self.opponent_text.pack_forget()
         self.opponent_score_label.pack_forget()
+        self.players_frame.pack_forget()
 
     def connect_to_host(self):
         """Called after successful connection to host"""
@@ -196,24 +296,41 @@ class GameUI:
         self.host_status_label.config(text="等待主機開始遊戲...", fg="green")
 
         # Ensure opponent UI elements are visible
-        if not self.opponent_text.winfo_ismapped():
-            self.opponent_text.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
-        if not self.opponent_score_label.winfo_ismapped():
-            self.opponent_score_label.pack(side=tk.LEFT, padx=20)
+        self.show_multiplayer_elements()
+        self.show_players_frame()
 
     def show_countdown(self, count):
         # 顯示倒計時數字
         self.countdown_label.config(text=str(count))
         self.countdown_label.place(relx=0.5, rely=0.5, anchor="center")
 
-        # 如果是最後一個數字，設置一秒後隱藏
-        if count == 1:
-            self.root.after(1000, self.hide_countdown)
-
     def hide_countdown(self):
         # 隱藏倒計時標籤
         self.countdown_label.place_forget()
 
+    def show_main_menu(self):
+        # Hide mode-specific frames
+        self.ip_frame.pack_forget()  # Hide IP entry frame (client mode)
+        self.host_frame.pack_forget()  # Hide host info frame (host mode)
+        self.hide_countdown()
+
+        # Show the mode selection frame (main menu)
+        self.mode_frame.pack(pady=20, before=self.basic_frame)
+
+        # Clear text areas
+        self.clear_text_content()
+
+        # Reset score and timer labels to initial values
+        self.my_score_label.config(text="我的分數: 0")
+        self.opponent_score_label.config(text="對手分數: 0")
+        self.update_players({})
+        self.timer_label.config(text="剩餘時間: 60")
+        self.stats_label.config(text=STATS_TEXT.format(0, 100))
+
+        # Disable buttons as in initial state
+        self.set_start_enabled(False)
+        self.set_back_enabled(False)
+
     def toggle_fullscreen(self, event=None):
         self.is_fullscreen = not self.is_fullscreen
         self.root.attributes("-fullscreen", self.is_fullscreen)
@@ -0,0 +1,58 @@
+class TextHighlighter:
+    """Moves a one-character tag through a Text widget.
+
+    The tag is configured once. Each ``move`` removes the tag from the range
+    it was last put on, instead of from the whole document, so the cost of a
+    keystroke does not depend on the length of the text.
+
+    ``view`` is anything with ``len()`` and an ``index(offset)`` method that
+    turns a character offset into a Tk ``line.column`` index (or None if
+    that character is not in the widget), normally a ``TextViewport``. Tk
+    resolves ``"1.0 + N chars"`` by walking from the start of the text; a
+    ``line.column`` index is found directly.
+    """
+
+    def __init__(self, widget, tag, **options):
+        self.widget = widget
+        self.tag = tag
+        self.widget.tag_config(tag, **options)
+        self._range = None
+
+    def move(self, view, offset):
+        """Put the tag on character ``offset``, or nowhere once the text is done"""
+        self.clear()
+        if offset < len(view):
+            start, end = view.index(offset), view.index(offset + 1)
+            if start is not None:
+                self._range = (start, end)
+                self.widget.tag_add(self.tag, start, end)
+
+    def clear(self):
+        if self._range is not None:
+            self.widget.tag_remove(self.tag, *self._range)
+            self._range = None
+
+    def reset(self):
+        """The widget's text was replaced; its tags went with it"""
+        self._range = None
+
+
+class ErrorFlash:
+    """Briefly marks a mistyped character"""
+
+    def __init__(self, widget, tag="error", duration=500, **options):
+        self.widget = widget
+        self.tag = tag
+        self.duration = duration
+        self.widget.tag_config(tag, **options)
+        # Raised above the cursor tag so the mistake shows through it
+        self.widget.tag_raise(tag)
+
+    def show(self, view, offset):
+        if offset >= len(view):
+            return
+        start, end = view.index(offset), view.index(offset + 1)
+        if start is None:
+            return
+        self.widget.tag_add(self.tag, start, end)
+        self.widget.after(self.duration, self.widget.tag_remove, self.tag, start, end)
@@ -0,0 +1,106 @@
+import tkinter as tk
+
+from ui.highlight import ErrorFlash, TextHighlighter
+
+WINDOWED_THRESHOLD = 100_000  # Texts longer than this (in chars) are windowed
+WINDOW_CHARS = 20_000  # Characters kept in the widget when windowed
+SCROLL_MARGIN = 2_000  # Slide the window when the cursor gets this close to its end
+
+
+class TextViewport:
+    """The part of the practice text a Text widget shows.
+
+    Short texts are inserted whole. Longer ones are windowed: only about
+    ``WINDOW_CHARS`` characters around the cursor are in the widget, and
+    the window slides forward as the cursor gets near its end. Windows are
+    bounded in characters, not lines, so a text with few or no line breaks
+    is windowed just as well. The text itself is kept once, in the
+    TypingTarget every viewport shares, so a novel costs two small windows
+    instead of two full copies in Tk.
+    """
+
+    def __init__(self, widget, window_chars=WINDOW_CHARS, threshold=WINDOWED_THRESHOLD):
+        self.widget = widget
+        self.window_chars = window_chars
+        self.threshold = threshold
+        self.target = None
+        self.windowed = False
+        self.start = 0  # Characters [start, end) are in the widget
+        self.end = 0
+        self._first_line = 0  # Line and column of start in the text
+        self._first_column = 0
+        self.cursor = TextHighlighter(widget, "current", background="yellow")
+        self.errors = ErrorFlash(widget, background="red")
+
+    def __len__(self):
+        return len(self.target) if self.target is not None else 0
+
+    def set_target(self, target):
+        self.target = target
+        self.windowed = len(target) > self.threshold
+        self._render(0)
+
+    def clear(self):
+        self.target = None
+        self.start = self.end = 0
+        self._first_line = self._first_column = 0
+        self._replace("")
+
+    def index(self, offset):
+        """Tk index of a character offset, or None if it is outside the window"""
+        # The end of the window is still addressable
+        if offset < self.start or offset > self.end:
+            return None
+        line, column = self.target.line_col(offset)
+        if line == self._first_line:
+            column -= self._first_column
+        return f"{line - self._first_line + 1}.{column}"
+
+    def show_cursor(self, offset):
+        """Highlight ``offset``, sliding the window first if it has to"""
+        if self.target is None:
+            return
+        if self.windowed and offset < len(self.target):
+            more_after = self.end < len(self.target)
+            if offset < self.start or (more_after and offset >= self.end - SCROLL_MARGIN):
+                self._render(max(0, offset - SCROLL_MARGIN))
+        self.cursor.move(self, offset)
+        index = self.index(min(offset, len(self.target)))
+        if index is not None:
+            self.widget.see(index)
+
+    def flash_error(self, offset):
+        if self.target is not None:
+            self.errors.show(self, offset)
+
+    def _render(self, start):
+        target = self.target
+        if self.windowed:
+            start = self._snap(start)
+            end = self._snap(min(len(target), start + self.window_chars), start)
+        else:
+            start, end = 0, len(target)
+        self.start, self.end = start, end
+        self._first_line, self._first_column = target.line_col(start)
+        self._replace(target.text[start:end])
+
+    def _snap(self, offset, floor=-1):
+        """offset moved back to the start of its line, or else of its word,
+        when that stays after floor"""
+        target = self.target
+        if offset >= len(target):
+            return len(target)
+        line, column = target.line_col(offset)
+        if column <= SCROLL_MARGIN and offset - column > floor:
+            return offset - column
+        word = target.word_index(offset)
+        if word >= 0 and target.word_starts[word] > floor:
+            return target.word_starts[word]
+        return offset
+
+    def _replace(self, text):
+        self.widget.config(state=tk.NORMAL)
+        self.widget.delete("1.0", tk.END)
+        self.widget.insert(tk.END, text)
+        self.widget.config(state=tk.DISABLED)
+        self.cursor.reset()